@@ -1,34 +1,596 @@
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Depends
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from pydantic.fields import FieldInfo
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.state import InstanceState
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.schema import Table
+from core.database import (
+    AsyncSessionLocal, READ_YOUR_WRITES_WINDOW, after_commit_hooks,
+    replica_reads_enabled, replica_engines
+)
+from core.cache_backends import (
+    CacheBackend, InMemoryBackend, LocalLRU,
+    NullBackend, RedisBackend
+)
+from core.cache_serializers import CacheSerializer
+from core.etag import compute_etag, current_conditional, etag_matches
+import orjson
+from collections import defaultdict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
 import os
+import time
 
-async def init_redis(app: FastAPI):
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "hospital-cache"
+
+# "redis" (default), "memory" or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis").lower()
+MEMORY_CACHE_MAXSIZE = int(os.getenv("CACHE_MEMORY_MAXSIZE", 10000))
+
+# Longest an entry lives when Redis is down and each worker caches on its own
+FALLBACK_CACHE_TTL = int(os.getenv("CACHE_FALLBACK_TTL", 30))
+
+# Payload encoding: orjson or msgpack, compressed (zstd/lz4/zlib) above a size threshold
+_serializer = CacheSerializer(
+    fmt=os.getenv("CACHE_SERIALIZER", "orjson").lower(),
+    compression=os.getenv("CACHE_COMPRESSION", "auto").lower(),
+    min_compress_size=int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+)
+
+# In-process tier in front of shared backends; entries never outlive their backend TTL
+LOCAL_CACHE_MAXSIZE = int(os.getenv("CACHE_LOCAL_MAXSIZE", 1024))
+LOCAL_CACHE_TTL = int(os.getenv("CACHE_LOCAL_TTL", 60))
+
+# Seconds after an invalidation during which results read from a replica
+# are not cached: the replica may not have replayed the write yet
+REPLICA_CACHE_FENCE = float(os.getenv("REPLICA_CACHE_FENCE", READ_YOUR_WRITES_WINDOW))
+
+_backend: CacheBackend = NullBackend()
+
+# Tables read while computing a cached response; None outside a cache miss
+_read_tags: ContextVar[Optional[set]] = ContextVar("cache_read_tags", default=None)
+
+# Keep references to fire-and-forget invalidation/refresh tasks until they finish
+_background_tasks: set = set()
+
+# Computations currently running in this worker, keyed by cache key
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Per-namespace counters: hits (local, backend, stale, 304), misses, replica
+# results not stored because of a fence, results not stored because their
+# tables were invalidated while computing, and the serialized vs stored
+# (compressed) size of everything written
+_stats: Dict[str, Dict[str, int]] = defaultdict(
+    lambda: {
+        "hits": 0, "local_hits": 0, "stale_hits": 0, "not_modified": 0, "misses": 0,
+        "writes": 0, "fenced": 0, "superseded": 0, "raw_bytes": 0, "stored_bytes": 0
+    }
+)
+
+_local = LocalLRU(LOCAL_CACHE_MAXSIZE, LOCAL_CACHE_TTL)
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _connect_redis() -> CacheBackend:
     redis_host = os.getenv("REDIS_HOST", "localhost")
     redis_port = int(os.getenv("REDIS_PORT", 6379))
     redis_password = os.getenv("REDIS_PASSWORD", None)
-    
+
     redis = aioredis.from_url(
         f"redis://{redis_host}:{redis_port}",
-        password=redis_password,
-        encoding="utf8",
-        decode_responses=True
+        password=redis_password
     )
-    
-    FastAPICache.init(RedisBackend(redis), prefix="hospital-cache")
+    backend = RedisBackend(redis, prefix=CACHE_PREFIX)
+    await backend.ping()
+    return backend
+
+async def init_cache(app: FastAPI):
+    """
+    Select the cache backend from CACHE_BACKEND. If Redis is unreachable
+    at startup the app degrades to the in-memory backend instead of failing.
+    """
+    global _backend
+    if CACHE_BACKEND == "none":
+        backend = NullBackend()
+    elif CACHE_BACKEND == "memory":
+        backend = InMemoryBackend(MEMORY_CACHE_MAXSIZE)
+    else:
+        try:
+            backend = await _connect_redis()
+        except Exception as e:
+            logger.warning(
+                f"Redis unavailable ({e}), falling back to in-memory cache "
+                f"(entries capped at {FALLBACK_CACHE_TTL}s)"
+            )
+            backend = InMemoryBackend(MEMORY_CACHE_MAXSIZE, max_ttl=FALLBACK_CACHE_TTL)
+
+    _backend = backend
+    _local.clear()
+    _bind_routes(app)
+    if backend.shared:
+        _spawn(backend.listen(_drop_local))
+    app.state.cache_backend = backend.name
+
+async def close_cache():
+    await _backend.close()
+
+def _drop_local(keys: Optional[list]):
+    """Invalidation callback: drop the given keys, or everything if None."""
+    if keys is None:
+        _local.clear()
+        return
+    for key in keys:
+        _local.pop(key)
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return a snapshot of the hit/miss/byte counters per namespace."""
+    stats = {namespace: dict(counters) for namespace, counters in _stats.items()}
+    stats["_backend"] = {
+        "name": _backend.name,
+        "serializer": _serializer.format,
+        "compression": _serializer.compression
+    }
+    stats["_local"] = {"entries": len(_local), "maxsize": _local.maxsize}
+    return stats
+
+def _dependency_params(func) -> set:
+    """Names of the parameters FastAPI injects through Depends()/Security()."""
+    names = set()
+    for name, param in inspect.signature(func).parameters.items():
+        if isinstance(param.default, Depends):
+            names.add(name)
+        elif param.annotation in (Request, Response):
+            names.add(name)
+    return names
+
+def _param_defaults(func, dependencies: set) -> Dict[str, Any]:
+    """
+    Plain defaults of the query/path parameters, so a direct call such as
+    the startup warm-up gets the same arguments (and key) as a request.
+    """
+    defaults = {}
+    for name, param in inspect.signature(func).parameters.items():
+        if name in dependencies or param.default is inspect.Parameter.empty:
+            continue
+        default = param.default
+        if isinstance(default, FieldInfo):
+            if default.is_required():
+                continue
+            default = default.get_default(call_default_factory=True)
+        defaults[name] = default
+    return defaults
+
+def _principal(kwargs: Dict[str, Any], dependencies: set):
+    """Find the resolved user/patient among the injected dependencies."""
+    for name in dependencies:
+        value = kwargs.get(name)
+        if hasattr(value, "role") and hasattr(value, "id"):
+            return value
+    return None
+
+def build_cache_key(
+    namespace: str,
+    kwargs: Dict[str, Any],
+    dependencies: set,
+    scope: Optional[str] = None
+) -> str:
+    """
+    Build a deterministic cache key from the route namespace, the
+    query/path/body parameters and an optional role or user scope.
+    Injected dependencies (sessions, users, requests) never reach the key.
+    """
+    params = {
+        name: jsonable_encoder(value)
+        for name, value in kwargs.items()
+        if name not in dependencies
+    }
+    if scope is not None:
+        principal = _principal(kwargs, dependencies)
+        params["__role__"] = getattr(principal, "role", None)
+        if scope == "user":
+            params["__user__"] = getattr(principal, "id", None)
+
+    raw = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{namespace}:{digest}"
+
+def _table_names(statement) -> set:
+    """Names of every table referenced by a statement, aliases included."""
+    return {
+        element.name
+        for element in visitors.iterate(statement)
+        if isinstance(element, Table)
+    }
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_tables(orm_execute_state):
+    """Record tables read by cached handlers and tables written by DML."""
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_select:
+        tags = _read_tags.get()
+        if tags is not None:
+            tags.update(_table_names(statement))
+    elif orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        written = orm_execute_state.session.info.setdefault("cache_tags", set())
+        written.update(_table_names(statement))
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    """Record tables touched by the unit of work for after-commit invalidation."""
+    written = session.info.setdefault("cache_tags", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        state = sa_inspect(instance)
+        written.update(table.name for table in state.mapper.tables)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    tags = session.info.pop("cache_tags", None)
+    if not tags:
+        return
+    if session.info.get("await_invalidation"):
+        # get_async_db invalidates before the response goes out
+        session.info.setdefault("committed_tags", set()).update(tags)
+        return
+    try:
+        _spawn(invalidate_tags(tags))
+    except RuntimeError:
+        # No running event loop (sync session outside the app)
+        return
+
+async def invalidate_committed(session):
+    """Invalidate what the session's commits wrote; registered with get_async_db."""
+    tags = session.info.pop("committed_tags", None)
+    if not tags:
+        return
+    try:
+        await invalidate_tags(tags)
+    except Exception:
+        logger.exception("Cache invalidation after commit failed")
+
+after_commit_hooks.append(invalidate_committed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("cache_tags", None)
+
+async def invalidate_tags(tags: Iterable[str]):
+    """Delete every cached entry tagged with one of the given tables."""
+    tags = set(tags)
+    # Before deleting, so a computation already running sees the change and discards its result
+    await _backend.bump_generation(tags)
+    if replica_engines:
+        await _backend.fence(tags, REPLICA_CACHE_FENCE)
+    keys = await _backend.invalidate_tags(tags)
+    for key in keys:
+        _local.pop(key)
+
+async def publish(channel: str, message: str):
+    """Publish to every worker subscribed to `channel` (Redis pub/sub when shared)."""
+    await _backend.publish(channel, message)
+
+async def subscribe(channel: str, on_message: Callable[[str], None]):
+    """Run until cancelled, calling `on_message` for each message on `channel`."""
+    await _backend.subscribe(channel, on_message)
 
-def cache(expire: int = 60):
+async def get_value(key: str, local_ttl: Optional[int] = None) -> Any:
+    """Read a value stored with set_value, from the local tier first."""
+    value = _local.get(key) if _backend.shared else None
+    if value is not None:
+        return value
+    payload = await _backend.get(key)
+    if payload is None:
+        return None
+    value = _serializer.loads(payload)
+    if _backend.shared:
+        _local.set(key, value, local_ttl)
+    return value
+
+async def current_generation() -> int:
+    """Read before loading a value; pass it to set_value to detect concurrent writes."""
+    return await _backend.generation()
+
+async def _store(backend: CacheBackend, key: str, payload: bytes, expire: int,
+                 tags: Iterable[str], generation: Optional[int]) -> bool:
+    """
+    Store and tag `payload`, unless one of its tags was invalidated after
+    `generation` was read. Checked after tagging: an invalidation racing
+    the write has then either deleted the key or is seen by the check.
     """
-    Custom cache decorator that works with FastAPI-Cache2
+    await backend.set(key, payload, expire)
+    if tags:
+        await backend.tag(key, tags, expire)
+    if generation is not None and await backend.changed_since(tags, generation):
+        await backend.delete(key)
+        return False
+    return True
+
+async def set_value(key: str, value: Any, expire: int, tags: Iterable[str] = (),
+                    generation: Optional[int] = None) -> bool:
+    """
+    Store a plain value outside the route cache. Tagged values are dropped
+    on every worker by invalidate_tags(), like cached responses. With the
+    `generation` read before the value was loaded, the value is not kept
+    if one of its tags was invalidated meanwhile. Returns whether it was stored.
     """
+    tags = set(tags)
+    payload, _ = _serializer.dumps(value)
+    if not await _store(_backend, key, payload, expire, tags, generation):
+        return False
+    if _backend.shared:
+        _local.set(key, value, min(expire, LOCAL_CACHE_TTL))
+    return True
+
+def _bind_routes(app: FastAPI):
+    """Give every cached endpoint the response_model of the route serving it."""
+    for route in app.routes:
+        bind = getattr(getattr(route, "endpoint", None), "cache_bind_route", None)
+        if isinstance(route, APIRoute) and bind is not None:
+            bind(route)
+
+def _route_serializer(route: APIRoute) -> Callable[[Any], Any]:
+    """
+    Serialize a handler result the way the route's response would be, so
+    only fields of its response_model (never e.g. hashed_password) are stored.
+    """
+    if route.response_model is None:
+        return jsonable_encoder
+    adapter = TypeAdapter(route.response_model)
+    options = {
+        "by_alias": route.response_model_by_alias,
+        "exclude_unset": route.response_model_exclude_unset,
+        "exclude_defaults": route.response_model_exclude_defaults,
+        "exclude_none": route.response_model_exclude_none
+    }
+
+    def serialize(value: Any) -> Any:
+        validated = adapter.validate_python(_to_plain(value), from_attributes=True)
+        return adapter.dump_python(validated, mode="json", **options)
+    return serialize
+
+def _to_plain(value: Any, depth: int = 0) -> Any:
+    """
+    Convert handler results (ORM instances, result rows) into plain data
+    for the response_model to validate; only loaded attributes are read.
+    """
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(item, depth) for item in value]
+    if isinstance(value, Row):
+        return {key: _to_plain(item, depth) for key, item in value._mapping.items()}
+    state = sa_inspect(value, raiseerr=False)
+    if isinstance(state, InstanceState):
+        data = {}
+        for attr in state.mapper.column_attrs:
+            if attr.key not in state.unloaded:
+                data[attr.key] = getattr(value, attr.key)
+        # Only follow relationships that were eagerly loaded, one level deep
+        if depth == 0:
+            for rel in state.mapper.relationships:
+                if rel.key not in state.unloaded:
+                    data[rel.key] = _to_plain(getattr(value, rel.key), depth + 1)
+        return data
+    return value
+
+async def _single_flight(key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, dict]:
+    """
+    Run `compute` once per key at a time within this worker. Concurrent
+    callers for the same key wait for the leader and receive its entry.
+    Returns the value to respond with and the cache entry.
+    """
+    future = _inflight.get(key)
+    if future is not None:
+        entry = await asyncio.shield(future)
+        return entry["data"], entry
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result, entry = await compute()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark the exception as retrieved in case nobody was waiting
+        future.exception()
+        raise
+    else:
+        future.set_result(entry)
+        return result, entry
+    finally:
+        _inflight.pop(key, None)
+
+def _injected_response(kwargs: Dict[str, Any], dependencies: set) -> Optional[Response]:
+    """The Response a handler may set headers on, stored and replayed with its entry."""
+    for name in dependencies:
+        if isinstance(kwargs.get(name), Response):
+            return kwargs[name]
+    return None
+
+def _blank_response() -> Response:
+    # Like FastAPI's injected response: no headers until the handler sets some
+    response = Response()
+    del response.headers["content-length"]
+    return response
+
+def _log_refresh_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background cache refresh failed", exc_info=task.exception())
+
+def cache(
+    expire: int = 60,
+    namespace: Optional[str] = None,
+    scope: Optional[str] = None,
+    tags: Iterable[str] = (),
+    local_ttl: Optional[int] = None,
+    stale_ttl: int = 0
+):
+    """
+    Cache decorator for route handlers.
+
+    The key only depends on the route and its query/path/body parameters,
+    so the per-request AsyncSession and resolved User do not defeat it.
+    Use scope="role" or scope="user" for responses that differ per caller.
+
+    Entries are tagged with every table the handler reads (plus any extra
+    `tags`) and dropped as soon as a session commits a write to one of them,
+    before that write's response is sent. A result computed while such a
+    write committed is returned but not stored.
+
+    With a shared backend (Redis), hits are served from an in-process LRU
+    first (for `local_ttl` seconds, CACHE_LOCAL_TTL by default) and from
+    the backend otherwise.
+
+    Concurrent misses for one key are coalesced into a single computation
+    per worker. With `stale_ttl`, an entry that is past `expire` but still
+    within the grace window is served as-is while one background task
+    recomputes it on a fresh session.
+
+    Each entry carries a strong ETag of its content; a hit whose ETag
+    matches the request's If-None-Match returns 304 without serializing.
+
+    Headers a handler sets on an injected `Response` (pagination cursors,
+    counts) are stored with the entry and replayed on hits.
+
+    Results are stored as the route's response_model serializes them
+    (bound by init_cache), never as raw ORM column values. Results read
+    from a replica within REPLICA_CACHE_FENCE seconds of an invalidation
+    of one of their tables are returned but not stored.
+    """
+    if scope not in (None, "role", "user"):
+        raise ValueError("scope must be None, 'role' or 'user'")
+
     def decorator(func):
+        cache_namespace = namespace or f"{func.__module__}.{func.__name__}"
+        dependencies = _dependency_params(func)
+        defaults = _param_defaults(func, dependencies)
+        memory_ttl = min(local_ttl or LOCAL_CACHE_TTL, expire + stale_ttl)
+        # Replaced by the route's response_model serializer in init_cache
+        serializer = {"serialize": jsonable_encoder}
+
+        async def compute(backend, key: str, args, kwargs):
+            generation = await backend.generation()
+            read_tags = set(tags)
+            token = _read_tags.set(read_tags)
+            try:
+                result = await func(*args, **kwargs)
+            finally:
+                _read_tags.reset(token)
+            # A lagging replica could put pre-write data back for the whole TTL
+            cacheable = not (replica_reads_enabled() and await backend.fenced(read_tags))
+
+            data = serializer["serialize"](result)
+            entry = {
+                "fresh_until": time.time() + expire,
+                "etag": compute_etag(orjson.dumps(data)),
+                "data": data
+            }
+            response = _injected_response(kwargs, dependencies)
+            if response is not None and response.headers:
+                entry["headers"] = dict(response.headers)
+            if not cacheable:
+                _stats[cache_namespace]["fenced"] += 1
+                return result, entry
+            payload, raw_size = _serializer.dumps(entry)
+            counters = _stats[cache_namespace]
+            # A write committed while the handler ran makes this result outdated
+            if not await _store(backend, key, payload, expire + stale_ttl, read_tags, generation):
+                counters["superseded"] += 1
+                return result, entry
+            if backend.shared:
+                _local.set(key, entry, memory_ttl)
+            counters["writes"] += 1
+            counters["raw_bytes"] += raw_size
+            counters["stored_bytes"] += len(payload)
+            return result, entry
+
+        async def refresh(backend, key: str, args, kwargs):
+            # The request's session is closed once the response is sent
+            async with AsyncSessionLocal(info={"read_only": True}) as session:
+                fresh_kwargs = {
+                    name: session if isinstance(value, AsyncSession)
+                    else _blank_response() if isinstance(value, Response)
+                    else value
+                    for name, value in kwargs.items()
+                }
+                return await compute(backend, key, args, fresh_kwargs)
+
+        def revalidate(backend, key: str, args, kwargs):
+            if key in _inflight:
+                return
+            task = _spawn(
+                _single_flight(key, lambda: refresh(backend, key, args, kwargs))
+            )
+            task.add_done_callback(_log_refresh_failure)
+
+        @wraps(func)
         async def wrapper(*args, **kwargs):
-            return await FastAPICache.decorate(
-                expire=expire,
-                namespace=func.__name__,
-                *args,
-                **kwargs
-            )(func)(*args, **kwargs)
+            kwargs = {**defaults, **kwargs}
+            backend = _backend
+            counters = _stats[cache_namespace]
+            key = build_cache_key(cache_namespace, kwargs, dependencies, scope)
+
+            entry = _local.get(key) if backend.shared else None
+            if entry is not None:
+                counters["local_hits"] += 1
+            else:
+                cached = await backend.get(key)
+                if cached is not None:
+                    counters["hits"] += 1
+                    entry = _serializer.loads(cached)
+                    if backend.shared:
+                        _local.set(key, entry, memory_ttl)
+
+            conditional = current_conditional()
+            if entry is not None:
+                if entry["fresh_until"] < time.time():
+                    counters["stale_hits"] += 1
+                    revalidate(backend, key, args, kwargs)
+                etag = entry.get("etag")
+                if conditional is not None and etag:
+                    conditional["etag"] = etag
+                    if etag_matches(conditional["if_none_match"], etag):
+                        counters["not_modified"] += 1
+                        return Response(status_code=304, headers={"ETag": etag})
+                response = _injected_response(kwargs, dependencies)
+                if response is not None:
+                    response.headers.update(entry.get("headers", {}))
+                return entry["data"]
+
+            counters["misses"] += 1
+            result, entry = await _single_flight(
+                key, lambda: compute(backend, key, args, kwargs)
+            )
+            # Followers never ran the handler, so their Response has no headers yet
+            response = _injected_response(kwargs, dependencies)
+            if response is not None:
+                response.headers.update(entry.get("headers", {}))
+            if conditional is not None:
+                conditional["etag"] = entry["etag"]
+            return result
+
+        def bind_route(route: APIRoute):
+            serializer["serialize"] = _route_serializer(route)
+
+        wrapper.cache_bind_route = bind_route
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
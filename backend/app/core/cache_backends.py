@@ -0,0 +1,351 @@
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds a tag's invalidation generation is remembered; computations
+# running longer than this could store a result older than a write
+GENERATION_TTL = 600
+
+class LocalLRU:
+    """
+    Size-bounded, per-worker LRU with a TTL per entry. `on_evict(key)` is
+    called whenever an entry leaves (expired, evicted or popped).
+    """
+
+    def __init__(self, maxsize: int, ttl: int, on_evict: Optional[Callable[[str], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _evicted(self, key: str):
+        if self.on_evict is not None:
+            self.on_evict(key)
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._evicted(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self._evicted(evicted)
+
+    def pop(self, key: str):
+        if self._data.pop(key, None) is not None:
+            self._evicted(key)
+
+    def clear(self):
+        keys = list(self._data)
+        self._data.clear()
+        for key in keys:
+            self._evicted(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class CacheBackend:
+    """
+    Storage used by core.cache. `shared` backends are visible to every
+    worker, so core.cache keeps an in-process tier in front of them and
+    relies on `listen()` to hear about invalidations from other workers.
+    """
+    name = "base"
+    shared = False
+
+    def __init__(self):
+        # Local pub/sub subscribers per channel; shared backends use their own transport
+        self._subscribers: "defaultdict[str, list]" = defaultdict(list)
+        # Tag -> monotonic time until which replica reads of it must not be cached
+        self._fences: dict = {}
+        # Invalidation sequence number, and per tag the last one (with its expiry)
+        self._generation = 0
+        self._tag_generations: dict = {}
+
+    async def ping(self):
+        pass
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, expire: int):
+        raise NotImplementedError
+
+    async def tag(self, key: str, tags: Iterable[str], expire: int):
+        """Register `key` under each tag so it can be invalidated later."""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> Set[str]:
+        """Delete every key registered under the tags and return them."""
+        raise NotImplementedError
+
+    async def generation(self) -> int:
+        """Sequence number of the latest invalidation."""
+        return self._generation
+
+    async def bump_generation(self, tags: Iterable[str]):
+        """Record an invalidation of `tags` under a new sequence number."""
+        now = time.monotonic()
+        self._generation += 1
+        for tag in tags:
+            self._tag_generations[tag] = (self._generation, now + GENERATION_TTL)
+        if len(self._tag_generations) > 10000:
+            for tag, (_, expires_at) in list(self._tag_generations.items()):
+                if expires_at < now:
+                    del self._tag_generations[tag]
+
+    async def changed_since(self, tags: Iterable[str], generation: int) -> bool:
+        """Whether any of the tags was invalidated after `generation` was read."""
+        return any(self._tag_generations.get(tag, (0, 0))[0] > generation for tag in tags)
+
+    async def fence(self, tags: Iterable[str], seconds: float):
+        """Mark tags as recently invalidated for `seconds`."""
+        until = time.monotonic() + seconds
+        for tag in tags:
+            self._fences[tag] = until
+
+    async def fenced(self, tags: Iterable[str]) -> bool:
+        """Whether any of the tags was invalidated within its fence window."""
+        now = time.monotonic()
+        for tag in tags:
+            until = self._fences.get(tag)
+            if until is not None:
+                if until >= now:
+                    return True
+                del self._fences[tag]
+        return False
+
+    async def listen(self, on_invalidate: Callable[[Optional[list]], None]):
+        """Call `on_invalidate(keys)` for invalidations made by other workers."""
+
+    async def publish(self, channel: str, message: str):
+        """Deliver `message` to every subscriber of `channel` (this worker only)."""
+        for on_message in list(self._subscribers.get(channel, ())):
+            on_message(message)
+
+    async def subscribe(self, channel: str, on_message: Callable[[str], None]):
+        """Call `on_message(message)` for each message published on `channel` until cancelled."""
+        subscribers = self._subscribers[channel]
+        subscribers.append(on_message)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            subscribers.remove(on_message)
+
+    async def close(self):
+        pass
+
+class NullBackend(CacheBackend):
+    """Caches nothing; every lookup is a miss."""
+    name = "none"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, expire: int):
+        pass
+
+    async def tag(self, key: str, tags: Iterable[str], expire: int):
+        pass
+
+    async def delete(self, key: str):
+        pass
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> Set[str]:
+        return set()
+
+class InMemoryBackend(CacheBackend):
+    """
+    Single-process backend for deployments without Redis. Invalidations
+    never reach other workers, so `max_ttl` (if set) caps every entry's
+    lifetime to bound how long another worker can serve a stale copy.
+    """
+    name = "memory"
+
+    def __init__(self, maxsize: int = 10000, max_ttl: Optional[int] = None):
+        super().__init__()
+        self.max_ttl = max_ttl
+        self._entries = LocalLRU(maxsize, ttl=60, on_evict=self._untag)
+        self._tags = defaultdict(set)
+        # Reverse index, so tag sets shrink as the LRU drops entries
+        self._key_tags = defaultdict(set)
+
+    def _untag(self, key: str):
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, expire: int):
+        if self.max_ttl:
+            expire = min(expire, self.max_ttl)
+        self._entries.set(key, value, expire)
+
+    async def tag(self, key: str, tags: Iterable[str], expire: int):
+        if key not in self._entries:
+            return
+        for tag in tags:
+            self._tags[tag].add(key)
+            self._key_tags[key].add(tag)
+
+    async def delete(self, key: str):
+        self._entries.pop(key)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> Set[str]:
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+        for key in keys:
+            self._entries.pop(key)
+        return keys
+
+# One atomic step: next sequence number, stamped on every invalidated tag
+_BUMP_GENERATION = """
+local generation = redis.call('INCR', KEYS[1])
+for i = 3, #ARGV do
+    redis.call('SET', ARGV[1] .. ':' .. ARGV[i], generation, 'EX', ARGV[2])
+end
+return generation
+"""
+
+class RedisBackend(CacheBackend):
+    """Redis storage with tag sets and pub/sub invalidation broadcast."""
+    name = "redis"
+    shared = True
+
+    def __init__(self, redis, prefix: str):
+        super().__init__()
+        self.redis = redis
+        self.prefix = prefix
+        self.tag_prefix = f"{prefix}:tag"
+        self.fence_prefix = f"{prefix}:fence"
+        self.generation_key = f"{prefix}:generation"
+        self.tag_generation_prefix = f"{prefix}:tag-generation"
+        self.channel = f"{prefix}:invalidate"
+
+    async def ping(self):
+        await self.redis.ping()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.redis.get(key)
+
+    async def set(self, key: str, value: bytes, expire: int):
+        await self.redis.set(key, value, ex=expire)
+
+    async def tag(self, key: str, tags: Iterable[str], expire: int):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                tag_key = f"{self.tag_prefix}:{tag}"
+                pipe.sadd(tag_key, key)
+                # Tag sets must outlive the longest entry they reference
+                pipe.expire(tag_key, expire, nx=True)
+                pipe.expire(tag_key, expire, gt=True)
+            await pipe.execute()
+
+    async def delete(self, key: str):
+        await self.redis.delete(key)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> Set[str]:
+        tag_keys = [f"{self.tag_prefix}:{tag}" for tag in tags]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+
+        keys = set()
+        for tagged in members:
+            keys.update(member.decode() for member in tagged)
+        await self.redis.delete(*tag_keys, *keys)
+        if keys:
+            await self.redis.publish(self.channel, json.dumps(sorted(keys)))
+        return keys
+
+    async def generation(self) -> int:
+        return int(await self.redis.get(self.generation_key) or 0)
+
+    async def bump_generation(self, tags: Iterable[str]):
+        tags = list(tags)
+        if tags:
+            await self.redis.eval(
+                _BUMP_GENERATION, 1, self.generation_key,
+                self.tag_generation_prefix, GENERATION_TTL, *tags
+            )
+
+    async def changed_since(self, tags: Iterable[str], generation: int) -> bool:
+        tags = list(tags)
+        if not tags:
+            return False
+        values = await self.redis.mget([f"{self.tag_generation_prefix}:{tag}" for tag in tags])
+        return any(int(value) > generation for value in values if value is not None)
+
+    async def fence(self, tags: Iterable[str], seconds: float):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.set(f"{self.fence_prefix}:{tag}", 1, px=max(int(seconds * 1000), 1))
+            await pipe.execute()
+
+    async def fenced(self, tags: Iterable[str]) -> bool:
+        keys = [f"{self.fence_prefix}:{tag}" for tag in tags]
+        return bool(keys) and await self.redis.exists(*keys) > 0
+
+    async def listen(self, on_invalidate: Callable[[Optional[list]], None]):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                # Messages may have been missed while disconnected
+                on_invalidate(None)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        on_invalidate(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation subscriber failed, reconnecting")
+                await asyncio.sleep(1)
+
+    async def publish(self, channel: str, message: str):
+        await self.redis.publish(f"{self.prefix}:{channel}", message)
+
+    async def subscribe(self, channel: str, on_message: Callable[[str], None]):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(f"{self.prefix}:{channel}")
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        on_message(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Subscriber for {channel} failed, reconnecting")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        await self.redis.close()
@@ -0,0 +1,89 @@
+from typing import Any, Tuple
+import logging
+import zlib
+import orjson
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Every payload starts with two marker bytes: format, then compression
+_FORMATS = {b"j": "orjson", b"m": "msgpack"}
+_CODECS = {b"-": "none", b"z": "zstd", b"l": "lz4", b"d": "zlib"}
+
+def _marker(table: dict, name: str) -> bytes:
+    return next(marker for marker, value in table.items() if value == name)
+
+class CacheSerializer:
+    """
+    Encodes cached payloads as compact bytes (orjson or msgpack) and
+    compresses them when they are at least `min_compress_size` bytes.
+    Decoding reads the marker bytes, so entries written with different
+    settings (e.g. during a rolling deploy) stay readable.
+    """
+
+    def __init__(self, fmt: str = "orjson", compression: str = "auto", min_compress_size: int = 1024):
+        if fmt == "msgpack" and msgpack is None:
+            logger.warning("msgpack is not installed, using orjson for the cache")
+            fmt = "orjson"
+        if compression == "auto":
+            compression = "zstd" if zstandard else "lz4" if lz4_frame else "zlib"
+        elif compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, using zlib for the cache")
+            compression = "zlib"
+        elif compression == "lz4" and lz4_frame is None:
+            logger.warning("lz4 is not installed, using zlib for the cache")
+            compression = "zlib"
+
+        self.format = fmt
+        self.compression = compression
+        self.min_compress_size = min_compress_size
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+    def _dumps(self, value: Any) -> bytes:
+        if self.format == "msgpack":
+            return msgpack.packb(value, use_bin_type=True)
+        return orjson.dumps(value)
+
+    def _compress(self, raw: bytes) -> Tuple[str, bytes]:
+        if self.compression == "none" or len(raw) < self.min_compress_size:
+            return "none", raw
+        if self.compression == "zstd":
+            return "zstd", self._zstd_compressor.compress(raw)
+        if self.compression == "lz4":
+            return "lz4", lz4_frame.compress(raw)
+        return "zlib", zlib.compress(raw, 6)
+
+    def dumps(self, value: Any) -> Tuple[bytes, int]:
+        """Return the stored payload and the uncompressed size."""
+        raw = self._dumps(value)
+        codec, body = self._compress(raw)
+        header = _marker(_FORMATS, self.format) + _marker(_CODECS, codec)
+        return header + body, len(raw)
+
+    def loads(self, payload: bytes) -> Any:
+        fmt, codec, body = _FORMATS[payload[:1]], _CODECS[payload[1:2]], payload[2:]
+        if codec == "zstd":
+            body = self._zstd_decompressor.decompress(body)
+        elif codec == "lz4":
+            body = lz4_frame.decompress(body)
+        elif codec == "zlib":
+            body = zlib.decompress(body)
+
+        if fmt == "msgpack":
+            return msgpack.unpackb(body, raw=False)
+        return orjson.loads(body)
@@ -0,0 +1,198 @@
+from sqlalchemy import event, select, func, text, inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+from collections import Counter
+from enum import Enum
+from typing import Dict, Optional
+import asyncio
+import logging
+import os
+from core.database import async_engine
+from core.cache import invalidate_tags
+from models.dashboard_counter import DashboardCounter
+from models.patient import Patient
+from models.appointment import Appointment
+from models.lab import LabTest
+from models.radiology import RadiologyScan
+from models.pharmacy import Prescription
+from models.billing import Billing
+from models.admission import PatientAdmission
+
+logger = logging.getLogger(__name__)
+
+# Seconds between full recounts that correct drift (bulk SQL, DB-level cascades)
+COUNTER_RECONCILE_INTERVAL = int(os.getenv("COUNTER_RECONCILE_INTERVAL", 3600))
+
+# Arbitrary key so only one worker reconciles at a time
+RECONCILE_LOCK_ID = 72_001_002
+
+# Attempts per run when a concurrent writer forces a serialization failure
+RECONCILE_ATTEMPTS = 3
+
+# Counted models and the columns whose values get their own counter
+COUNTED = {
+    Patient: ("category", "emergency"),
+    Appointment: ("status",),
+    LabTest: ("status",),
+    RadiologyScan: ("status",),
+    Prescription: ("status",),
+    Billing: (),
+    PatientAdmission: ("status",),
+}
+
+def _bucket(column, value) -> Optional[str]:
+    """Counter suffix for a column value, matching what the database stores."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(value).lower()
+    enum_class = getattr(column.type, "enum_class", None)
+    if enum_class is not None and not isinstance(value, Enum):
+        try:
+            value = enum_class(value)
+        except ValueError:
+            value = enum_class[value]
+    if isinstance(value, Enum):
+        return value.name
+    return str(value)
+
+def counter_name(model, column_name: Optional[str] = None, value=None) -> str:
+    """Name of the total counter for a model, or of one column value's counter."""
+    table = model.__table__
+    if column_name is None:
+        return table.name
+    return f"{table.name}:{column_name}:{_bucket(table.c[column_name], value)}"
+
+def _previous(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0], True
+    if history.unchanged:
+        return history.unchanged[0], True
+    return None, False
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session, flush_context):
+    """Apply counter deltas for this flush in the same transaction."""
+    deltas = Counter()
+    for sign, instances in ((1, session.new), (-1, session.deleted)):
+        for instance in instances:
+            columns = COUNTED.get(type(instance))
+            if columns is None:
+                continue
+            state = sa_inspect(instance)
+            deltas[counter_name(type(instance))] += sign
+            for key in columns:
+                value = state.dict.get(key) if sign > 0 else _previous(state, key)[0]
+                if value is not None:
+                    deltas[counter_name(type(instance), key, value)] += sign
+
+    for instance in session.dirty:
+        columns = COUNTED.get(type(instance))
+        if not columns:
+            continue
+        state = sa_inspect(instance)
+        for key in columns:
+            history = state.attrs[key].history
+            if not history.added:
+                continue
+            old, known = _previous(state, key)
+            if not known:
+                # Old value never loaded; leave it to reconciliation
+                continue
+            if old is not None:
+                deltas[counter_name(type(instance), key, old)] -= 1
+            if history.added[0] is not None:
+                deltas[counter_name(type(instance), key, history.added[0])] += 1
+
+    stmt = counter_upsert(deltas)
+    if stmt is None:
+        return
+    session.connection().execute(stmt)
+    # Cached dashboards read the counters, so invalidate them with the writes
+    session.info.setdefault("cache_tags", set()).add(DashboardCounter.__tablename__)
+
+def counter_upsert(deltas: Dict[str, int]):
+    """
+    Statement adding `deltas` to the counters, or None when there is
+    nothing to change. Writers that bypass the ORM (bulk loads) execute
+    it in their own transaction. Rows are written in name order, so
+    concurrent writers lock shared counters in the same order.
+    """
+    deltas = {name: delta for name, delta in sorted(deltas.items()) if delta}
+    if not deltas:
+        return None
+    stmt = insert(DashboardCounter).values(
+        [{"name": name, "value": delta} for name, delta in deltas.items()]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[DashboardCounter.name],
+        set_={"value": DashboardCounter.value + stmt.excluded.value, "updated_at": func.now()}
+    )
+
+async def read_counters(db: AsyncSession) -> Dict[str, int]:
+    result = await db.execute(select(DashboardCounter.name, DashboardCounter.value))
+    return dict(result.all())
+
+async def reconcile_counters(conn: AsyncConnection) -> Dict[str, int]:
+    """
+    Recount every counter from the source tables, upsert the absolute
+    values and delete counters whose rows no longer exist. Run it in a
+    REPEATABLE READ transaction: a writer committing a delta after the
+    counts were taken then makes this fail instead of being overwritten.
+    """
+    counts: Dict[str, int] = {}
+    for model, columns in COUNTED.items():
+        counts[counter_name(model)] = await conn.scalar(select(func.count()).select_from(model))
+        for key in columns:
+            column = model.__table__.c[key]
+            result = await conn.execute(select(column, func.count()).group_by(column))
+            for value, count in result.all():
+                if value is not None:
+                    counts[counter_name(model, key, value)] = count
+
+    await conn.execute(
+        DashboardCounter.__table__.delete()
+        .where(DashboardCounter.name.not_in(list(counts)))
+    )
+    if counts:
+        stmt = insert(DashboardCounter).values(
+            [{"name": name, "value": value} for name, value in sorted(counts.items())]
+        )
+        await conn.execute(stmt.on_conflict_do_update(
+            index_elements=[DashboardCounter.name],
+            set_={"value": stmt.excluded.value, "updated_at": func.now()}
+        ))
+    return counts
+
+async def _reconcile_once():
+    for attempt in range(1, RECONCILE_ATTEMPTS + 1):
+        try:
+            async with async_engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+                async with conn.begin():
+                    locked = await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": RECONCILE_LOCK_ID})
+                    if not locked:
+                        return
+                    counts = await reconcile_counters(conn)
+            break
+        except DBAPIError as exc:
+            # 40001: a writer changed a counter after the counts were taken
+            if getattr(exc.orig, "sqlstate", None) != "40001" or attempt == RECONCILE_ATTEMPTS:
+                raise
+            logger.info("Counter reconciliation raced a writer, retrying")
+    await invalidate_tags([DashboardCounter.__tablename__])
+    logger.info(f"Reconciled {len(counts)} dashboard counters")
+
+async def run_counter_reconciler():
+    """Background loop started with the app; one worker recounts per interval."""
+    while True:
+        await asyncio.sleep(COUNTER_RECONCILE_INTERVAL)
+        try:
+            await _reconcile_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Dashboard counter reconciliation failed")
@@ -0,0 +1,228 @@
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+import asyncio
+import os
+from core.database import AsyncSessionLocal
+from core.counters import counter_name, read_counters
+from models.doctor import Doctor
+from models.patient import Patient
+from models.appointment import Appointment, AppointmentStatus
+from models.lab import LabTest, LabTestStatus
+from models.radiology import RadiologyScan, RadiologyScanStatus
+from models.pharmacy import Prescription, PrescriptionStatus
+from models.billing import Billing
+from models.admission import PatientAdmission, AdmissionStatus
+
+# Serve totals from dashboard_counters (O(1)) instead of counting the tables
+DASHBOARD_COUNTERS = os.getenv("DASHBOARD_COUNTERS", "1") == "1"
+
+class Metric(NamedTuple):
+    label: str
+    # Rows counted; None counts the whole table
+    condition: Optional[Callable[[date], Any]] = None
+    # Maintained counter holding the same number; None = always counted live
+    counter: Optional[str] = None
+
+class MetricGroup(NamedTuple):
+    model: Any
+    metrics: List[Metric]
+    shape: Callable[[Dict[str, int]], Dict[str, Any]]
+
+def _status(model, status) -> Metric:
+    return Metric(status.name.lower(), lambda _: model.status == status, counter_name(model, "status", status))
+
+def _category(category: str) -> Metric:
+    return Metric(category, lambda _: Patient.category == category, counter_name(Patient, "category", category))
+
+# One group per table; each runs as a single COUNT(*) FILTER query
+METRIC_GROUPS: Dict[str, MetricGroup] = {
+    "patients": MetricGroup(Patient, [
+        Metric("total", counter=counter_name(Patient)),
+        _category("outpatient"),
+        _category("inpatient"),
+        _category("ICU"),
+        # Not IS TRUE, which the partial ix_patients_emergency index does not match
+        Metric("emergency", lambda _: Patient.emergency == True, counter_name(Patient, "emergency", True)),  # noqa: E712
+    ], lambda row: {
+        "total_patients": row["total"],
+        "patient_distribution": {
+            "outpatients": row["outpatient"],
+            "inpatients": row["inpatient"],
+            "icu": row["ICU"],
+            "emergency": row["emergency"]
+        }
+    }),
+    "appointments": MetricGroup(Appointment, [
+        Metric("total", counter=counter_name(Appointment)),
+        _status(Appointment, AppointmentStatus.PENDING),
+        Metric("completed_today", lambda today: (Appointment.status == AppointmentStatus.COMPLETED) & (Appointment.datetime >= today)),
+        Metric("pending_today", lambda today: (Appointment.status == AppointmentStatus.PENDING) & (Appointment.datetime >= today)),
+    ], lambda row: {
+        "total_appointments": row["total"],
+        "pending_appointments": row["pending"],
+        "appointments_data": {
+            "completed": row["completed_today"],
+            "pending": row["pending_today"]
+        }
+    }),
+    "lab_tests": MetricGroup(LabTest, [
+        Metric("total", counter=counter_name(LabTest)),
+        _status(LabTest, LabTestStatus.PENDING),
+        _status(LabTest, LabTestStatus.IN_PROGRESS),
+    ], lambda row: {
+        "total_lab_tests": row["total"],
+        "pending_lab_tests": row["pending"],
+        "lab_tests_in_progress": row["in_progress"]
+    }),
+    "radiology": MetricGroup(RadiologyScan, [
+        Metric("total", counter=counter_name(RadiologyScan)),
+        _status(RadiologyScan, RadiologyScanStatus.PENDING),
+        _status(RadiologyScan, RadiologyScanStatus.IN_PROGRESS),
+    ], lambda row: {
+        "total_scans": row["total"],
+        "Pending_scans": row["pending"],
+        "scans_in_progress": row["in_progress"]
+    }),
+    "prescriptions": MetricGroup(Prescription, [
+        Metric("total", counter=counter_name(Prescription)),
+        _status(Prescription, PrescriptionStatus.PENDING),
+    ], lambda row: {
+        "total_prescriptions": row["total"],
+        "pending_prescriptions": row["pending"]
+    }),
+    "billing": MetricGroup(Billing, [
+        Metric("total", counter=counter_name(Billing)),
+    ], lambda row: {"total_billing_transactions": row["total"]}),
+    "admissions": MetricGroup(PatientAdmission, [
+        Metric("total", counter=counter_name(PatientAdmission)),
+        _status(PatientAdmission, AdmissionStatus.ADMITTED),
+        _status(PatientAdmission, AdmissionStatus.DISCHARGED),
+    ], lambda row: {
+        "total_admissions": row["total"],
+        "admissions_data": {
+            "admitted": row["admitted"],
+            "discharged": row["discharged"]
+        }
+    }),
+}
+
+def _aggregate(group: MetricGroup, metrics: List[Metric], today: date):
+    stmt = select(*(
+        (func.count().filter(metric.condition(today)) if metric.condition else func.count()).label(metric.label)
+        for metric in metrics
+    )).select_from(group.model)
+    if all(metric.condition for metric in metrics):
+        # Only matching rows are needed, which lets the planner use an index
+        stmt = stmt.where(or_(*(metric.condition(today) for metric in metrics)))
+    return stmt
+
+async def _fetch_row(stmt, session: AsyncSession) -> Dict[str, int]:
+    result = await session.execute(stmt)
+    return dict(result.mappings().one())
+
+async def _with_session(fetch: Callable, db: Optional[AsyncSession]):
+    if db is not None:
+        return await fetch(db)
+    async with AsyncSessionLocal(info={"read_only": True}) as session:
+        return await fetch(session)
+
+async def collect_doctor_metrics(doctor_id: int, db: Optional[AsyncSession]) -> Dict[str, Any]:
+    """Patients assigned to a doctor and their pending/confirmed appointments."""
+    async def fetch(session: AsyncSession) -> Dict[str, Any]:
+        my_patients = await session.scalar(
+            select(func.count(Patient.id))
+            .where(Patient.assigned_doctor_id == doctor_id)
+        )
+        result = await session.execute(
+            select(
+                func.count().filter(Appointment.status == AppointmentStatus.PENDING),
+                func.count().filter(Appointment.status == AppointmentStatus.CONFIRMED)
+            )
+            .where(Appointment.doctor_id == doctor_id)
+        )
+        pending, confirmed = result.one()
+        return {
+            "my_patients": my_patients,
+            "my_pending_appointments": pending,
+            "my_confirmed_appointments": confirmed
+        }
+    return await _with_session(fetch, db)
+
+async def collect_doctors_metrics(specialization: Optional[str], db: AsyncSession) -> List[Dict[str, Any]]:
+    """
+    Per-doctor workload for every doctor (optionally one specialization) in
+    a single statement: patients and appointments are each grouped by
+    doctor in a subquery, then left-joined so the counts don't multiply.
+    """
+    patients = (
+        select(Patient.assigned_doctor_id.label("doctor_id"), func.count().label("patients"))
+        .where(Patient.assigned_doctor_id.is_not(None))
+        .group_by(Patient.assigned_doctor_id)
+        .subquery()
+    )
+    appointments = (
+        select(
+            Appointment.doctor_id,
+            func.count().filter(Appointment.status == AppointmentStatus.PENDING).label("pending"),
+            func.count().filter(Appointment.status == AppointmentStatus.CONFIRMED).label("confirmed")
+        )
+        .where(Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED]))
+        .group_by(Appointment.doctor_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Doctor.id.label("doctor_id"),
+            Doctor.full_name,
+            Doctor.specialization,
+            func.coalesce(patients.c.patients, 0).label("patients"),
+            func.coalesce(appointments.c.pending, 0).label("pending_appointments"),
+            func.coalesce(appointments.c.confirmed, 0).label("confirmed_appointments")
+        )
+        .outerjoin(patients, patients.c.doctor_id == Doctor.id)
+        .outerjoin(appointments, appointments.c.doctor_id == Doctor.id)
+        .order_by(Doctor.full_name, Doctor.id)
+    )
+    if specialization:
+        stmt = stmt.where(func.lower(Doctor.specialization) == specialization.lower())
+    result = await db.execute(stmt)
+    return [dict(row) for row in result.mappings()]
+
+async def collect_metrics(groups: Iterable[str], db: AsyncSession) -> Dict[str, Any]:
+    """
+    Build the requested metric groups. With DASHBOARD_COUNTERS, counted
+    metrics come from one read of dashboard_counters and only metrics
+    without a counter (today's appointments) hit their table. Queries
+    run concurrently; the first reuses the request's session.
+    """
+    today = datetime.now().date()
+    selected = [METRIC_GROUPS[name] for name in groups]
+    live = [
+        [metric for metric in group.metrics if not (DASHBOARD_COUNTERS and metric.counter)]
+        for group in selected
+    ]
+    use_counters = any(len(metrics) < len(group.metrics) for group, metrics in zip(selected, live))
+
+    fetches = [
+        partial(_fetch_row, _aggregate(group, metrics, today))
+        for group, metrics in zip(selected, live) if metrics
+    ]
+    if use_counters:
+        fetches.append(read_counters)
+    results = await asyncio.gather(*(
+        _with_session(fetch, db if i == 0 else None) for i, fetch in enumerate(fetches)
+    ))
+    counters = results.pop() if use_counters else {}
+    rows = iter(results)
+
+    metrics: Dict[str, Any] = {}
+    for group, live_metrics in zip(selected, live):
+        row = next(rows) if live_metrics else {}
+        for metric in group.metrics:
+            if metric.label not in row:
+                row[metric.label] = counters.get(metric.counter, 0)
+        metrics.update(group.shape(row))
+    return metrics
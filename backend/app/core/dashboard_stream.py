@@ -0,0 +1,191 @@
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+import os
+from core.cache import publish, subscribe
+from core.dashboard_metrics import METRIC_GROUPS, collect_metrics, collect_doctor_metrics
+from models.patient import Patient
+from models.appointment import Appointment
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel announcing which dashboard tables a commit wrote
+DASHBOARD_CHANNEL = "dashboard"
+
+# Seconds to coalesce change announcements before recomputing the metrics
+DASHBOARD_STREAM_DEBOUNCE = float(os.getenv("DASHBOARD_STREAM_DEBOUNCE", 1.0))
+
+# Seconds between full recomputes, catching writes made outside the ORM and the date rollover
+DASHBOARD_STREAM_RESYNC = int(os.getenv("DASHBOARD_STREAM_RESYNC", 60))
+
+# Seconds between SSE comments that keep idle connections open through proxies
+DASHBOARD_STREAM_KEEPALIVE = int(os.getenv("DASHBOARD_STREAM_KEEPALIVE", 15))
+
+# Tables whose writes can change a dashboard metric
+DASHBOARD_TABLES = {group.model.__tablename__ for group in METRIC_GROUPS.values()}
+DOCTOR_TABLES = {Patient.__tablename__, Appointment.__tablename__}
+
+# Keep references to fire-and-forget announcements until they finish
+_tasks: set = set()
+
+@event.listens_for(Session, "after_flush")
+def _track_dashboard_writes(session, flush_context):
+    changed = session.info.setdefault("dashboard_changes", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        changed.update(
+            table.name for table in sa_inspect(instance).mapper.tables
+            if table.name in DASHBOARD_TABLES
+        )
+
+@event.listens_for(Session, "after_commit")
+def _announce_after_commit(session):
+    tables = session.info.pop("dashboard_changes", None)
+    if not tables:
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(
+            publish(DASHBOARD_CHANNEL, json.dumps(sorted(tables)))
+        )
+    except RuntimeError:
+        # No running event loop (sync session outside the app)
+        return
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("dashboard_changes", None)
+
+class _Subscriber:
+    """One stream; changes accumulate in `pending` until the stream sends them."""
+
+    def __init__(self, doctor_id: Optional[int]):
+        self.doctor_id = doctor_id
+        self.pending: Dict[str, Any] = {}
+        self.ready = asyncio.Event()
+
+    def push(self, delta: Dict[str, Any]):
+        if delta:
+            self.pending.update(delta)
+            self.ready.set()
+
+    def take(self) -> Dict[str, Any]:
+        delta, self.pending = self.pending, {}
+        self.ready.clear()
+        return delta
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+class DashboardBroadcaster:
+    """
+    Per-worker fan-out of dashboard metrics to SSE subscribers. Commits on
+    any worker announce the dashboard tables they wrote on DASHBOARD_CHANNEL;
+    each worker then recomputes the metrics once, however many clients it
+    serves, and pushes only the values that changed.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[_Subscriber] = set()
+        # Last values pushed: "metrics" for the global ones, doctor ids for theirs
+        self._snapshots: Dict[Any, Dict[str, Any]] = {}
+        self._changed: Set[str] = set()
+        self._refresh: Optional[asyncio.Task] = None
+
+    def _doctor_ids(self) -> Set[int]:
+        return {s.doctor_id for s in self._subscribers if s.doctor_id is not None}
+
+    async def subscribe(self, doctor_id: Optional[int] = None) -> _Subscriber:
+        """Register a stream, primed with the full current metrics."""
+        # Snapshots are only kept fresh while someone is subscribed
+        if not self._subscribers:
+            self._snapshots["metrics"] = await collect_metrics(METRIC_GROUPS, None)
+        if doctor_id is not None and doctor_id not in self._doctor_ids():
+            self._snapshots[doctor_id] = await collect_doctor_metrics(doctor_id, None)
+
+        subscriber = _Subscriber(doctor_id)
+        subscriber.push(self._snapshots["metrics"])
+        if doctor_id is not None:
+            subscriber.push(self._snapshots[doctor_id])
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        self._subscribers.discard(subscriber)
+        if subscriber.doctor_id is not None and subscriber.doctor_id not in self._doctor_ids():
+            self._snapshots.pop(subscriber.doctor_id, None)
+
+    def on_message(self, message: str):
+        self.mark_changed(json.loads(message))
+
+    def mark_changed(self, tables: Iterable[str]):
+        self._changed.update(tables)
+        if self._subscribers and self._refresh is None:
+            self._refresh = asyncio.get_running_loop().create_task(self._refresh_soon())
+
+    async def _refresh_soon(self):
+        try:
+            while self._changed and self._subscribers:
+                await asyncio.sleep(DASHBOARD_STREAM_DEBOUNCE)
+                tables, self._changed = self._changed, set()
+                try:
+                    await self._push(tables)
+                except Exception:
+                    logger.exception("Failed to refresh streamed dashboard metrics")
+        finally:
+            self._refresh = None
+
+    async def _push(self, tables: Set[str]):
+        deltas: Dict[Any, Dict[str, Any]] = {}
+        targets = ["metrics"]
+        if tables & DOCTOR_TABLES:
+            targets.extend(self._doctor_ids())
+        results = await asyncio.gather(*(
+            collect_metrics(METRIC_GROUPS, None) if target == "metrics"
+            else collect_doctor_metrics(target, None)
+            for target in targets
+        ))
+        for target, values in zip(targets, results):
+            deltas[target] = _diff(self._snapshots.get(target, {}), values)
+            self._snapshots[target] = values
+
+        for subscriber in self._subscribers:
+            subscriber.push(deltas["metrics"])
+            if subscriber.doctor_id in deltas:
+                subscriber.push(deltas[subscriber.doctor_id])
+
+    async def run(self):
+        """Listen for change announcements and resync periodically; runs until cancelled."""
+        listener = asyncio.get_running_loop().create_task(subscribe(DASHBOARD_CHANNEL, self.on_message))
+        try:
+            while True:
+                await asyncio.sleep(DASHBOARD_STREAM_RESYNC)
+                self.mark_changed(DASHBOARD_TABLES)
+        finally:
+            listener.cancel()
+            if self._refresh is not None:
+                self._refresh.cancel()
+
+broadcaster = DashboardBroadcaster()
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def dashboard_events(doctor_id: Optional[int] = None) -> AsyncIterator[str]:
+    """SSE body for one client: full metrics first, then changed keys only."""
+    subscriber = await broadcaster.subscribe(doctor_id)
+    try:
+        # Reconnect delay (ms) for clients that honour it
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                await asyncio.wait_for(subscriber.ready.wait(), DASHBOARD_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _event("metrics", subscriber.take())
+    finally:
+        broadcaster.unsubscribe(subscriber)
@@ -1,7 +1,12 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, Insert, Update, Delete
+from contextvars import ContextVar
+from itertools import cycle
+from typing import Awaitable, Callable, List
+import hashlib
+import time
 import os
 from dotenv import load_dotenv
 
@@ -15,25 +20,142 @@ db_password = os.getenv("PASS")
 db_domain = os.getenv("DOMAIN")
 db_name = os.getenv("DB_NAME")
 
+# Log every SQL statement (development only)
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
+
+# Optional read replicas, e.g. REPLICA_HOSTS="replica1:5432,replica2"
+replica_hosts = [host.strip() for host in os.getenv("REPLICA_HOSTS", "").split(",") if host.strip()]
+
+# Seconds a client keeps reading from the primary after it wrote something
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+
 # Database URLs
 ASYNC_DATABASE_URL = f'postgresql+asyncpg://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
 SYNC_DATABASE_URL = f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
 
+def _replica_url(host: str) -> str:
+    host, _, port = host.partition(":")
+    return f'postgresql+asyncpg://{db_user}:{db_password}@{host}:{port or db_port}/{db_name}'
+
 # Create SQLAlchemy engines
-async_engine = create_async_engine(ASYNC_DATABASE_URL,echo=True,pool_size=10,max_overflow=20,pool_pre_ping=True)
+async_engine = create_async_engine(ASYNC_DATABASE_URL,echo=SQL_ECHO,pool_size=10,max_overflow=20,pool_pre_ping=True)
+
+replica_engines = [
+    create_async_engine(_replica_url(host),echo=SQL_ECHO,pool_size=10,max_overflow=20,pool_pre_ping=True)
+    for host in replica_hosts
+]
+_replica_cycle = cycle(range(len(replica_engines))) if replica_engines else None
+
+# Same pools, but transactions start with BEGIN READ ONLY
+_read_only_primary = async_engine.execution_options(postgresql_readonly=True)
+_read_only_replicas = [engine.execution_options(postgresql_readonly=True) for engine in replica_engines]
 
-sync_engine = create_engine(SYNC_DATABASE_URL,echo=True,pool_size=10,max_overflow=20,pool_pre_ping=True)
+sync_engine = create_engine(SYNC_DATABASE_URL,echo=SQL_ECHO,pool_size=10,max_overflow=20,pool_pre_ping=True)
+
+# Set per request by DatabaseRoutingMiddleware: True when reads may go to a replica
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+# Principal -> monotonic time until which its reads stay on the primary.
+# Kept per worker; run with sticky sessions if workers must share the window.
+_recent_writers = {}
+
+def replica_reads_enabled() -> bool:
+    """Whether reads in the current request may be served by a replica."""
+    return _replica_cycle is not None and _use_replica.get()
+
+class RoutingSession(Session):
+    """
+    Sends reads to a replica when the current request allows it and
+    everything else (flushes, DML, sessions that already wrote) to the
+    primary. Without replicas or outside a request, all traffic uses the
+    primary. Sessions opened with info={"read_only": True} never write
+    and run in a READ ONLY transaction.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        read_only = self.info.get("read_only", False)
+        if not read_only and (
+            self.info.get("primary") or self._flushing or isinstance(clause, (Insert, Update, Delete))
+        ):
+            # Keep the rest of this session on the primary so it sees its own writes
+            self.info["primary"] = True
+            return async_engine.sync_engine
+        if _replica_cycle is not None and _use_replica.get():
+            # One replica per session, so all of its reads share a snapshot
+            if "replica" not in self.info:
+                self.info["replica"] = next(_replica_cycle)
+            index = self.info["replica"]
+            engine = _read_only_replicas[index] if read_only else replica_engines[index]
+            return engine.sync_engine
+        return _read_only_primary.sync_engine if read_only else async_engine.sync_engine
 
 # Session makers
-AsyncSessionLocal = sessionmaker(bind=async_engine,class_=AsyncSession,expire_on_commit=False,autoflush=False)
+AsyncSessionLocal = sessionmaker(class_=AsyncSession,sync_session_class=RoutingSession,expire_on_commit=False,autoflush=False)
 
 SyncSessionLocal = sessionmaker(bind=sync_engine,autocommit=False,autoflush=False)
 
 Base = declarative_base()
 
+def _principal_key(headers: dict) -> bytes:
+    # Bearer tokens identify the caller without decoding the JWT here
+    authorization = headers.get(b"authorization")
+    if not authorization:
+        return b""
+    return hashlib.blake2b(authorization, digest_size=16).digest()
+
+class DatabaseRoutingMiddleware:
+    """
+    Lets GET/HEAD requests read from a replica unless the same client
+    wrote within READ_YOUR_WRITES_WINDOW seconds; other methods always
+    use the primary and open a new window for their client.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        principal = _principal_key(dict(scope["headers"]))
+        now = time.monotonic()
+        if scope["method"] in ("GET", "HEAD"):
+            pinned_until = _recent_writers.get(principal)
+            if pinned_until is not None and pinned_until < now:
+                del _recent_writers[principal]
+                pinned_until = None
+            token = _use_replica.set(pinned_until is None)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _use_replica.reset(token)
+            return
+
+        token = _use_replica.set(False)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _use_replica.reset(token)
+            now = time.monotonic()
+            _recent_writers[principal] = now + READ_YOUR_WRITES_WINDOW
+            if len(_recent_writers) > 10000:
+                for key, pinned_until in list(_recent_writers.items()):
+                    if pinned_until < now:
+                        del _recent_writers[key]
+
+async def dispose_engines():
+    await async_engine.dispose()
+    for engine in replica_engines:
+        await engine.dispose()
+
+# Awaited with each get_async_db session once the handler is done, before
+# the response is sent; core.cache registers its invalidation here
+after_commit_hooks: List[Callable[[AsyncSession], Awaitable[None]]] = []
+
 # Dependency to get async DB session
 async def get_async_db():
-    async with AsyncSessionLocal() as db:
+    async with AsyncSessionLocal(info={"await_invalidation": True}) as db:
         try:
             yield db
             await db.commit()
@@ -41,8 +163,16 @@ async def get_async_db():
             await db.rollback()
             raise
         finally:
+            # Handlers may have committed before failing, so this runs either way
+            for hook in after_commit_hooks:
+                await hook(db)
             await db.close()
 
+# Dependency for read-only handlers: no flush, no commit, replica-capable
+async def get_async_read_db():
+    async with AsyncSessionLocal(info={"read_only": True}) as db:
+        yield db
+
 # Dependency to get sync DB session (for operations that don't support async)
 def get_sync_db():
     db = SyncSessionLocal()
@@ -53,4 +183,4 @@ def get_sync_db():
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,9 +1,9 @@
 from fastapi import Depends, HTTPException, status, Header
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from jose import JWTError, jwt
 from typing import Union
-from core.database import get_async_db
+import os
+from core.database import AsyncSessionLocal
+from core.cache import CACHE_PREFIX, current_generation, get_value, set_value, invalidate_tags
 from models.user import User
 from models.patient import Patient
 from core.security import SECRET_KEY, ALGORITHM
@@ -12,9 +12,45 @@ from fastapi.security import OAuth2PasswordBearer
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Seconds an authenticated principal is served from cache instead of the database
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+
+# Everything handlers and RoleChecker read from the current user
+PRINCIPAL_FIELDS = ("id", "full_name", "email", "role", "is_active")
+
+def _principal_tag(kind: str, user_id) -> str:
+    return f"principal:{kind}:{user_id}"
+
+async def invalidate_principal(user_id, kind: str = "user"):
+    """Drop a cached principal (kind "user" or "patient") on every worker."""
+    await invalidate_tags([_principal_tag(kind, user_id)])
+
+async def _load_principal(model, kind: str, user_id: int, role: str):
+    key = f"{CACHE_PREFIX}:principal:{kind}:{user_id}:{role}"
+    fields = await get_value(key, PRINCIPAL_CACHE_TTL)
+    if fields is not None:
+        # Detached copy holding only the principal fields
+        return model(**fields)
+
+    # Read before loading: an invalidation in between keeps the row out of the cache
+    generation = await current_generation()
+    # Own short session on the primary: a replica may not have the latest
+    # role or deactivation yet, and the connection is returned before the
+    # handler takes one for its own session
+    async with AsyncSessionLocal(info={"primary": True}) as db:
+        user = await db.get(model, user_id)
+    if user is None:
+        return None
+    columns = model.__mapper__.columns.keys()
+    fields = {name: getattr(user, name) for name in PRINCIPAL_FIELDS if name in columns}
+    await set_value(
+        key, fields, PRINCIPAL_CACHE_TTL,
+        tags=[_principal_tag(kind, user_id)], generation=generation
+    )
+    return user
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_async_db)
+    token: str = Depends(oauth2_scheme)
 ) -> Union[User, Patient]:
     """
     Async function to extract the current user from the JWT token.
@@ -33,17 +69,17 @@ async def get_current_user(
         
         if not user_id or not role:
             raise credentials_exception
+
+        # "sub" is a string claim; compared as-is it would be bound as VARCHAR against the integer id
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            raise credentials_exception
             
         if role == "patient":
-            result = await db.execute(
-                select(Patient).where(Patient.id == user_id)
-            )
-            user = result.scalars().first()
+            user = await _load_principal(Patient, "patient", user_id, role)
         else:
-            result = await db.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = result.scalars().first()
+            user = await _load_principal(User, "user", user_id, role)
         
         if user is None:
             raise credentials_exception
@@ -0,0 +1,93 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import hashlib
+
+# Per-request conditional GET state, shared between the middleware and core.cache
+_conditional: ContextVar[Optional[Dict[str, Any]]] = ContextVar("conditional_get", default=None)
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body or cached payload."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def current_conditional() -> Optional[Dict[str, Any]]:
+    """Conditional GET state of the current request, if any."""
+    return _conditional.get()
+
+class ETagMiddleware:
+    """
+    Adds a strong ETag to successful JSON GET responses and answers
+    304 Not Modified when the client's If-None-Match already matches.
+
+    Cached endpoints provide the ETag of their cached content up front
+    (see core.cache), which lets them skip serialization entirely on a
+    match. Other responses are hashed from the rendered body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        state = {"if_none_match": headers.get(b"if-none-match", b"").decode(), "etag": None}
+        token = _conditional.set(state)
+
+        start_message = None
+        body = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                response_headers = dict(message.get("headers", []))
+                content_type = response_headers.get(b"content-type", b"")
+                if (
+                    message["status"] != 200
+                    or b"etag" in response_headers
+                    or not content_type.startswith(b"application/json")
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            content = b"".join(body)
+            etag = state["etag"] or compute_etag(content)
+            if etag_matches(state["if_none_match"], etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag.encode())]
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            start_message["headers"] = [
+                *start_message.get("headers", []),
+                (b"etag", etag.encode())
+            ]
+            await send(start_message)
+            await send({"type": "http.response.body", "body": content})
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _conditional.reset(token)
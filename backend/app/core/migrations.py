@@ -0,0 +1,221 @@
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+import asyncio
+import logging
+import time
+from core.database import Base
+from core.counters import reconcile_counters
+from core.rollups import refresh_rollups
+
+# Every model module the app uses must be imported so the baseline sees all
+# tables (models.icu is unused and clashes with admission.ICUPatient)
+from models import (  # noqa: F401
+    admission, appointment, billing, dashboard_counter, doctor, lab,
+    medical_records, metric_rollup, nurse, patient, pharmacy, radiology,
+    refresh_token, user
+)
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key shared by every worker that may try to migrate at once
+MIGRATION_LOCK_ID = 72_001_001
+
+# Seconds between attempts to take the migration lock while another worker holds it
+MIGRATION_LOCK_POLL = 1.0
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+    # Statements such as CREATE INDEX CONCURRENTLY cannot run in a transaction
+    transactional: bool = True
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, name: str, transactional: bool = True):
+    """Register an upgrade step. Versions must be unique and increasing."""
+    def register(upgrade):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} must come after {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, name, upgrade, transactional))
+        return upgrade
+    return register
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+@migration(1, "baseline schema")
+async def baseline(conn: AsyncConnection):
+    # Idempotent, so databases created before migrations existed adopt it cleanly
+    await conn.run_sync(Base.metadata.create_all)
+
+async def create_indexes_concurrently(conn: AsyncConnection, names: List[str]):
+    """
+    Build model indexes without blocking writes. Needs an autocommit
+    connection. An invalid leftover from an interrupted build is dropped
+    and rebuilt instead of being skipped by IF NOT EXISTS.
+    """
+    indexes = {
+        index.name: index
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+    }
+    for name in names:
+        invalid = await conn.scalar(
+            text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": name}
+        )
+        if invalid:
+            await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        ddl = str(CreateIndex(indexes[name], if_not_exists=True).compile(dialect=conn.dialect))
+        await conn.execute(text(ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+
+@migration(2, "hot query indexes", transactional=False)
+async def hot_query_indexes(conn: AsyncConnection):
+    # Derived from the dashboard counts and list filters in the routers
+    await create_indexes_concurrently(conn, [
+        "ix_appointments_doctor_status",
+        "ix_appointments_status_datetime",
+        "ix_appointments_patient_id",
+        "ix_patients_assigned_doctor_id",
+        "ix_patients_category",
+        "ix_patients_emergency",
+        "ix_patient_admissions_status",
+        "ix_patient_admissions_patient_id",
+        "ix_inpatients_admission_id",
+        "ix_beds_ward_occupied",
+        "ix_beds_ward_free",
+        "ix_patient_vitals_patient_recorded",
+        "ix_lab_tests_status",
+        "ix_lab_tests_requested_by",
+        "ix_prescriptions_status",
+        "ix_prescriptions_patient_id",
+        "ix_radiology_scans_status",
+        "ix_radiology_scans_requested_by",
+    ])
+    await conn.execute(text("ANALYZE"))
+
+@migration(3, "refresh tokens")
+async def refresh_tokens(conn: AsyncConnection):
+    table = Base.metadata.tables["refresh_tokens"]
+    await conn.run_sync(lambda sync_conn: table.create(sync_conn, checkfirst=True))
+
+@migration(4, "dashboard counters")
+async def dashboard_counters(conn: AsyncConnection):
+    table = Base.metadata.tables["dashboard_counters"]
+    await conn.run_sync(lambda sync_conn: table.create(sync_conn, checkfirst=True))
+    # Seed from the current data; writes keep the counters up to date from here
+    await reconcile_counters(conn)
+
+@migration(5, "metric rollups")
+async def metric_rollups(conn: AsyncConnection):
+    for name in ("metric_rollups_hourly", "metric_rollups_daily"):
+        table = Base.metadata.tables[name]
+        await conn.run_sync(lambda sync_conn: table.create(sync_conn, checkfirst=True))
+    # Backfill from all history; the background job keeps recent buckets current
+    await refresh_rollups(conn)
+
+@migration(6, "patient pagination index", transactional=False)
+async def patient_pagination_index(conn: AsyncConnection):
+    await create_indexes_concurrently(conn, ["ix_patients_created_at_id"])
+
+@migration(7, "patient search indexes", transactional=False)
+async def patient_search_indexes(conn: AsyncConnection):
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await create_indexes_concurrently(conn, [
+        "ix_patients_full_name_trgm",
+        "ix_patients_email_trgm",
+        "ix_patients_contact_number_trgm",
+    ])
+
+@migration(8, "appointment change index", transactional=False)
+async def appointment_change_index(conn: AsyncConnection):
+    await create_indexes_concurrently(conn, ["ix_appointments_updated_at"])
+
+async def _current_version(conn: AsyncConnection) -> Optional[int]:
+    """Applied schema version, or None when schema_version does not exist yet."""
+    exists = await conn.scalar(text("SELECT to_regclass('schema_version') IS NOT NULL"))
+    if not exists:
+        return None
+    return await conn.scalar(text("SELECT COALESCE(MAX(version), 0) FROM schema_version"))
+
+async def _apply(engine: AsyncEngine, step: Migration):
+    start = time.perf_counter()
+    record = text("INSERT INTO schema_version (version, name) VALUES (:version, :name)")
+    if step.transactional:
+        async with engine.begin() as conn:
+            await step.upgrade(conn)
+            await conn.execute(record, {"version": step.version, "name": step.name})
+    else:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await step.upgrade(conn)
+            await conn.execute(record, {"version": step.version, "name": step.name})
+    logger.info(f"Applied migration {step.version} ({step.name}) in {time.perf_counter() - start:.2f}s")
+
+async def migrate(engine: AsyncEngine) -> int:
+    """
+    Bring the schema up to date. Workers serialize on a Postgres advisory
+    lock, so only one applies migrations and the rest just re-check the
+    version once it is released. Returns the resulting schema version.
+
+    Waiting workers poll pg_try_advisory_lock instead of blocking in
+    pg_advisory_lock: a statement waiting on the lock holds a snapshot,
+    and CREATE INDEX CONCURRENTLY in the holder's migrations would wait
+    for it in turn.
+    """
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        while not await lock_conn.scalar(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+        ):
+            await asyncio.sleep(MIGRATION_LOCK_POLL)
+        try:
+            await lock_conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_version ("
+                "version INTEGER PRIMARY KEY, "
+                "name VARCHAR NOT NULL, "
+                "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+            ))
+            current = await _current_version(lock_conn) or 0
+            for step in MIGRATIONS:
+                if step.version > current:
+                    await _apply(engine, step)
+                    current = step.version
+            return current
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+async def ensure_schema(engine: AsyncEngine, apply: bool = True) -> int:
+    """
+    Startup check: a single version query when the schema is current.
+    Otherwise runs the pending migrations (or refuses to start when
+    `apply` is False, for deployments that migrate out of band).
+    """
+    async with engine.connect() as conn:
+        try:
+            current = await _current_version(conn)
+        except DBAPIError:
+            current = None
+
+    target = latest_version()
+    if current is not None and current >= target:
+        return current
+    if not apply:
+        raise RuntimeError(f"Database schema is at version {current}, expected {target}; run migrations first")
+    return await migrate(engine)
+
+if __name__ == "__main__":
+    # python -m core.migrations (from backend/app)
+    from core.database import async_engine
+
+    async def main():
+        version = await migrate(async_engine)
+        print(f"Schema at version {version}")
+        await async_engine.dispose()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
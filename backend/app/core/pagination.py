@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Any, Tuple
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor pointing just past the row with this (created_at, id)."""
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_fields(fields: str, allowed: Any, default: Any) -> list:
+    """Validate a comma-separated `fields=` projection against the allowed names."""
+    if not fields:
+        return list(default)
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return requested
+
+async def estimate_count(db: AsyncSession, stmt) -> int:
+    """
+    Row count the planner expects `stmt` to return, read from EXPLAIN and
+    table statistics instead of running COUNT(*). Accuracy depends on how
+    recently the table was analyzed.
+    """
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
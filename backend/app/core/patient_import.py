@@ -0,0 +1,259 @@
+from asyncpg import InterfaceError, PostgresError
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter
+from datetime import datetime, time, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import codecs
+import csv
+import io
+import logging
+import os
+from core.counters import counter_name, counter_upsert
+from models.doctor import Doctor
+from models.patient import Patient
+from schemas.patients import PatientCreate
+from utils.security import generate_password, hash_passwords_bulk
+
+logger = logging.getLogger(__name__)
+
+# Rows validated, hashed and loaded per transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("PATIENT_IMPORT_CHUNK_SIZE", 1000))
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Staging columns, in COPY order; rows move to patients with INSERT ... ON CONFLICT
+STAGING_COLUMNS = [
+    "row_number", "full_name", "date_of_birth", "gender", "contact_number", "email",
+    "hashed_password", "address", "category", "emergency", "assigned_doctor_id", "registered_by"
+]
+
+CREATE_STAGING = text("""
+    CREATE TEMP TABLE patient_import (
+        row_number integer NOT NULL,
+        full_name varchar NOT NULL,
+        date_of_birth timestamptz NOT NULL,
+        gender gender_enum NOT NULL,
+        contact_number varchar NOT NULL,
+        email varchar NOT NULL,
+        hashed_password varchar NOT NULL,
+        address text NOT NULL,
+        category patient_category NOT NULL,
+        emergency boolean NOT NULL,
+        assigned_doctor_id integer,
+        registered_by integer NOT NULL
+    ) ON COMMIT DROP
+""")
+
+# Emails already registered are skipped by the conflict clause and reported
+MOVE_STAGED = text("""
+    INSERT INTO patients (
+        full_name, date_of_birth, gender, role, contact_number, email, hashed_password,
+        address, category, emergency, assigned_doctor_id, registered_by
+    )
+    SELECT
+        full_name, date_of_birth, gender, 'patient', contact_number, email, hashed_password,
+        address, category, emergency, assigned_doctor_id, registered_by
+    FROM patient_import
+    ORDER BY row_number
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id, email, category, emergency
+""")
+
+class ImportReport:
+    """Outcome of an import: created patients and per-row errors, by row number."""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.created: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row: int, messages: List[str], email: Optional[str] = None):
+        self.errors.append({"row": row, "email": email, "errors": messages})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "imported": len(self.created),
+            "failed": len(self.errors),
+            "patients": self.created,
+            "errors": sorted(self.errors, key=lambda error: error["row"])
+        }
+
+def _complete_csv_end(buffer: str) -> int:
+    """Index just past the last newline that is not inside a quoted field."""
+    in_quotes = False
+    end = 0
+    for i, char in enumerate(buffer):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "\n" and not in_quotes:
+            end = i + 1
+    return end
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    header: Optional[List[str]] = None
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        end = _complete_csv_end(buffer)
+        if not end:
+            continue
+        complete, buffer = buffer[:end], buffer[end:]
+        for values in csv.reader(io.StringIO(complete)):
+            if header is None:
+                header = [name.strip() for name in values]
+            elif any(values):
+                yield dict(zip(header, values))
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip() and header is not None:
+        for values in csv.reader(io.StringIO(buffer)):
+            if any(values):
+                yield dict(zip(header, values))
+
+async def _ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer
+
+def _validate(record: Any, fmt: str) -> PatientCreate:
+    if fmt == "ndjson":
+        return PatientCreate.model_validate_json(record)
+    # Empty CSV cells mean "not given"
+    return PatientCreate.model_validate({key: value for key, value in record.items() if key and value != ""})
+
+def _errors(exc: Exception) -> List[str]:
+    if isinstance(exc, ValidationError):
+        return [
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in exc.errors()
+        ]
+    return [str(exc)]
+
+async def _load_chunk(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    registered_by: int,
+    report: ImportReport
+):
+    """
+    Hash, COPY and insert one chunk of valid rows in a single transaction.
+    A database error rolls back this chunk only; its rows are reported as
+    failed and the import goes on with the next chunk.
+    """
+    doctor_ids = {row["patient"].assigned_doctor_id for row in rows} - {None}
+    passwords = [generate_password() for _ in rows]
+    hashes = await hash_passwords_bulk(passwords)
+    # Applied to the report once the chunk has committed
+    created: List[Dict[str, Any]] = []
+    rejected: Dict[int, Tuple[List[str], str]] = {}
+
+    try:
+        async with db.begin():
+            if doctor_ids:
+                result = await db.execute(select(Doctor.id).where(Doctor.id.in_(doctor_ids)))
+                doctor_ids = set(result.scalars())
+
+            records = []
+            staged: Dict[str, Dict[str, Any]] = {}
+            for row, password, hashed in zip(rows, passwords, hashes):
+                patient = row["patient"]
+                if patient.assigned_doctor_id is not None and patient.assigned_doctor_id not in doctor_ids:
+                    rejected[row["row"]] = (["assigned_doctor_id: Doctor not found"], patient.email)
+                    continue
+                records.append((
+                    row["row"], patient.full_name,
+                    datetime.combine(patient.date_of_birth, time(), tzinfo=timezone.utc),
+                    patient.gender, patient.contact_number, patient.email, hashed, patient.address,
+                    # Same rule as single registration; no admission is created on import
+                    "inpatient" if patient.emergency else "outpatient",
+                    patient.emergency, patient.assigned_doctor_id, registered_by
+                ))
+                staged[patient.email] = {"row": row["row"], "email": patient.email, "password": password}
+
+            if records:
+                conn = await db.connection()
+                await conn.execute(CREATE_STAGING)
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "patient_import", records=records, columns=STAGING_COLUMNS
+                )
+                result = await conn.execute(MOVE_STAGED)
+
+                deltas = Counter()
+                for id, email, category, emergency in result.all():
+                    created.append({"id": id, **staged.pop(email)})
+                    deltas[counter_name(Patient)] += 1
+                    deltas[counter_name(Patient, "category", category)] += 1
+                    if emergency:
+                        deltas[counter_name(Patient, "emergency", True)] += 1
+                for row in staged.values():
+                    rejected[row["row"]] = (["email: Email already registered."], row["email"])
+
+                stmt = counter_upsert(deltas)
+                if stmt is not None:
+                    await conn.execute(stmt)
+                # Raw COPY bypasses the ORM hooks; announce the writes for the after-commit ones
+                db.info.setdefault("cache_tags", set()).update({"patients", "dashboard_counters"})
+                db.info.setdefault("dashboard_changes", set()).add("patients")
+    except (DBAPIError, PostgresError, InterfaceError):
+        logger.exception("Patient import chunk (rows %d-%d) was rolled back", rows[0]["row"], rows[-1]["row"])
+        for row in rows:
+            if row["row"] not in rejected:
+                rejected[row["row"]] = (["row: Not imported; the database rejected this chunk of rows."], row["patient"].email)
+        created = []
+
+    report.created.extend(created)
+    for row, (messages, email) in rejected.items():
+        report.fail(row, messages, email)
+
+async def import_patients(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    registered_by: int
+) -> Dict[str, Any]:
+    """
+    Stream CSV (with a header row) or NDJSON patient records, validating
+    with PatientCreate and loading valid rows in IMPORT_CHUNK_SIZE chunks
+    via COPY into a staging table. Each chunk commits on its own; a chunk
+    the database rejects is rolled back and reported row by row while the
+    other chunks are still imported. Returns the created patients (with
+    their generated passwords) and per-row errors.
+    """
+    report = ImportReport()
+    seen: Set[str] = set()
+    pending: List[Dict[str, Any]] = []
+    records = _csv_records(chunks) if fmt == "csv" else _ndjson_records(chunks)
+
+    async for record in records:
+        report.total_rows += 1
+        row = report.total_rows
+        try:
+            patient = _validate(record, fmt)
+        except (ValidationError, ValueError) as exc:
+            report.fail(row, _errors(exc), record.get("email") if isinstance(record, dict) else None)
+            continue
+        if patient.email in seen:
+            report.fail(row, ["email: Duplicate email in import file."], patient.email)
+            continue
+        seen.add(patient.email)
+        pending.append({"row": row, "patient": patient})
+        if len(pending) >= IMPORT_CHUNK_SIZE:
+            await _load_chunk(db, pending, registered_by, report)
+            pending = []
+
+    if pending:
+        await _load_chunk(db, pending, registered_by, report)
+    return report.as_dict()
@@ -0,0 +1,161 @@
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from sqlalchemy import event
+from typing import Any, Dict, Optional
+import logging
+import os
+import random
+import time
+from core.database import async_engine, replica_engines, sync_engine
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "1") == "1"
+# Fraction of requests profiled; the event hooks are no-ops for the rest
+SQL_PROFILE_SAMPLE_RATE = float(os.getenv("SQL_PROFILE_SAMPLE_RATE", "0.1"))
+# Same statement run this many times in one request is reported as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+DEBUG = os.getenv("DEBUG", "0") == "1"
+
+class RequestProfile:
+    """SQL statements executed while handling one request."""
+
+    __slots__ = ("statements", "db_time", "counts")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.counts: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.statements += 1
+        self.db_time += elapsed
+        self.counts[statement] += 1
+
+    def repeated(self) -> Dict[str, int]:
+        return {
+            statement: count for statement, count in self.counts.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        }
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+def _new_route_stats() -> Dict[str, Any]:
+    return {
+        "requests": 0,
+        "statements": 0,
+        "db_time_ms": 0.0,
+        "max_statements": 0,
+        "n_plus_one_requests": 0,
+        "n_plus_one": Counter()
+    }
+
+_routes: Dict[str, Dict[str, Any]] = defaultdict(_new_route_stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is None or not conn.info.get("query_start_time"):
+        return
+    profile.record(statement, time.perf_counter() - conn.info["query_start_time"].pop())
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so later timings on this pooled connection stay aligned
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+def instrument(engine):
+    """Attach the profiling hooks to a (sync) engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+if SQL_PROFILE:
+    for _engine in (async_engine, *replica_engines):
+        instrument(_engine.sync_engine)
+    instrument(sync_engine)
+
+def _summary(profile: RequestProfile) -> str:
+    return (
+        f"statements={profile.statements};"
+        f"db_ms={profile.db_time * 1000:.2f};"
+        f"repeated={len(profile.repeated())}"
+    )
+
+def _record_route(route: str, profile: RequestProfile):
+    stats = _routes[route]
+    stats["requests"] += 1
+    stats["statements"] += profile.statements
+    stats["db_time_ms"] += profile.db_time * 1000
+    stats["max_statements"] = max(stats["max_statements"], profile.statements)
+    repeated = profile.repeated()
+    if repeated:
+        stats["n_plus_one_requests"] += 1
+        for statement, count in repeated.items():
+            stats["n_plus_one"][statement] = max(stats["n_plus_one"][statement], count)
+            logger.warning(f"Possible N+1 on {route}: statement ran {count} times: {statement[:200]}")
+
+def get_sql_profile_stats() -> Dict[str, Any]:
+    routes = {}
+    for route, stats in _routes.items():
+        requests = stats["requests"] or 1
+        routes[route] = {
+            "requests": stats["requests"],
+            "avg_statements": round(stats["statements"] / requests, 2),
+            "max_statements": stats["max_statements"],
+            "avg_db_time_ms": round(stats["db_time_ms"] / requests, 2),
+            "n_plus_one_requests": stats["n_plus_one_requests"],
+            "n_plus_one": [
+                {"statement": statement[:500], "max_count": count}
+                for statement, count in stats["n_plus_one"].most_common(5)
+            ]
+        }
+    return {
+        "enabled": SQL_PROFILE,
+        "sample_rate": SQL_PROFILE_SAMPLE_RATE,
+        "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        "routes": routes
+    }
+
+class SQLProfilerMiddleware:
+    """
+    Profiles a sample of requests: statement count, DB time and repeated
+    statements, aggregated per route template. In DEBUG every request is
+    profiled and gets an X-SQL-Profile response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not SQL_PROFILE
+            or (not DEBUG and random.random() >= SQL_PROFILE_SAMPLE_RATE)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _profile.set(profile)
+
+        async def send_wrapper(message):
+            if DEBUG and message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-sql-profile", _summary(profile).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            # Route templates keep the key space bounded; unmatched paths share one entry
+            route = scope.get("route")
+            _record_route(f"{scope['method']} {getattr(route, 'path', '<unmatched>')}", profile)
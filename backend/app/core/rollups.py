@@ -0,0 +1,204 @@
+from sqlalchemy import select, func, cast, delete, literal, literal_column, null, or_, text, union, union_all, DateTime, String
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+import asyncio
+import logging
+import os
+from core.database import async_engine
+from core.cache import invalidate_tags
+from models.metric_rollup import MetricRollupHourly, MetricRollupDaily
+from models.admission import PatientAdmission, AdmissionStatus
+from models.appointment import Appointment
+from models.lab import LabTest, LabTestStatus
+from models.radiology import RadiologyScan, RadiologyScanStatus
+from models.billing import Billing
+
+logger = logging.getLogger(__name__)
+
+# Seconds between rollup runs; the current hour and day are rebuilt on each
+ROLLUP_INTERVAL = int(os.getenv("ROLLUP_INTERVAL", 300))
+
+# Hours re-aggregated on each run, picking up late status changes and completions
+ROLLUP_LOOKBACK_HOURS = int(os.getenv("ROLLUP_LOOKBACK_HOURS", 48))
+
+# Hourly buckets older than this are pruned; daily buckets are kept
+ROLLUP_HOURLY_RETENTION_DAYS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", 90))
+
+# Time zone whose midnights delimit the daily buckets
+ROLLUP_TIMEZONE = os.getenv("ROLLUP_TIMEZONE", "UTC")
+
+# Arbitrary key so only one worker rolls up at a time
+ROLLUP_LOCK_ID = 72_001_003
+
+ROLLUP_TABLES = {"hour": MetricRollupHourly, "day": MetricRollupDaily}
+
+class RollupSource(NamedTuple):
+    # Metric name, or an SQL expression yielding one per row
+    metric: Any
+    # Event time the row is bucketed by
+    timestamp: Any
+    condition: Optional[Any] = None
+    # Column summed into `total`
+    amount: Optional[Any] = None
+    # Last-modified time; rows changed since the lookback start get their older buckets rebuilt
+    changed_at: Optional[Any] = None
+
+ROLLUP_SOURCES: List[RollupSource] = [
+    RollupSource("admissions", PatientAdmission.admission_date),
+    RollupSource("discharges", PatientAdmission.discharge_date, PatientAdmission.status == AdmissionStatus.DISCHARGED),
+    # Bucketed by the appointment time, so later status changes land in old buckets
+    RollupSource(
+        func.concat("appointments:status:", cast(Appointment.status, String)), Appointment.datetime,
+        changed_at=Appointment.updated_at
+    ),
+    RollupSource("lab_tests:requested", LabTest.created_at),
+    RollupSource("lab_tests:completed", LabTest.completed_date, LabTest.status == LabTestStatus.COMPLETED),
+    RollupSource("radiology_scans:requested", RadiologyScan.created_at),
+    RollupSource("radiology_scans:completed", RadiologyScan.completed_date, RadiologyScan.status == RadiologyScanStatus.COMPLETED),
+    RollupSource("billing", Billing.created_at, amount=Billing.amount),
+]
+
+def _bound(column, value: datetime) -> datetime:
+    """Match a UTC bound to the column: naive columns (appointments.datetime) take naive values."""
+    return value if column.type.timezone else value.replace(tzinfo=None)
+
+def _utc(column):
+    """Naive columns hold UTC; convert explicitly instead of using the session TimeZone."""
+    return column if column.type.timezone else func.timezone(literal_column("'UTC'"), column)
+
+def _hour(column):
+    return func.date_trunc(literal_column("'hour'"), _utc(column), literal_column("'UTC'"))
+
+def _hourly_select(source: RollupSource, since: Optional[datetime], until: datetime):
+    bucket = _hour(source.timestamp)
+    named = isinstance(source.metric, str)
+    metric = literal(source.metric, String) if named else source.metric
+    stmt = (
+        select(
+            metric.label("metric"),
+            bucket.label("bucket"),
+            func.count().label("count"),
+            (func.sum(source.amount) if source.amount is not None else cast(null(), MetricRollupHourly.total.type)).label("total")
+        )
+        .where(source.timestamp.is_not(None), source.timestamp < _bound(source.timestamp, until))
+        .group_by(*((bucket,) if named else (bucket, metric)))
+    )
+    if since is not None:
+        stmt = stmt.where(source.timestamp >= _bound(source.timestamp, since))
+    if source.condition is not None:
+        stmt = stmt.where(source.condition)
+    return stmt
+
+def _day_of(value: datetime):
+    return func.date_trunc(literal_column("'day'"), literal(value, DateTime(timezone=True)), ROLLUP_TIMEZONE)
+
+async def _changed_buckets(conn: AsyncConnection, since: datetime, retained: datetime) -> List[datetime]:
+    """Hourly buckets before `since` holding rows modified after it."""
+    queries = [
+        select(_hour(source.timestamp)).where(
+            source.changed_at >= since,
+            source.timestamp < _bound(source.timestamp, since),
+            source.timestamp >= _bound(source.timestamp, retained)
+        )
+        for source in ROLLUP_SOURCES if source.changed_at is not None
+    ]
+    if not queries:
+        return []
+    result = await conn.execute(union(*queries))
+    return list(result.scalars())
+
+async def refresh_rollups(conn: AsyncConnection, since: Optional[datetime] = None):
+    """
+    Rebuild hourly buckets from `since` (all history when None) plus older
+    buckets whose rows changed since then, the daily buckets covering them
+    from the hourly ones, then prune old hourly rows. Changes to rows
+    older than the hourly retention are only picked up by a full rebuild.
+    """
+    now = datetime.now(timezone.utc)
+    if since is not None:
+        # Whole buckets only: a partial first hour would be rebuilt from part of its rows
+        since = since.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    # Appointments are booked ahead; only buckets that have started count
+    until = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    retained = now - timedelta(days=ROLLUP_HOURLY_RETENTION_DAYS)
+    hourly, daily = MetricRollupHourly.__table__, MetricRollupDaily.__table__
+    columns = ["metric", "bucket", "count", "total"]
+
+    changed = await _changed_buckets(conn, since, retained) if since is not None else []
+    ranges = [(since, until), *((bucket, bucket + timedelta(hours=1)) for bucket in changed)]
+    for start, end in ranges:
+        await conn.execute(
+            delete(hourly).where(hourly.c.bucket >= start, hourly.c.bucket < end) if start else delete(hourly)
+        )
+        await conn.execute(hourly.insert().from_select(
+            columns, union_all(*(_hourly_select(source, start, end) for source in ROLLUP_SOURCES))
+        ))
+
+    day = func.date_trunc(literal_column("'day'"), hourly.c.bucket, ROLLUP_TIMEZONE)
+    by_day = (
+        select(hourly.c.metric, day, func.sum(hourly.c.count), func.sum(hourly.c.total))
+        .group_by(hourly.c.metric, day)
+    )
+    if since is not None:
+        day_start = _day_of(since)
+        stale_daily, stale_hourly = daily.c.bucket >= day_start, hourly.c.bucket >= day_start
+        if changed:
+            changed_days = [_day_of(bucket) for bucket in changed]
+            stale_daily = or_(stale_daily, daily.c.bucket.in_(changed_days))
+            stale_hourly = or_(stale_hourly, day.in_(changed_days))
+        await conn.execute(delete(daily).where(stale_daily))
+        by_day = by_day.where(stale_hourly)
+    else:
+        await conn.execute(delete(daily))
+    await conn.execute(daily.insert().from_select(columns, by_day))
+
+    await conn.execute(delete(hourly).where(
+        hourly.c.bucket < now - timedelta(days=ROLLUP_HOURLY_RETENTION_DAYS)
+    ))
+
+async def _rollup_once():
+    since = datetime.now(timezone.utc) - timedelta(hours=ROLLUP_LOOKBACK_HOURS)
+    async with async_engine.begin() as conn:
+        locked = await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": ROLLUP_LOCK_ID})
+        if not locked:
+            return
+        await refresh_rollups(conn, since)
+    await invalidate_tags([table.__tablename__ for table in ROLLUP_TABLES.values()])
+
+async def run_rollups():
+    """Background loop started with the app; one worker rolls up per interval."""
+    while True:
+        await asyncio.sleep(ROLLUP_INTERVAL)
+        try:
+            await _rollup_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Metric rollup failed")
+
+async def read_trends(
+    db: AsyncSession,
+    metrics: Optional[List[str]],
+    granularity: str,
+    start: datetime,
+    end: datetime
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Rollup rows per metric in [start, end), ordered by bucket."""
+    table = ROLLUP_TABLES[granularity]
+    stmt = (
+        select(table.metric, table.bucket, table.count, table.total)
+        .where(table.bucket >= start, table.bucket < end)
+        .order_by(table.metric, table.bucket)
+    )
+    if metrics:
+        stmt = stmt.where(table.metric.in_(metrics))
+    result = await db.execute(stmt)
+
+    series: Dict[str, List[Dict[str, Any]]] = {}
+    for metric, bucket, count, total in result.all():
+        point = {"bucket": bucket, "count": count}
+        if total is not None:
+            point["total"] = total
+        series.setdefault(metric, []).append(point)
+    return series
@@ -0,0 +1,95 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import hashlib
+import os
+import secrets
+from models.refresh_token import RefreshToken
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+
+class RefreshTokenError(Exception):
+    """The refresh token is unknown, expired, revoked or was reused."""
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def issue_refresh_token(
+    db: AsyncSession,
+    subject_id: int,
+    subject_type: str,
+    role: str,
+    family_id: Optional[str] = None
+) -> Tuple[str, RefreshToken]:
+    """Create a refresh token; the plain token is only ever returned here."""
+    token = secrets.token_urlsafe(32)
+    record = RefreshToken(
+        token_hash=_hash(token),
+        family_id=family_id or secrets.token_hex(16),
+        subject_type=subject_type,
+        subject_id=subject_id,
+        role=role,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    db.add(record)
+    await db.flush()
+    return token, record
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[str, RefreshToken]:
+    """
+    Exchange a refresh token for a new one in the same family. Presenting
+    a token that was already rotated means it leaked, so the whole family
+    is revoked.
+    """
+    result = await db.execute(
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == _hash(token))
+        .with_for_update()
+    )
+    record = result.scalars().first()
+    if record is None:
+        raise RefreshTokenError("Invalid refresh token")
+
+    now = datetime.now(timezone.utc)
+    if record.revoked_at is not None:
+        await revoke_family(db, record.family_id)
+        raise RefreshTokenError("Refresh token reuse detected")
+    if record.expires_at <= now:
+        raise RefreshTokenError("Refresh token expired")
+
+    new_token, new_record = await issue_refresh_token(
+        db, record.subject_id, record.subject_type, record.role, record.family_id
+    )
+    record.revoked_at = now
+    record.replaced_by = new_record.id
+    return new_token, new_record
+
+async def revoke_family(db: AsyncSession, family_id: str):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+async def revoke_refresh_token(db: AsyncSession, token: str):
+    """Log out: revoke the token's whole family."""
+    result = await db.execute(
+        select(RefreshToken.family_id)
+        .where(RefreshToken.token_hash == _hash(token))
+    )
+    family_id = result.scalar()
+    if family_id:
+        await revoke_family(db, family_id)
+
+async def revoke_subject_tokens(db: AsyncSession, subject_id: int, subject_type: str = "user"):
+    """Revoke every refresh token of a user, e.g. after a password change."""
+    await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.subject_type == subject_type,
+            RefreshToken.subject_id == subject_id,
+            RefreshToken.revoked_at.is_(None)
+        )
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
@@ -0,0 +1,59 @@
+from fastapi import FastAPI
+from typing import Any, Callable, Dict, List, Tuple
+import asyncio
+import logging
+import os
+import time
+from core.database import AsyncSessionLocal
+from routers import departments, wards, beds, pharmacy, doctors
+
+logger = logging.getLogger(__name__)
+
+CACHE_WARMUP = os.getenv("CACHE_WARMUP", "1") == "1"
+
+# Cached reference endpoints preloaded before the app accepts traffic,
+# with the query parameters to warm them for (none = the unfiltered list)
+WARMUP_TARGETS: List[Tuple[Callable, Dict[str, Any]]] = [
+    (departments.list_departments, {}),
+    (wards.list_wards, {}),
+    (beds.list_beds, {}),
+    (pharmacy.get_drug_categories, {}),
+    (doctors.get_doctors, {}),
+]
+
+_last_warmup: Dict[str, Any] = {}
+
+async def _warm(endpoint: Callable, params: Dict[str, Any]):
+    async with AsyncSessionLocal(info={"read_only": True}) as db:
+        await endpoint(db=db, **params)
+
+async def warm_cache(app: FastAPI) -> Dict[str, Any]:
+    """Run every warm-up target concurrently and record how long it took."""
+    global _last_warmup
+    if not CACHE_WARMUP:
+        _last_warmup = {"enabled": False}
+        return _last_warmup
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(_warm(endpoint, params) for endpoint, params in WARMUP_TARGETS),
+        return_exceptions=True
+    )
+    failed = []
+    for (endpoint, _), result in zip(WARMUP_TARGETS, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Cache warm-up failed for {endpoint.__name__}: {result}")
+            failed.append(endpoint.__name__)
+
+    _last_warmup = {
+        "enabled": True,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        "targets": len(WARMUP_TARGETS),
+        "failed": failed
+    }
+    app.state.cache_warmup = _last_warmup
+    logger.info(f"Cache warm-up finished in {_last_warmup['duration_ms']} ms")
+    return _last_warmup
+
+def get_warmup_stats() -> Dict[str, Any]:
+    return dict(_last_warmup)
@@ -1,12 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from core.cache import init_redis
-from core.database import async_engine, Base
+from core.cache import init_cache, close_cache
+from core.warmup import warm_cache
+from core.etag import ETagMiddleware
+from core.profiler import SQLProfilerMiddleware
+from core.database import async_engine, DatabaseRoutingMiddleware, dispose_engines
+from core.migrations import ensure_schema
+from core.counters import run_counter_reconciler
+from core.rollups import run_rollups
+from core.dashboard_stream import broadcaster
+import asyncio
+import os
 from routers import (
     auth, patients, doctors, pharmacy, lab, radiology, 
     icu, appointment, admissions, users, medical_record,
     inpatient, patient_vitals, dashboard, billing, ai_routes,
-    beds, departments, wards
+    beds, departments, wards, metrics
 )
 
 app = FastAPI(title="Hospital Management System")
@@ -18,17 +27,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-SQL-Profile", "X-Next-Cursor", "X-Total-Estimate"],
 )
 
-# Initialize Redis cache on startup
+# Conditional GET: ETag on JSON responses, 304 when If-None-Match matches
+app.add_middleware(ETagMiddleware)
+
+# Route GET reads to replicas (when REPLICA_HOSTS is set), writes to the primary
+app.add_middleware(DatabaseRoutingMiddleware)
+
+# Sampled per-route SQL statement counts, DB time and N+1 detection
+app.add_middleware(SQLProfilerMiddleware)
+
+# Apply pending migrations at startup (set MIGRATE_ON_STARTUP=0 to only check the version)
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+
+# Initialize database and cache on startup
 @app.on_event("startup")
 async def startup():
-    # Initialize database
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Check the schema version, migrating if it is behind
+    await ensure_schema(async_engine, apply=MIGRATE_ON_STARTUP)
     
-    # Initialize Redis cache
-    await init_redis(app)
+    # Initialize cache (Redis, falling back to in-memory)
+    await init_cache(app)
+
+    # Preload reference data before the app starts serving requests
+    await warm_cache(app)
+
+    # Periodically correct drift in the dashboard counters
+    app.state.counter_reconciler = asyncio.create_task(run_counter_reconciler())
+
+    # Aggregate recent activity into the hourly/daily trend rollups
+    app.state.rollups = asyncio.create_task(run_rollups())
+
+    # Push dashboard changes to /dashboard/stream subscribers
+    app.state.dashboard_broadcaster = asyncio.create_task(broadcaster.run())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.counter_reconciler.cancel()
+    app.state.rollups.cancel()
+    app.state.dashboard_broadcaster.cancel()
+    await close_cache()
+    await dispose_engines()
 
 # Include all routers
 app.include_router(auth.router)
@@ -50,6 +91,7 @@ app.include_router(dashboard.router)
 app.include_router(billing.router)
 app.include_router(ai_routes.router)
 app.include_router(users.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
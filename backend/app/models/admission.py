@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean, Float, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean, Float, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -17,6 +17,10 @@ class AdmissionStatus(str, PyEnum):
 
 class PatientAdmission(Base):
     __tablename__ = "patient_admissions" 
+    __table_args__ = (
+        Index("ix_patient_admissions_status", "status"),
+        Index("ix_patient_admissions_patient_id", "patient_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
@@ -63,6 +67,9 @@ class ICUPatient(Base):
 
 class Inpatient(Base):
     __tablename__ = "inpatients"
+    __table_args__ = (
+        Index("ix_inpatients_admission_id", "admission_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
@@ -101,6 +108,11 @@ class Ward(Base):
 
 class Bed(Base):
     __tablename__ = "beds"
+    __table_args__ = (
+        Index("ix_beds_ward_occupied", "ward_id", "is_occupied"),
+        # First free bed in a ward, looked up on every admission
+        Index("ix_beds_ward_free", "ward_id", postgresql_where=text("NOT is_occupied")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     bed_number = Column(String, nullable=False)
@@ -113,6 +125,9 @@ class Bed(Base):
 
 class PatientVitals(Base):
     __tablename__ = "patient_vitals"
+    __table_args__ = (
+        Index("ix_patient_vitals_patient_recorded", "patient_id", "recorded_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Text
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
@@ -13,6 +13,15 @@ class AppointmentStatus(str, PyEnum):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Doctor schedules and per-doctor status counts
+        Index("ix_appointments_doctor_status", "doctor_id", "status"),
+        # Daily completed/pending counts on the dashboard
+        Index("ix_appointments_status_datetime", "status", "datetime"),
+        Index("ix_appointments_patient_id", "patient_id"),
+        # Rollups rebuild the buckets of recently changed appointments
+        Index("ix_appointments_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     doctor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from core.database import Base
+
+class DashboardCounter(Base):
+    __tablename__ = "dashboard_counters"
+
+    # e.g. "lab_tests", "lab_tests:status:PENDING", "patients:emergency:true"
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -12,6 +12,10 @@ class LabTestStatus(PythonEnum):
 
 class LabTest(Base):
     __tablename__ = "lab_tests"
+    __table_args__ = (
+        Index("ix_lab_tests_status", "status"),
+        Index("ix_lab_tests_requested_by", "requested_by"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
     requested_by = Column(Integer, ForeignKey("users.id"), nullable=False)  # Requesting doctor
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, BigInteger, Float, DateTime
+from core.database import Base
+
+class RollupColumns:
+    # e.g. "admissions", "appointments:status:COMPLETED", "lab_tests:completed"
+    metric = Column(String, primary_key=True)
+    # Start of the hour/day; (metric, bucket) order serves range reads per metric
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    # Sum of the metric's amount column (billing), NULL for plain counts
+    total = Column(Float, nullable=True)
+
+class MetricRollupHourly(RollupColumns, Base):
+    __tablename__ = "metric_rollups_hourly"
+
+class MetricRollupDaily(RollupColumns, Base):
+    __tablename__ = "metric_rollups_daily"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Enum, Boolean, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from core.database import Base
@@ -6,6 +6,19 @@ from core.database import Base
  
 class Patient(Base):
     __tablename__ = "patients"
+    __table_args__ = (
+        Index("ix_patients_assigned_doctor_id", "assigned_doctor_id"),
+        Index("ix_patients_category", "category"),
+        # Emergencies are a small share of patients; keep the index to them
+        Index("ix_patients_emergency", "id", postgresql_where=text("emergency")),
+        # Keyset pagination order of GET /patients
+        Index("ix_patients_created_at_id", "created_at", "id"),
+        # Fuzzy search (GET /patients/search) with pg_trgm
+        *(
+            Index(f"ix_patients_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in ("full_name", "email", "contact_number")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String, nullable=False)
@@ -39,3 +52,6 @@ class Patient(Base):
     prescriptions = relationship("Prescription", back_populates="patient", cascade="all, delete-orphan")
     radiology_scan = relationship("RadiologyScan", back_populates="patient", cascade="all, delete-orphan")
     appointments = relationship("Appointment", back_populates="patient", cascade="all, delete-orphan")
+
+# The trigram indexes need pg_trgm before the table is created
+event.listen(Patient.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
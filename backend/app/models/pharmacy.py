@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Index
 from enum import Enum as PyEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -10,6 +10,10 @@ class PrescriptionStatus(str, PyEnum):
 
 class Prescription(Base):
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        Index("ix_prescriptions_status", "status"),
+        Index("ix_prescriptions_patient_id", "patient_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
     prescribed_by = Column(Integer, ForeignKey("users.id"), nullable=False)  
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Index
 from enum import Enum as PythonEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,10 @@ class RadiologyScanStatus(PythonEnum):
 
 class RadiologyScan(Base):
     __tablename__ = "radiology_scans"
+    __table_args__ = (
+        Index("ix_radiology_scans_status", "status"),
+        Index("ix_radiology_scans_requested_by", "requested_by"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
     requested_by = Column(Integer, ForeignKey("users.id"), nullable=False)
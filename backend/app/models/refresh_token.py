@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from core.database import Base
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_subject", "subject_type", "subject_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Only a hash of the opaque token is stored
+    token_hash = Column(String(64), unique=True, nullable=False)
+    # All tokens descended from one login share a family, revoked together on reuse
+    family_id = Column(String(32), nullable=False)
+    subject_type = Column(String, nullable=False)  # user or patient
+    subject_id = Column(Integer, nullable=False)
+    role = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by = Column(Integer, nullable=True)
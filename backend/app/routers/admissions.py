@@ -13,11 +13,10 @@ from schemas.admission import (
     AdmissionCreate, AdmissionResponse, 
     AdmissionTableResponse
 )
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from sqlalchemy.sql import func
 from core.cache import cache
-from core.batching import batch_query
 
 router = APIRouter(prefix="/admissions", tags=["Admissions"]) 
 
@@ -67,11 +66,9 @@ async def admit_patient(
         bed.is_occupied = True
 
         # Check if patient has an assigned doctor
-        result = await db.execute(
-            select(Patient)
-            .where(Patient.id == admission_data.patient_id)
-        )
-        patient = result.scalars().first()
+        patient = await db.get(Patient, admission_data.patient_id)
+        if not patient:
+            raise HTTPException(status_code=404, detail="Patient not found")
         if patient.assigned_doctor_id:
             admission_data.assigned_doctor_id = patient.assigned_doctor_id
         elif admission_data.category in [AdmissionCategory.INPATIENT, AdmissionCategory.ICU]:
@@ -119,7 +116,6 @@ async def admit_patient(
         return new_admission
 
 @router.put("/{admission_id}/discharge", response_model=AdmissionResponse)
-@cache(expire=60)  # Cache discharge operations for 1 minute
 async def discharge_patient(
     admission_id: int, 
     db: AsyncSession = Depends(get_async_db), 
@@ -163,10 +159,9 @@ async def discharge_patient(
         return admission
 
 @router.get("/", response_model=List[AdmissionTableResponse])
-@cache(expire=120)  # Cache for 2 minutes
-@batch_query(batch_size=50)  # Process in batches of 50
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def list_admissions(
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession = Depends(get_async_read_db),
     user: User = Depends(nurse_or_doctor),
     status: Optional[AdmissionStatus] = Query(None),
     category: Optional[str] = Query(None),
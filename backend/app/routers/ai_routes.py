@@ -4,7 +4,7 @@ from sqlalchemy import select
 import pandas as pd
 from models.admission import PatientAdmission, PatientVitals
 from models.appointment import Appointment
-from core.database import get_async_db
+from core.database import get_async_read_db
 from utils.ai_utils import PredictiveAnalytics, AnomalyDetection, NLPProcessor
 from models.lab import LabTest
 from models.radiology import RadiologyScan
@@ -14,8 +14,8 @@ from core.cache import cache
 router = APIRouter(prefix="/ai", tags=["AI"])
 
 @router.get("/predict-admissions", response_model=Dict[str, float])
-@cache(expire=3600)  # Cache for 1 hour
-async def predict_admissions(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=3600, stale_ttl=600)  # Cache for 1 hour, refreshed in the background
+async def predict_admissions(db: AsyncSession = Depends(get_async_read_db)):
     """Predict patient admissions with async data fetching."""
     result = await db.execute(select(PatientAdmission))
     admissions_data = result.scalars().all()
@@ -36,8 +36,8 @@ async def predict_admissions(db: AsyncSession = Depends(get_async_db)):
     return {"predictions": forecast.tolist()}
 
 @router.get("/no-show-rate", response_model=Dict[str, float])
-@cache(expire=3600)  # Cache for 1 hour
-async def get_no_show_rate(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=3600, stale_ttl=600)  # Cache for 1 hour, refreshed in the background
+async def get_no_show_rate(db: AsyncSession = Depends(get_async_read_db)):
     """Calculate no-show rate with async operations."""
     result = await db.execute(select(Appointment))
     appointments = result.scalars().all()
@@ -52,7 +52,7 @@ async def get_no_show_rate(db: AsyncSession = Depends(get_async_db)):
 
 @router.get("/detect-anomalies/vitals", response_model=Dict[str, List[int]])
 @cache(expire=600)  # Cache for 10 minutes
-async def detect_anomalies_in_vitals(db: AsyncSession = Depends(get_async_db)):
+async def detect_anomalies_in_vitals(db: AsyncSession = Depends(get_async_read_db)):
     """Detect anomalies in vitals with async data fetching."""
     result = await db.execute(select(PatientVitals))
     vitals = result.scalars().all()
@@ -63,7 +63,7 @@ async def detect_anomalies_in_vitals(db: AsyncSession = Depends(get_async_db)):
 
 @router.get("/detect-anomalies/lab-tests", response_model=Dict[str, List[int]])
 @cache(expire=600)  # Cache for 10 minutes
-async def detect_anomalies_in_lab_tests(db: AsyncSession = Depends(get_async_db)):
+async def detect_anomalies_in_lab_tests(db: AsyncSession = Depends(get_async_read_db)):
     """Detect anomalies in lab tests with async operations."""
     result = await db.execute(select(LabTest))
     lab_tests = result.scalars().all()
@@ -74,7 +74,7 @@ async def detect_anomalies_in_lab_tests(db: AsyncSession = Depends(get_async_db)
 
 @router.get("/detect-anomalies/radiology-scans", response_model=Dict[str, List[int]])
 @cache(expire=600)  # Cache for 10 minutes
-async def detect_anomalies_in_radiology_scans(db: AsyncSession = Depends(get_async_db)):
+async def detect_anomalies_in_radiology_scans(db: AsyncSession = Depends(get_async_read_db)):
     """Detect anomalies in radiology scans with async operations."""
     result = await db.execute(select(RadiologyScan))
     scans = result.scalars().all()
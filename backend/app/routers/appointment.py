@@ -10,7 +10,7 @@ from schemas.appointment import (
     AppointmentUpdate, DoctorAppointmentResponse,
     AppointmentReschedule
 )
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -26,11 +26,7 @@ async def create_appointment(
 ):
     """Create appointment with async operations."""
     async with db.begin():
-        result = await db.execute(
-            select(Patient)
-            .where(Patient.id == appointment.patient_id)
-        )
-        patient = result.scalars().first()
+        patient = await db.get(Patient, appointment.patient_id)
         if not patient:
             raise HTTPException(status_code=400, detail="Invalid patient ID")
 
@@ -41,9 +37,9 @@ async def create_appointment(
         return new_appointment
 
 @router.get("/", response_model=List[AppointmentResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_appointments(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """Get all appointments with caching."""
@@ -52,10 +48,10 @@ async def get_appointments(
     return appointments if appointments else []
 
 @router.get("/doctor/{doctor_id}/", response_model=List[DoctorAppointmentResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_doctor_appointments(
     doctor_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """Get doctor's appointments with async operations."""
@@ -67,10 +63,10 @@ async def get_doctor_appointments(
     return appointments if appointments else []
 
 @router.get("/{appointment_id}/", response_model=AppointmentResponse)
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_appointment(
     appointment_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """Get single appointment with caching."""
@@ -3,27 +3,53 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from datetime import timedelta
+from typing import Optional
 from schemas.auth import (
-    UserCreate, UserResponse, Token, LoginRequest,
+    UserCreate, UserResponse, Token, LoginRequest, RefreshRequest,
     ChangePasswordRequest, ResetPasswordRequest, ForgotPasswordRequest
 )
 from models.user import User
 from models.patient import Patient
 from models.doctor import Doctor
 from utils.security import (
-    hash_password, verify_password,
+    hash_password, verify_password, verify_and_update_password,
     create_access_token, create_reset_token, verify_reset_token
 )
 from utils.email_util import send_reset_email
 from core.database import get_async_db
-from core.dependencies import RoleChecker, get_current_active_user
-from core.cache import cache
+from core.dependencies import RoleChecker, get_current_active_user, invalidate_principal
+from core.tokens import (
+    RefreshTokenError, issue_refresh_token, rotate_refresh_token,
+    revoke_refresh_token, revoke_subject_tokens
+)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 # Allow only admins to create users
 admin_only = RoleChecker(["admin"])
 
+# Access token lifetime per kind of principal; refresh tokens outlive them
+ACCESS_TOKEN_LIFETIME = {
+    "user": timedelta(minutes=60),
+    "patient": timedelta(minutes=30)
+}
+
+async def _issue_tokens(db: AsyncSession, user, kind: str, refresh_token: Optional[str] = None) -> dict:
+    """Access token plus a refresh token (a new family unless one is given)."""
+    if refresh_token is None:
+        refresh_token, _ = await issue_refresh_token(db, user.id, kind, user.role)
+    access_token = create_access_token(
+        {"sub": user.id, "role": user.role},
+        expires_delta=ACCESS_TOKEN_LIFETIME[kind]
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "role": user.role,
+        "sub": user.id,
+        "refresh_token": refresh_token
+    }
+
 @router.post("/register", response_model=UserResponse)
 async def register_user(
     user: UserCreate,
@@ -40,7 +66,7 @@ async def register_user(
     new_user = User(
         full_name=user.full_name,
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=await hash_password(user.password),
         role=user.role
     )
     db.add(new_user)
@@ -64,7 +90,6 @@ async def register_user(
     return new_user
 
 @router.post("/login", response_model=Token)
-@cache(expire=300)  # Cache for 5 minutes
 async def login_user(
     login_cred: LoginRequest,
     db: AsyncSession = Depends(get_async_db)
@@ -72,24 +97,20 @@ async def login_user(
     result = await db.execute(select(User).where(User.email == login_cred.email))
     user = result.scalars().first()
     
-    if not user or not verify_password(login_cred.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password(login_cred.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash used an outdated cost; committed by get_async_db
+        user.hashed_password = new_hash
     if not user.is_active:
         raise HTTPException(status_code=403, detail="You have been Deactivated")
     
-    access_token = create_access_token(
-        {"sub": user.id, "role": user.role},
-        expires_delta=timedelta(minutes=60)
-    )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": user.role,
-        "sub": user.id
-    }
+    return await _issue_tokens(db, user, "user")
 
 @router.post("/login/patient", response_model=Token)
-@cache(expire=300)
 async def login_patient(
     login_cred: LoginRequest,
     db: AsyncSession = Depends(get_async_db)
@@ -100,19 +121,45 @@ async def login_patient(
     )
     user = result.scalars().first()
     
-    if not user or not verify_password(login_cred.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password(login_cred.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        user.hashed_password = new_hash
     
-    access_token = create_access_token(
-        {"sub": user.id, "role": user.role},
-        expires_delta=timedelta(minutes=30)
-    )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": user.role,
-        "sub": user.id
-    }
+    return await _issue_tokens(db, user, "patient")
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Exchange a refresh token for a new access token and a rotated refresh token."""
+    try:
+        refresh_token, record = await rotate_refresh_token(db, request.refresh_token)
+    except RefreshTokenError as e:
+        # Keep the family revocation when a reused token was detected
+        await db.commit()
+        raise HTTPException(status_code=401, detail=str(e))
+
+    model = Patient if record.subject_type == "patient" else User
+    result = await db.execute(select(model).where(model.id == record.subject_id))
+    user = result.scalars().first()
+    if not user or not getattr(user, "is_active", True):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    return await _issue_tokens(db, user, record.subject_type, refresh_token)
+
+@router.post("/logout")
+async def logout(
+    request: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoke the refresh token and every token rotated from the same login."""
+    await revoke_refresh_token(db, request.refresh_token)
+    return {"message": "Logged out"}
 
 @router.post("/change-password", status_code=status.HTTP_200_OK)
 async def change_password(
@@ -123,12 +170,14 @@ async def change_password(
     result = await db.execute(select(User).where(User.id == current_user.id))
     user = result.scalars().first()
     
-    if not verify_password(request.current_password, user.hashed_password):
+    if not await verify_password(request.current_password, user.hashed_password):
         raise HTTPException(status_code=404, detail="Current password is incorrect")
     
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = await hash_password(request.new_password)
+    await revoke_subject_tokens(db, user.id)
     await db.commit()
     await db.refresh(user)
+    await invalidate_principal(user.id)
     return user
 
 @router.post("/forgot-password")
@@ -163,6 +212,8 @@ async def reset_password(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = await hash_password(request.new_password)
+    await revoke_subject_tokens(db, user.id)
     await db.commit()
+    await invalidate_principal(user.id)
     return {"message": "Password reset successfully"}
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from typing import List, Optional
 from models.admission import Bed
 from schemas.admission import BedCreate, BedResponse
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.cache import cache
 
 router = APIRouter(prefix="/beds", tags=["Beds"])
@@ -34,11 +34,11 @@ async def create_bed(
         return new_bed
 
 @router.get("/", response_model=List[BedResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def list_beds(
     ward_id: Optional[int] = Query(None), 
     is_occupied: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """List beds with filtering and caching."""
     query = select(Bed)
@@ -52,10 +52,10 @@ async def list_beds(
     return result.scalars().all()
 
 @router.get("/{bed_id}", response_model=BedResponse)
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_bed(
     bed_id: int, 
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get single bed with caching."""
     result = await db.execute(
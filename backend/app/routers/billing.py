@@ -5,7 +5,7 @@ from models.billing import Billing, BillingStatus
 from models.patient import Patient
 from models.user import User
 from schemas.billing import BillingCreate, BillingResponse
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 from typing import List
@@ -38,9 +38,9 @@ async def create_billing(
         return new_billing
 
 @router.get("/", response_model=List[BillingResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def list_billing(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(billing_staff_only)
 ):
     """List billing records with caching."""
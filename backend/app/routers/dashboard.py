@@ -1,17 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Optional
 from models.user import User
-from models.patient import Patient
-from models.appointment import Appointment, AppointmentStatus
-from models.lab import LabTest, LabTestStatus
-from models.radiology import RadiologyScan, RadiologyScanStatus
-from models.pharmacy import Prescription, PrescriptionStatus
-from models.billing import Billing
-from models.admission import PatientAdmission, AdmissionStatus
-from core.database import get_async_db
+from core.database import get_async_read_db
+from core.dashboard_metrics import (
+    METRIC_GROUPS, collect_metrics, collect_doctor_metrics, collect_doctors_metrics
+)
+from core.dashboard_stream import dashboard_events
+from core.rollups import ROLLUP_TABLES, read_trends
+from datetime import datetime, timedelta, timezone
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -20,188 +18,90 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 staff_only = RoleChecker(["admin", "doctor", "nurse", "lab_technician", "pharmacist", "radiologist"])
  
 @router.get("/metrics", response_model=Dict[str, Any])
-@cache(expire=60)  # Cache for 1 minute
+@cache(expire=300, stale_ttl=60)  # Cache for 5 minutes, refreshed in the background
 async def get_dashboard_metrics(
-    db: AsyncSession = Depends(get_async_db), 
+    groups: Optional[List[str]] = Query(None, description=f"Metric groups to include: {', '.join(METRIC_GROUPS)}"),
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
-    """Fetch dashboard metrics with async operations and caching."""
-    metrics = {}
-    
-    # Total Patients
-    result = await db.execute(select(func.count(Patient.id)))
-    metrics["total_patients"] = result.scalar()
-    
-    # Total Appointments
-    result = await db.execute(select(func.count(Appointment.id)))
-    metrics["total_appointments"] = result.scalar()
-    
-    # Pending Appointments
-    result = await db.execute(
-        select(func.count(Appointment.id))
-        .where(Appointment.status == AppointmentStatus.PENDING)
-    )
-    metrics["pending_appointments"] = result.scalar()
-    
-    # Total Lab Tests
-    result = await db.execute(select(func.count(LabTest.id)))
-    metrics["total_lab_tests"] = result.scalar()
-    
-    # Total Scans
-    result = await db.execute(select(func.count(RadiologyScan.id)))
-    metrics["total_scans"] = result.scalar()
-    
-    # Total Prescriptions
-    result = await db.execute(select(func.count(Prescription.id)))
-    metrics["total_prescriptions"] = result.scalar()
-    
-    # Pending Prescriptions
-    result = await db.execute(
-        select(func.count(Prescription.id))
-        .where(Prescription.status == PrescriptionStatus.PENDING)
-    )
-    metrics["pending_prescriptions"] = result.scalar()
-    
-    # Pending Lab Tests
-    result = await db.execute(
-        select(func.count(LabTest.id))
-        .where(LabTest.status == LabTestStatus.PENDING)
-    )
-    metrics["pending_lab_tests"] = result.scalar()
-    
-    # Pending Scans
-    result = await db.execute(
-        select(func.count(RadiologyScan.id))
-        .where(RadiologyScan.status == RadiologyScanStatus.PENDING)
-    )
-    metrics["Pending_scans"] = result.scalar()
-    
-    # Scans In Progress
-    result = await db.execute(
-        select(func.count(RadiologyScan.id))
-        .where(RadiologyScan.status == RadiologyScanStatus.IN_PROGRESS)
-    )
-    metrics["scans_in_progress"] = result.scalar()
-    
-    # Lab Tests In Progress
-    result = await db.execute(
-        select(func.count(LabTest.id))
-        .where(LabTest.status == LabTestStatus.IN_PROGRESS)
-    )
-    metrics["lab_tests_in_progress"] = result.scalar()
-    
-    # Total Billing Transactions
-    result = await db.execute(select(func.count(Billing.id)))
-    metrics["total_billing_transactions"] = result.scalar()
-
-    # Patient Distribution
-    result = await db.execute(
-        select(Patient.category, func.count(Patient.id))
-        .group_by(Patient.category)
-    )
-    patient_distribution = {
-        "outpatients": 0,
-        "inpatients": 0,
-        "icu": 0,
-        "emergency": 0
-    }
-    for category, count in result.all():
-        if category == "outpatient":
-            patient_distribution["outpatients"] = count
-        elif category == "inpatient":
-            patient_distribution["inpatients"] = count
-        elif category == "ICU":
-            patient_distribution["icu"] = count
-    
-    result = await db.execute(
-        select(func.count(Patient.id))
-        .where(Patient.emergency == True)
-    )
-    patient_distribution["emergency"] = result.scalar()
-    metrics["patient_distribution"] = patient_distribution
-
-    # Daily Appointments
-    today = datetime.now().date()
-    result = await db.execute(
-        select(func.count(Appointment.id))
-        .where(
-            Appointment.status == "Completed", 
-            Appointment.datetime >= today
-        )
-    )
-    completed = result.scalar()
-    
-    result = await db.execute(
-        select(func.count(Appointment.id))
-        .where(
-            Appointment.status == "Pending", 
-            Appointment.datetime >= today
+    """Fetch dashboard metrics (all groups by default) with one aggregate query per table."""
+    requested = list(dict.fromkeys(groups)) if groups else list(METRIC_GROUPS)
+    unknown = [name for name in requested if name not in METRIC_GROUPS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown metric groups: {', '.join(unknown)}"
         )
-    )
-    pending = result.scalar()
-    metrics["appointments_data"] = {
-        "completed": completed,
-        "pending": pending
-    }
-
-    # Admissions and Discharges
-    result = await db.execute(
-        select(func.count(PatientAdmission.id))
-        .where(PatientAdmission.status == AdmissionStatus.ADMITTED)
-    )
-    admitted = result.scalar()
-    
-    result = await db.execute(
-        select(func.count(PatientAdmission.id))
-        .where(PatientAdmission.status == AdmissionStatus.DISCHARGED)
-    )
-    discharged = result.scalar()
-    metrics["admissions_data"] = {
-        "admitted": admitted,
-        "discharged": discharged
-    }
-    
-    # Total Admissions
-    result = await db.execute(select(func.count(PatientAdmission.id)))
-    metrics["total_admissions"] = result.scalar()
-    
-    return metrics
+    return await collect_metrics(requested, db)
  
+@router.get("/metrics/doctors", response_model=List[Dict[str, Any]])
+@cache(expire=300, stale_ttl=60)  # Invalidated by writes to doctors, patients and appointments
+async def get_doctors_dashboard_metrics(
+    specialization: Optional[str] = Query(None, description="Only doctors with this specialization (case-insensitive)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(staff_only)
+):
+    """Patient, pending and confirmed appointment counts for every doctor in one grouped query."""
+    return await collect_doctors_metrics(specialization, db)
+
 @router.get("/metrics/doctor/{doctor_id}", response_model=Dict[str, Any])
-@cache(expire=60)  # Cache for 1 minute
+@cache(expire=300, stale_ttl=60)  # Cache for 5 minutes, refreshed in the background
 async def get_doctor_dashboard_metrics(
     doctor_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """Fetch doctor-specific metrics with async operations."""
-    metrics = {}
-    
-    # My Patients
-    result = await db.execute(
-        select(func.count(Patient.id))
-        .where(Patient.assigned_doctor_id == doctor_id)
-    )
-    metrics["my_patients"] = result.scalar()
-    
-    # My Pending Appointments
-    result = await db.execute(
-        select(func.count(Appointment.id))
-        .where(
-            Appointment.doctor_id == doctor_id,
-            Appointment.status == AppointmentStatus.PENDING
-        )
-    )
-    metrics["my_pending_appointments"] = result.scalar()
-    
-    # My Confirmed Appointments
-    result = await db.execute(
-        select(func.count(Appointment.id))
-        .where(
-            Appointment.doctor_id == doctor_id,
-            Appointment.status == AppointmentStatus.CONFIRMED
+    return await collect_doctor_metrics(doctor_id, db)
+
+# Default and maximum span of a trend query per granularity
+TREND_WINDOWS = {
+    "hour": (timedelta(hours=48), timedelta(days=31)),
+    "day": (timedelta(days=30), timedelta(days=731)),
+}
+
+@router.get("/trends", response_model=Dict[str, Any])
+@cache(expire=300, stale_ttl=60)  # Invalidated whenever the rollup job runs
+async def get_dashboard_trends(
+    metrics: Optional[List[str]] = Query(None, description="Metric names, e.g. admissions, appointments:status:COMPLETED (all by default)"),
+    granularity: str = Query("day", description=f"Bucket size: {', '.join(ROLLUP_TABLES)}"),
+    start: Optional[datetime] = Query(None, description="Inclusive start (defaults to 48 hours or 30 days ago)"),
+    end: Optional[datetime] = Query(None, description="Exclusive end (defaults to now)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(staff_only)
+):
+    """Historical trend series read from the pre-aggregated hourly/daily rollups."""
+    if granularity not in ROLLUP_TABLES:
+        raise HTTPException(status_code=400, detail=f"Unknown granularity: {granularity}")
+    default_span, max_span = TREND_WINDOWS[granularity]
+    # Naive timestamps are taken as UTC, like the stored buckets
+    end = end.replace(tzinfo=end.tzinfo or timezone.utc) if end else datetime.now(timezone.utc)
+    start = start.replace(tzinfo=start.tzinfo or timezone.utc) if start else end - default_span
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > max_span:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for {granularity} buckets (max {max_span.days} days)"
         )
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "series": await read_trends(db, metrics, granularity, start, end)
+    }
+
+@router.get("/stream")
+async def stream_dashboard(
+    doctor_id: Optional[int] = Query(None, description="Also push this doctor's metrics"),
+    user: User = Depends(staff_only)
+):
+    """
+    Server-sent events: a full `metrics` event on connect, then one with only
+    the changed keys whenever the underlying data changes (on any worker).
+    """
+    return StreamingResponse(
+        dashboard_events(doctor_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    metrics["my_confirmed_appointments"] = result.scalar()
-    
-    return metrics
\ No newline at end of file
@@ -6,7 +6,7 @@ from models.admission import Department
 from schemas.admission import DepartmentCreate, DepartmentResponse
 from models.user import User
 from core.dependencies import RoleChecker 
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.cache import cache
 
 router = APIRouter(prefix="/departments", tags=["Departments"])
@@ -39,9 +39,9 @@ async def create_department(
         return new_department
 
 @router.get("/", response_model=List[DepartmentResponse])
-@cache(expire=3600)  # Cache for 1 hour
+@cache(expire=43200, local_ttl=3600)  # Cache for 12 hours, invalidated on writes
 async def list_departments(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(doctor_or_nurse)
 ):
     """List departments with caching."""
@@ -49,10 +49,10 @@ async def list_departments(
     return result.scalars().all()
 
 @router.get("/{department_id}", response_model=DepartmentResponse)
-@cache(expire=3600)  # Cache for 1 hour
+@cache(expire=43200, local_ttl=3600)  # Cache for 12 hours, invalidated on writes
 async def get_department(
     department_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(doctor_or_nurse)
 ):
     """Get department with caching."""
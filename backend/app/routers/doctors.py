@@ -7,7 +7,7 @@ from models.doctor import Doctor
 from schemas.patients import PatientResponse
 from models.patient import Patient
 from models.user import User
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker, get_current_active_user
 from utils.security import hash_password
 from core.cache import cache
@@ -55,7 +55,7 @@ async def create_doctor(
             email=doctor.email,
             contact_number=doctor.contact_number,
             address=doctor.address,
-            hashed_password=hash_password(doctor.password),
+            hashed_password=await hash_password(doctor.password),
             role="doctor"
         )
         db.add(new_user)
@@ -76,9 +76,9 @@ async def create_doctor(
         return new_doctor
 
 @router.get("/", response_model=List[DoctorResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900, local_ttl=900)  # Cache for 15 minutes, invalidated on writes
 async def get_doctors(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """List doctors with caching."""
@@ -86,10 +86,10 @@ async def get_doctors(
     return result.scalars().all()
 
 @router.get("/{doctor_id}", response_model=DoctorResponse)
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_doctor(
     doctor_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """Get doctor with caching."""
@@ -127,9 +127,9 @@ async def update_doctor(
         return doctor
 
 @router.get("/{doctor_id}/patients", response_model=List[PatientResponse])
-@cache(expire=60)  # Cache for 1 minute
+@cache(expire=600, scope="user")  # Cache for 10 minutes, per doctor
 async def get_assigned_patients(
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_active_user),
     _: User = Depends(RoleChecker(["doctor"]))
 ):
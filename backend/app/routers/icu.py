@@ -5,7 +5,7 @@ from models.admission import ICUPatient, PatientAdmission
 from models.user import User
 from typing import List
 from schemas.admission import ICUPatientCreate, ICUPatientResponse
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -63,8 +63,8 @@ async def update_icu_patient(
         return icu_patient
 
 @router.get("/patients/", response_model=List[ICUPatientResponse])
-@cache(expire=60)  # Cache for 1 minute
-async def list_icu_patients(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=600)  # Cache for 10 minutes, invalidated on writes
+async def list_icu_patients(db: AsyncSession = Depends(get_async_read_db)):
     """List ICU patients with caching."""
     result = await db.execute(select(ICUPatient))
     return result.scalars().all()
\ No newline at end of file
@@ -5,7 +5,7 @@ from models.admission import Inpatient, PatientAdmission
 from models.user import User
 from typing import List
 from schemas.admission import InpatientCreate, InpatientResponse
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -63,8 +63,8 @@ async def update_in_patient(
         return in_patient
 
 @router.get("/patients/", response_model=List[InpatientResponse])
-@cache(expire=60)  # Cache for 1 minute
-async def list_in_patients(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=600)  # Cache for 10 minutes, invalidated on writes
+async def list_in_patients(db: AsyncSession = Depends(get_async_read_db)):
     """List inpatients with caching."""
     result = await db.execute(select(Inpatient))
     return result.scalars().all()
\ No newline at end of file
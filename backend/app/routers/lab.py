@@ -6,7 +6,7 @@ from models.lab import LabTest, LabTestStatus
 from models.patient import Patient
 from models.user import User
 from schemas.lab import LabTestCreate, LabTestResponse, LabTestUpdate
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -23,11 +23,7 @@ async def request_lab_test(
 ):
     """Create lab test with async operations."""
     async with db.begin():
-        result = await db.execute(
-            select(Patient)
-            .where(Patient.id == lab_test.patient_id)
-        )
-        patient = result.scalars().first()
+        patient = await db.get(Patient, lab_test.patient_id)
         if not patient:
             raise HTTPException(status_code=400, detail="Invalid patient ID")
 
@@ -43,9 +39,9 @@ async def request_lab_test(
         return new_lab_test
 
 @router.get("/", response_model=List[LabTestResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_lab_tests(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(lab_staff_only)
 ):
     """List lab tests with caching."""
@@ -53,10 +49,10 @@ async def get_lab_tests(
     return result.scalars().all()
 
 @router.get("/test/{doctor_id}", response_model=List[LabTestResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_lab_test_requested(
     doctor_id:int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(doctor_only)
 ):
     """Get doctor's lab tests with caching."""
@@ -68,10 +64,10 @@ async def get_lab_test_requested(
     return lab_test if lab_test else []
 
 @router.get("/{test_id}", response_model=LabTestResponse)
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_lab_test(
     test_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(lab_staff_only)
 ):
     """Get lab test with caching."""
@@ -9,7 +9,7 @@ from schemas.medical_record import (
     MedicalRecordCreate, MedicalRecordUpdate, 
     MedicalRecordResponse
 )
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -57,10 +57,10 @@ async def create_medical_record(
         return new_record
 
 @router.get("/", response_model=List[MedicalRecordResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_medical_record(
     patient_id: Optional[int] = Query(None), 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_access)
 ):
     """Get medical records with filtering and caching."""
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from typing import Dict, Any
+from models.user import User
+from core.dependencies import RoleChecker
+from core.cache import get_cache_stats
+from core.warmup import get_warmup_stats
+from core.profiler import get_sql_profile_stats
+from utils.security import get_password_hash_stats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+admin_only = RoleChecker(["admin"])
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def get_cache_metrics(_: User = Depends(admin_only)):
+    """Hit/miss/byte counters per cache namespace for this worker."""
+    return get_cache_stats()
+
+@router.get("/warmup", response_model=Dict[str, Any])
+async def get_warmup_metrics(_: User = Depends(admin_only)):
+    """Duration and outcome of this worker's startup cache warm-up."""
+    return get_warmup_stats()
+
+@router.get("/sql", response_model=Dict[str, Any])
+async def get_sql_metrics(_: User = Depends(admin_only)):
+    """Per-route SQL statement counts, DB time and N+1 patterns (sampled)."""
+    return get_sql_profile_stats()
+
+@router.get("/password-hashing", response_model=Dict[str, Any])
+async def get_password_hashing_metrics(_: User = Depends(admin_only)):
+    """Queue depth and timings of the bcrypt thread pool."""
+    return get_password_hash_stats()
@@ -9,7 +9,7 @@ from schemas.admission import (
     PatientVitalsCreate, PatientVitalsResponse, 
     PatientVitalsResponseTable
 )
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -42,10 +42,10 @@ async def update_vitals(
         return new_vitals
 
 @router.get("/{patient_id}", response_model=List[PatientVitalsResponse])
-@cache(expire=60)  # Cache for 1 minute
+@cache(expire=600)  # Cache for 10 minutes, invalidated on writes
 async def get_vitals(
     patient_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(nurse_or_doctor)
 ):
     """Get patient's vitals with caching."""
@@ -57,9 +57,9 @@ async def get_vitals(
     return vitals
 
 @router.get("/", response_model=List[PatientVitalsResponseTable])
-@cache(expire=60)  # Cache for 1 minute
+@cache(expire=600)  # Cache for 10 minutes, invalidated on writes
 async def get_all_vitals(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(nurse_or_doctor)
 ):
     """Get all vitals with patient details and caching."""
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import List, Optional
+from sqlalchemy import select, func, literal, or_, tuple_
+from typing import Any, Dict, List, Optional
 from models.patient import Patient
 from models.admission import (
     PatientAdmission, Bed, Ward, Department, 
@@ -11,14 +11,20 @@ from models.user import User
 from models.doctor import Doctor
 from schemas.patients import (
     PatientCreate, PatientCreateResponse, 
-    PatientResponse, PatientUpdate
+    PatientResponse, PatientUpdate, PatientListItem,
+    PatientSearchResult
 )
 from schemas.admission import AdmissionCategory
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from utils.security import hash_password, generate_password
 from utils.email_util import send_password_email
 from core.dependencies import RoleChecker
 from core.cache import cache
+from core.patient_import import IMPORT_FORMATS, import_patients
+from core.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor,
+    encode_cursor, estimate_count, parse_fields
+)
 
 router = APIRouter(prefix="/patients", tags=["Patients"])
 
@@ -47,7 +53,7 @@ async def create_patient(
 
         # Generate password and hash
         password = generate_password()
-        password_hash = hash_password(password)
+        password_hash = await hash_password(password)
 
         # Prepare patient data
         patient_data = patient.model_dump()
@@ -75,24 +81,15 @@ async def create_patient(
                     detail="Invalid category for emergency admission. Must be 'Inpatient' or 'ICU'."
                 )
 
-            # Validate department
-            result = await db.execute(
-                select(Department)
-                .where(Department.id == patient.department_id)
-            )
-            department = result.scalars().first()
+            # Validate department and ward
+            department = await db.get(Department, patient.department_id)
+            ward = await db.get(Ward, patient.ward_id)
             if not department:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Department not found."
                 )
 
-            # Validate ward
-            result = await db.execute(
-                select(Ward)
-                .where(Ward.id == patient.ward_id)
-            )
-            ward = result.scalars().first()
             if not ward:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -166,44 +163,146 @@ async def create_patient(
 
         return {**new_patient.__dict__, "password": password}
 
-@router.get("/", response_model=List[PatientResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@router.post("/import", response_model=Dict[str, Any])
+async def import_patients_bulk(
+    request: Request,
+    format: Optional[str] = Query(None, description=f"Body format: {', '.join(IMPORT_FORMATS)} (defaults from Content-Type)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(staff_only)
+):
+    """
+    Bulk-register patients from a streamed CSV (header row) or NDJSON body.
+    Rows are validated like POST /patients and loaded with COPY in chunks;
+    the response lists the created patients with their generated passwords
+    and a per-row error report. No emergency admissions or emails are made.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv")
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported import format: {fmt}"
+        )
+    return await import_patients(db, request.stream(), fmt, current_user.id)
+
+# Columns GET /patients can project with `fields=`
+PATIENT_LIST_FIELDS = {
+    "id": Patient.id,
+    "full_name": Patient.full_name,
+    "date_of_birth": Patient.date_of_birth,
+    "gender": Patient.gender,
+    "role": Patient.role,
+    "email": Patient.email,
+    "address": Patient.address,
+    "contact_number": Patient.contact_number,
+    "category": Patient.category,
+    "emergency": Patient.emergency,
+    "assigned_doctor_id": Patient.assigned_doctor_id,
+    "assigned_doctor_name": Doctor.full_name,
+    "registered_by": Patient.registered_by,
+    "registered_by_name": User.full_name,
+    "created_at": Patient.created_at,
+}
+
+# Returned when `fields` is omitted: the PatientResponse fields
+DEFAULT_PATIENT_LIST_FIELDS = [name for name in PatientResponse.model_fields if name in PATIENT_LIST_FIELDS]
+
+@router.get(
+    "/",
+    response_model=List[PatientListItem],
+    response_model_exclude_unset=True
+)
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_patients(
+    response: Response,
     emergency: Optional[bool] = Query(None), 
     patient_id: Optional[int] = Query(None),
-    db: AsyncSession = Depends(get_async_db), 
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(PATIENT_LIST_FIELDS)}"),
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(doctor_or_nurse)
 ):
-    """List patients with filtering and caching."""
-    query = (
-        select(
-            Patient.id,
-            Patient.full_name,
-            Patient.date_of_birth,
-            Patient.gender,
-            Patient.role,
-            Patient.email,
-            Patient.address, 
-            Patient.contact_number, 
-            Patient.category, 
-            Patient.emergency,
-            Patient.assigned_doctor_id,
-            Doctor.full_name.label("assigned_doctor_name"),
-            Patient.registered_by,
-            User.id.label("registered_by_name"),
-            Patient.created_at
-        )
-        .join(Doctor, Patient.assigned_doctor_id == Doctor.id)
-        .join(User, Patient.registered_by == User.id)
+    """
+    List patients in registration order, one keyset page at a time.
+    X-Next-Cursor is set while more pages follow; X-Total-Estimate is
+    the planner's estimate of matching patients.
+    """
+    selected = parse_fields(fields, PATIENT_LIST_FIELDS, DEFAULT_PATIENT_LIST_FIELDS)
+    query = select(
+        Patient.created_at.label("_cursor_created_at"),
+        Patient.id.label("_cursor_id"),
+        *(PATIENT_LIST_FIELDS[name].label(name) for name in selected)
     )
-    
+    # Outer joins: unassigned patients are listed too
+    if "assigned_doctor_name" in selected:
+        query = query.outerjoin(Doctor, Patient.assigned_doctor_id == Doctor.id)
+    if "registered_by_name" in selected:
+        query = query.outerjoin(User, Patient.registered_by == User.id)
+
+    filters = []
     if emergency is not None:
-        query = query.where(Patient.emergency == emergency)
+        filters.append(Patient.emergency == emergency)
     if patient_id:
-        query = query.where(Patient.id == patient_id)
-    
+        filters.append(Patient.id == patient_id)
+    query = query.where(*filters)
+    if cursor:
+        query = query.where(tuple_(Patient.created_at, Patient.id) > tuple_(*decode_cursor(cursor)))
+    query = query.order_by(Patient.created_at, Patient.id).limit(limit + 1)
+
+    result = await db.execute(query)
+    rows = result.mappings().all()
+    total = await estimate_count(db, select(Patient.id).where(*filters))
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1]["_cursor_created_at"], rows[-1]["_cursor_id"])
+    response.headers["X-Total-Estimate"] = str(total)
+    return [{name: row[name] for name in selected} for row in rows]
+
+# Columns matched by GET /patients/search, each with a trigram index
+PATIENT_SEARCH_COLUMNS = [Patient.full_name, Patient.email, Patient.contact_number]
+DEFAULT_PATIENT_SEARCH_FIELDS = [
+    "id", "full_name", "email", "contact_number",
+    "date_of_birth", "category", "emergency", "assigned_doctor_id"
+]
+
+@router.get(
+    "/search",
+    response_model=List[PatientSearchResult],
+    response_model_exclude_unset=True
+)
+@cache(expire=60)  # Short-lived: many distinct queries, invalidated on writes
+async def search_patients(
+    q: str = Query(..., min_length=3, max_length=100, description="Name, email or contact number (fuzzy)"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(PATIENT_LIST_FIELDS)}"),
+    db: AsyncSession = Depends(get_async_read_db),
+    user: User = Depends(doctor_or_nurse)
+):
+    """
+    Fuzzy patient search ranked by pg_trgm word similarity. The `<%`
+    filter on each column is answered from its GIN trigram index, so
+    only candidate rows are scored and sorted.
+    """
+    selected = parse_fields(fields, PATIENT_LIST_FIELDS, DEFAULT_PATIENT_SEARCH_FIELDS)
+    # pg_trgm lowercases trigrams, so matching is case-insensitive as is
+    term = literal(q.strip())
+    score = func.greatest(*(func.word_similarity(term, column) for column in PATIENT_SEARCH_COLUMNS))
+    query = (
+        select(*(PATIENT_LIST_FIELDS[name].label(name) for name in selected), score.label("score"))
+        .select_from(Patient)
+        .where(or_(*(term.op("<%")(column) for column in PATIENT_SEARCH_COLUMNS)))
+        .order_by(score.desc(), Patient.id)
+        .limit(limit)
+    )
+    if "assigned_doctor_name" in selected:
+        query = query.outerjoin(Doctor, Patient.assigned_doctor_id == Doctor.id)
+    if "registered_by_name" in selected:
+        query = query.outerjoin(User, Patient.registered_by == User.id)
+
     result = await db.execute(query)
-    return result.all()
+    return [dict(row) for row in result.mappings()]
 
 @router.put("/{patient_id}", response_model=PatientResponse)
 async def update_patient(
@@ -271,12 +370,8 @@ async def assign_patient_to_doctor(
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
 
-        result = await db.execute(
-            select(User)
-            .where(User.id == doctor_id, User.role == "doctor")
-        )
-        doctor = result.scalars().first()
-        if not doctor:
+        doctor = await db.get(User, doctor_id)
+        if not doctor or doctor.role != "doctor":
             raise HTTPException(status_code=404, detail="Doctor not found")
 
         patient.assigned_doctor_id = doctor_id
@@ -18,7 +18,7 @@ from schemas.inventory import (
     InventoryCreate, InventoryResponse, 
     InventoryUpdate, InventoryQuantityUpdate
 )
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -35,17 +35,8 @@ async def create_prescription(
 ):
     """Create prescription with async operations."""
     async with db.begin():
-        result = await db.execute(
-            select(Patient)
-            .where(Patient.id == prescription.patient_id)
-        )
-        patient = result.scalars().first()
-        
-        result = await db.execute(
-            select(Doctor)
-            .where(Doctor.id == prescription.prescribed_by)
-        )
-        doctor = result.scalars().first()
+        patient = await db.get(Patient, prescription.patient_id)
+        doctor = await db.get(Doctor, prescription.prescribed_by)
         
         result = await db.execute(
             select(Inventory)
@@ -72,8 +63,8 @@ async def create_prescription(
         return new_prescription
 
 @router.get("/prescriptions/", response_model=List[PrescriptionResponse])
-@cache(expire=120)  # Cache for 2 minutes
-async def get_prescriptions(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
+async def get_prescriptions(db: AsyncSession = Depends(get_async_read_db)):
     """List prescriptions with caching."""
     result = await db.execute(select(Prescription))
     return result.scalars().all()
@@ -171,8 +162,8 @@ async def create_drug_category(
         return new_category
 
 @router.get("/categories/", response_model=List[DrugCategoryResponse])
-@cache(expire=3600)  # Cache for 1 hour
-async def get_drug_categories(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=43200, local_ttl=3600)  # Cache for 12 hours, invalidated on writes
+async def get_drug_categories(db: AsyncSession = Depends(get_async_read_db)):
     """List drug categories with caching."""
     result = await db.execute(select(DrugCategory))
     return result.scalars().all()
@@ -235,8 +226,8 @@ async def add_inventory(
         return result.scalars().first()
 
 @router.get("/inventory/", response_model=List[InventoryResponse])
-@cache(expire=120)  # Cache for 2 minutes
-async def get_inventory(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
+async def get_inventory(db: AsyncSession = Depends(get_async_read_db)):
     """List inventory items with caching."""
     result = await db.execute(
         select(Inventory)
@@ -11,7 +11,7 @@ from schemas.radiology import (
     RadiologyScanCreate, RadiologyScanResponse, 
     RadiologyScanUpdate, RadiologyScanStatus
 )
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.dependencies import RoleChecker
 from core.cache import cache
 
@@ -28,17 +28,8 @@ async def create_radiology_scan(
 ):
     """Create radiology scan with async operations."""
     async with db.begin():
-        result = await db.execute(
-            select(Patient)
-            .where(Patient.id == radiology_scan.patient_id)
-        )
-        patient = result.scalars().first()
-        
-        result = await db.execute(
-            select(Doctor)
-            .where(Doctor.id == radiology_scan.requested_by)
-        )
-        doctor = result.scalars().first()
+        patient = await db.get(Patient, radiology_scan.patient_id)
+        doctor = await db.get(Doctor, radiology_scan.requested_by)
 
         if not patient or not doctor:
             raise HTTPException(
@@ -58,17 +49,17 @@ async def create_radiology_scan(
         return new_radiology_scan
 
 @router.get("/", response_model=List[RadiologyScanResponse])
-@cache(expire=120)  # Cache for 2 minutes
-async def get_radiology_scans(db: AsyncSession = Depends(get_async_db)):
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
+async def get_radiology_scans(db: AsyncSession = Depends(get_async_read_db)):
     """List radiology scans with caching."""
     result = await db.execute(select(RadiologyScan))
     return result.scalars().all()
 
 @router.get("/scan/{doctor_id}", response_model=List[RadiologyScanResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_doctor_radiology_scans(
     doctor_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(doctor_only)
 ):
     """Get doctor's radiology scans with caching."""
@@ -80,10 +71,10 @@ async def get_doctor_radiology_scans(
     return radiology_scan if radiology_scan else []
 
 @router.get("/{scan_id}", response_model=RadiologyScanResponse)
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def get_radiology_scan(
     scan_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     user: User = Depends(staff_only)
 ):
     """Get radiology scan with caching."""
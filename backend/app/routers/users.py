@@ -7,8 +7,9 @@ from schemas.auth import (
     UserResponse, IsActive, 
     UserUpdate, AllUserResponse
 )
-from core.database import get_async_db
-from core.dependencies import RoleChecker, get_current_active_user
+from core.database import get_async_db, get_async_read_db
+from core.dependencies import RoleChecker, get_current_active_user, invalidate_principal
+from core.tokens import revoke_subject_tokens
 from utils.security import hash_password
 from core.cache import cache
 
@@ -17,9 +18,9 @@ router = APIRouter(prefix="/user", tags=["Users"])
 admin_only = RoleChecker(["admin"])
 
 @router.get("/", response_model=List[AllUserResponse])
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900)  # Cache for 15 minutes, invalidated on writes
 async def all_users(
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     _: User = Depends(admin_only)
 ):
     """List all users with caching."""
@@ -28,10 +29,10 @@ async def all_users(
     return all_users if all_users else []
 
 @router.get("/user/{user_id}", response_model=UserResponse)
-@cache(expire=120)  # Cache for 2 minutes
+@cache(expire=900, scope="user")  # Cache for 15 minutes, per caller
 async def get_user_by_id(
     user_id: int, 
-    db: AsyncSession = Depends(get_async_db), 
+    db: AsyncSession = Depends(get_async_read_db), 
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user by ID with caching and access control."""
@@ -69,7 +70,9 @@ async def delete_user(
                 detail=f"User {user_id} not found"
             )
         await db.delete(user)
+        await revoke_subject_tokens(db, user_id)
         await db.commit()
+        await invalidate_principal(user_id)
 
 @router.put("/{user_id}/is_active", response_model=UserResponse)
 async def activate_deactivate_user(
@@ -88,9 +91,12 @@ async def activate_deactivate_user(
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         user.is_active = active.is_active
+        if not active.is_active:
+            await revoke_subject_tokens(db, user_id)
         
         await db.commit()
         await db.refresh(user)
+        await invalidate_principal(user_id)
         return user
 
 @router.put("/{user_id}/update", response_model=UserResponse)
@@ -121,10 +127,12 @@ async def update_user_login(
                 detail="Email already in use"
             )
         
-        password_hash = hash_password(update.password)
+        password_hash = await hash_password(update.password)
         user.email = update.email
         user.hashed_password = password_hash
+        await revoke_subject_tokens(db, user_id)
         
         await db.commit()
         await db.refresh(user)
+        await invalidate_principal(user_id)
         return user
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from typing import List, Optional
 from models.admission import Ward
 from schemas.admission import WardCreate, WardResponse
-from core.database import get_async_db
+from core.database import get_async_db, get_async_read_db
 from core.cache import cache
 
 router = APIRouter(prefix="/wards", tags=["Wards"])
@@ -34,10 +34,10 @@ async def create_ward(
         return new_ward
 
 @router.get("/", response_model=List[WardResponse])
-@cache(expire=3600)  # Cache for 1 hour
+@cache(expire=43200, local_ttl=3600)  # Cache for 12 hours, invalidated on writes
 async def list_wards(
     department_id: Optional[int] = Query(None),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """List wards with filtering and caching."""
     query = select(Ward)
@@ -49,10 +49,10 @@ async def list_wards(
     return result.scalars().all()
 
 @router.get("/{ward_id}", response_model=WardResponse)
-@cache(expire=3600)  # Cache for 1 hour
+@cache(expire=43200, local_ttl=3600)  # Cache for 12 hours, invalidated on writes
 async def get_ward(
     ward_id: int, 
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get ward with caching."""
     result = await db.execute(
@@ -24,6 +24,10 @@ class Token(BaseModel):
     token_type: str = "bearer"
     role: str 
     sub: int
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: str | None = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
 
 class PatientBase(BaseModel):
@@ -24,6 +24,28 @@ class PatientResponse(PatientBase):
     category: str
     emergency: bool
     
+class PatientListItem(BaseModel):
+    """A row of GET /patients; only the fields requested with `fields=` are present."""
+    id: Optional[int] = None
+    full_name: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    gender: Optional[str] = None
+    role: Optional[str] = None
+    contact_number: Optional[str] = None
+    address: Optional[str] = None
+    email: Optional[EmailStr] = None
+    category: Optional[str] = None
+    emergency: Optional[bool] = None
+    assigned_doctor_id: Optional[int] = None
+    assigned_doctor_name: Optional[str] = None
+    registered_by: Optional[int] = None
+    registered_by_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class PatientSearchResult(PatientListItem):
+    # Best word similarity of the query to the name, email or contact number
+    score: float
+
 class PatientCreateResponse(PatientBase):
     id: int
     assigned_doctor_id: Optional[int] = None
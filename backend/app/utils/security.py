@@ -1,7 +1,10 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import time
 import os
 from dotenv import load_dotenv
 import random
@@ -10,22 +13,106 @@ import string
 # Load environment variables
 load_dotenv()
 
+# bcrypt cost; hashes made with a different cost are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without
+# blocking the event loop. Callers beyond the limit wait their turn.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+
+# Bulk imports hash generated passwords in separate processes, at
+# BCRYPT_ROUNDS unless IMPORT_BCRYPT_ROUNDS lowers it for large loads.
+# pwd_context treats any other cost as outdated, so the login routes
+# re-hash those at BCRYPT_ROUNDS on first login; until then they stay weak.
+IMPORT_BCRYPT_ROUNDS = int(os.getenv("IMPORT_BCRYPT_ROUNDS", BCRYPT_ROUNDS))
+PASSWORD_IMPORT_WORKERS = int(os.getenv("PASSWORD_IMPORT_WORKERS", os.cpu_count() or 1))
+import_pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=IMPORT_BCRYPT_ROUNDS)
+_import_executor: Optional[ProcessPoolExecutor] = None
+
+_hash_stats: Dict[str, Any] = {
+    "running": 0, "waiting": 0, "max_waiting": 0,
+    "completed": 0, "wait_ms": 0.0, "run_ms": 0.0
+}
 
 # Secret key for JWT
 SECRET_KEY:str = os.getenv("SECRET_KEY")
 ALGORITHM :str= os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE  = int(os.getenv("ACCESS_TOKEN_EXPIRE_HOURS"))# Recommended expiry time
 
+async def _run_hashing(func, *args):
+    loop = asyncio.get_running_loop()
+    queued_at = time.perf_counter()
+    _hash_stats["waiting"] += 1
+    _hash_stats["max_waiting"] = max(_hash_stats["max_waiting"], _hash_stats["waiting"])
+    try:
+        await _hash_slots.acquire()
+    finally:
+        _hash_stats["waiting"] -= 1
+    started_at = time.perf_counter()
+    _hash_stats["running"] += 1
+    try:
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_slots.release()
+        _hash_stats["running"] -= 1
+        _hash_stats["completed"] += 1
+        _hash_stats["wait_ms"] += (started_at - queued_at) * 1000
+        _hash_stats["run_ms"] += (time.perf_counter() - started_at) * 1000
+
+def get_password_hash_stats() -> Dict[str, Any]:
+    """Queue depth and timings of the password hashing pool in this worker."""
+    completed = _hash_stats["completed"] or 1
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "running": _hash_stats["running"],
+        "waiting": _hash_stats["waiting"],
+        "max_waiting": _hash_stats["max_waiting"],
+        "completed": _hash_stats["completed"],
+        "avg_wait_ms": round(_hash_stats["wait_ms"] / completed, 2),
+        "avg_run_ms": round(_hash_stats["run_ms"] / completed, 2)
+    }
+
 # Hash password
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
 
 # Verify password
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+# Verify password, returning a replacement hash when the stored one uses outdated settings
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def _hash_import_batch(passwords: List[str]) -> List[str]:
+    # Runs in a worker process
+    return [import_pwd_context.hash(password) for password in passwords]
 
+async def hash_passwords_bulk(passwords: List[str]) -> List[str]:
+    """Hash many generated passwords across the import process pool, preserving order."""
+    global _import_executor
+    if _import_executor is None:
+        _import_executor = ProcessPoolExecutor(max_workers=PASSWORD_IMPORT_WORKERS)
+    loop = asyncio.get_running_loop()
+    size = -(-len(passwords) // PASSWORD_IMPORT_WORKERS) or 1
+    batches = await asyncio.gather(*(
+        loop.run_in_executor(_import_executor, _hash_import_batch, passwords[i:i + size])
+        for i in range(0, len(passwords), size)
+    ))
+    return [hashed for batch in batches for hashed in batch]
 
 def generate_password(length=8):
     """Generate a random password for the patient."""
@@ -0,0 +1,101 @@
+"""
+Shared setup for the benchmarks. Those using the database run the app's
+own code against a scratch database, which they wipe and migrate:
+
+    BENCH_DATABASE_URL=postgresql://postgres@localhost:5432/hms_bench python -m benchmarks.<name>
+
+Run from the backend directory. Results depend on the machine and on the
+network distance to the database; compare runs from the same setup.
+"""
+from urllib.parse import urlparse
+import os
+import sys
+import statistics
+import time
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL")
+
+# core.database builds its engines from these when first imported
+if BENCH_DATABASE_URL:
+    _url = urlparse(BENCH_DATABASE_URL)
+    os.environ.update(
+        USER=_url.username or "postgres",
+        PASS=_url.password or "",
+        HOST=_url.hostname or "localhost",
+        PORT=str(_url.port or 5432),
+        DB_NAME=_url.path.lstrip("/")
+    )
+else:
+    os.environ.setdefault("HOST", "localhost")
+    os.environ.setdefault("PORT", "5432")
+os.environ["REPLICA_HOSTS"] = ""
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_HOURS", "1")
+os.environ.setdefault("SQL_PROFILE", "0")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from sqlalchemy import event, text  # noqa: E402
+import core.migrations  # noqa: E402
+from core.database import async_engine  # noqa: E402
+
+async def reset_schema():
+    if not BENCH_DATABASE_URL:
+        sys.exit("Set BENCH_DATABASE_URL to a scratch database (it is wiped)")
+    async with async_engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    await core.migrations.migrate(async_engine)
+
+class PoolUsage:
+    """Connections checked out of the primary pool: total and peak at once."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.current = 0
+        self.peak = 0
+        event.listen(async_engine.sync_engine, "checkout", self._checkout)
+        event.listen(async_engine.sync_engine, "checkin", self._checkin)
+
+    def _checkout(self, *args):
+        self.checkouts += 1
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def _checkin(self, *args):
+        self.current -= 1
+
+    def reset(self):
+        self.checkouts = 0
+        self.peak = self.current
+
+class Timings:
+    def __init__(self):
+        self.samples = []
+        self.started = time.perf_counter()
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        ordered = sorted(self.samples)
+        return {
+            "requests": len(ordered),
+            "throughput": len(ordered) / elapsed,
+            "mean_ms": statistics.fmean(ordered) * 1000,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[int(len(ordered) * 0.95)] * 1000
+        }
+
+def print_table(title: str, rows: dict):
+    """rows: label -> dict of column -> value."""
+    columns = list(next(iter(rows.values())))
+    print(f"\n{title}")
+    print(f"{'':<28}" + "".join(f"{column:>14}" for column in columns))
+    for label, values in rows.items():
+        print(f"{label:<28}" + "".join(
+            f"{value:>14.2f}" if isinstance(value, float) else f"{value:>14}"
+            for value in values.values()
+        ))
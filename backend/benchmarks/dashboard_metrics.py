@@ -0,0 +1,146 @@
+"""
+Latency of one uncached dashboard load (GET /dashboard/metrics, every
+group) three ways:
+
+- the old endpoint: 19 COUNT queries, one after another on one session;
+- collect_metrics with DASHBOARD_COUNTERS=0: one COUNT(*) FILTER query
+  per table, run concurrently;
+- collect_metrics with counters: one read of dashboard_counters plus the
+  query for today's appointments.
+
+    python -m benchmarks.dashboard_metrics [--rows N] [--loads L]
+
+Each clinical table is seeded with --rows rows (appointments with twice
+as many) and analyzed; the counters are reconciled before timing.
+"""
+from benchmarks.common import Timings, print_table, reset_schema
+from sqlalchemy import select, func, text
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from core import dashboard_metrics
+from core.counters import reconcile_counters
+from core.dashboard_metrics import METRIC_GROUPS, collect_metrics
+from core.database import AsyncSessionLocal, async_engine
+from models.admission import AdmissionStatus, PatientAdmission
+from models.appointment import Appointment, AppointmentStatus
+from models.billing import Billing
+from models.lab import LabTest, LabTestStatus
+from models.patient import Patient
+from models.pharmacy import Prescription, PrescriptionStatus
+from models.radiology import RadiologyScan, RadiologyScanStatus
+
+SEED = [
+    """INSERT INTO users (full_name, email, hashed_password, role)
+       SELECT 'Doctor ' || i, 'doctor' || i || '@example.com', 'x', 'doctor' FROM generate_series(1, 200) i""",
+    """INSERT INTO patients (full_name, date_of_birth, gender, role, contact_number, email, hashed_password,
+                             address, category, emergency, assigned_doctor_id, registered_by)
+       SELECT 'Patient ' || i, '1990-01-01', 'Other', 'patient', '555-0100', 'patient' || i || '@example.com', 'x',
+              'Ward road', (ARRAY['outpatient', 'inpatient', 'ICU'])[i % 3 + 1]::patient_category, i % 50 = 0,
+              i % 200 + 1, 1
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO appointments (doctor_id, patient_id, patient_name, datetime, reason, status)
+       SELECT i % 200 + 1, i % :rows + 1, 'Patient', now() - i * interval '5 minutes', 'Checkup',
+              (CASE WHEN i % 20 = 0 THEN 'PENDING' ELSE 'COMPLETED' END)::appointment_status
+       FROM generate_series(1, 2 * :rows) i""",
+    """INSERT INTO lab_tests (patient_id, requested_by, test_type, status)
+       SELECT i % :rows + 1, i % 200 + 1, 'CBC', (ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED'])[i % 3 + 1]::labteststatus
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO radiology_scans (patient_id, requested_by, scan_type, status)
+       SELECT i % :rows + 1, i % 200 + 1, 'X-ray',
+              (ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED'])[i % 3 + 1]::radiology_scan_status
+       FROM generate_series(1, :rows) i""",
+    "INSERT INTO drug_categories (name) VALUES ('Analgesics')",
+    "INSERT INTO inventory (added_by, drug_name, quantity, category_id) VALUES (1, 'Paracetamol', 1000, 1)",
+    """INSERT INTO prescriptions (patient_id, prescribed_by, drug_name, dosage, instructions, status)
+       SELECT i % :rows + 1, i % 200 + 1, 'Paracetamol', '500mg', 'Twice daily',
+              (CASE WHEN i % 4 = 0 THEN 'PENDING' ELSE 'DISPENSED' END)::prescription_status
+       FROM generate_series(1, :rows) i""",
+    """INSERT INTO billing (patient_id, amount, status)
+       SELECT i % :rows + 1, 100, 'PAID' FROM generate_series(1, :rows) i""",
+    """INSERT INTO patient_admissions (patient_id, admitted_by, category, status)
+       SELECT i % :rows + 1, 1, 'INPATIENT', (CASE WHEN i % 5 = 0 THEN 'ADMITTED' ELSE 'DISCHARGED' END)::admission_status
+       FROM generate_series(1, :rows) i"""
+]
+
+def _old_queries():
+    """The statements the endpoint ran before the FILTER aggregates, in order."""
+    today = datetime.now().date()
+    return [
+        select(func.count(Patient.id)),
+        select(func.count(Appointment.id)),
+        select(func.count(Appointment.id)).where(Appointment.status == AppointmentStatus.PENDING),
+        select(func.count(LabTest.id)),
+        select(func.count(RadiologyScan.id)),
+        select(func.count(Prescription.id)),
+        select(func.count(Prescription.id)).where(Prescription.status == PrescriptionStatus.PENDING),
+        select(func.count(LabTest.id)).where(LabTest.status == LabTestStatus.PENDING),
+        select(func.count(RadiologyScan.id)).where(RadiologyScan.status == RadiologyScanStatus.PENDING),
+        select(func.count(RadiologyScan.id)).where(RadiologyScan.status == RadiologyScanStatus.IN_PROGRESS),
+        select(func.count(LabTest.id)).where(LabTest.status == LabTestStatus.IN_PROGRESS),
+        select(func.count(Billing.id)),
+        select(Patient.category, func.count(Patient.id)).group_by(Patient.category),
+        select(func.count(Patient.id)).where(Patient.emergency == True),  # noqa: E712
+        select(func.count(Appointment.id)).where(
+            Appointment.status == AppointmentStatus.COMPLETED, Appointment.datetime >= today
+        ),
+        select(func.count(Appointment.id)).where(
+            Appointment.status == AppointmentStatus.PENDING, Appointment.datetime >= today
+        ),
+        select(func.count(PatientAdmission.id)).where(PatientAdmission.status == AdmissionStatus.ADMITTED),
+        select(func.count(PatientAdmission.id)).where(PatientAdmission.status == AdmissionStatus.DISCHARGED),
+        select(func.count(PatientAdmission.id))
+    ]
+
+async def _old_endpoint(db):
+    for stmt in _old_queries():
+        (await db.execute(stmt)).all()
+
+async def _new_endpoint(db):
+    await collect_metrics(list(METRIC_GROUPS), db)
+
+async def seed(rows: int):
+    await reset_schema()
+    async with async_engine.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement), {"rows": rows})
+    async with async_engine.begin() as conn:
+        await conn.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+        await reconcile_counters(conn)
+    async with async_engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+
+async def run(load, loads: int) -> dict:
+    timings = Timings()
+
+    async def one():
+        async with AsyncSessionLocal(info={"read_only": True}) as db:
+            start = time.perf_counter()
+            await load(db)
+            timings.add(time.perf_counter() - start)
+
+    # Warm the pool, the statement caches and the buffer cache first
+    for _ in range(3):
+        await one()
+    timings = Timings()
+    for _ in range(loads):
+        await one()
+    return timings.summary()
+
+async def main(rows: int, loads: int):
+    await seed(rows)
+    results = {"19 sequential COUNTs (before)": await run(_old_endpoint, loads)}
+    dashboard_metrics.DASHBOARD_COUNTERS = False
+    results["FILTER per table, concurrent"] = await run(_new_endpoint, loads)
+    dashboard_metrics.DASHBOARD_COUNTERS = True
+    results["dashboard_counters"] = await run(_new_endpoint, loads)
+    await async_engine.dispose()
+    print_table(f"{loads} dashboard loads, {rows} rows per table ({2 * rows} appointments)", results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--loads", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.loads))
@@ -0,0 +1,79 @@
+"""
+Concurrent logins' bcrypt verification run inline on the event loop (the
+old behaviour) versus on the utils.security hashing pool, at pool sizes
+from 1 to --workers. Alongside the logins a probe measures how late the
+event loop wakes a 5 ms sleep, which is the delay every other request on
+the worker sees while the logins run.
+
+    python -m benchmarks.password_hashing [--logins N] [--workers W]
+
+Needs no database. Uses BCRYPT_ROUNDS (12 by default), as in production.
+"""
+from benchmarks.common import Timings, print_table
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import os
+import time
+from utils import security
+
+PROBE_INTERVAL = 0.005
+
+async def _probe(lags: list, done: asyncio.Event):
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+async def _verify_inline(password: str, hashed: str) -> bool:
+    return security.pwd_context.verify(password, hashed)
+
+def _use_pool(workers: int):
+    security._hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    security._hash_slots = asyncio.Semaphore(workers)
+
+async def run(verify, logins: int, hashed: str) -> dict:
+    timings = Timings()
+    lags = []
+    done = asyncio.Event()
+    probe = asyncio.create_task(_probe(lags, done))
+
+    # Every login arrives at once; latency includes waiting for the others
+    arrived = time.perf_counter()
+
+    async def login():
+        assert await verify("correct horse", hashed)
+        timings.add(time.perf_counter() - arrived)
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    done.set()
+    await probe
+    summary = timings.summary()
+    lags.sort()
+    return {
+        "logins_per_s": summary["throughput"],
+        "p50_ms": summary["p50_ms"],
+        "p95_ms": summary["p95_ms"],
+        "lag_p50_ms": lags[len(lags) // 2] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0
+    }
+
+async def main(logins: int, workers: int):
+    hashed = security.pwd_context.hash("correct horse")
+    rows = {"inline on the loop": await run(_verify_inline, logins, hashed)}
+    size = 1
+    while size <= workers:
+        _use_pool(size)
+        rows[f"pool, {size} workers"] = await run(security.verify_password, logins, hashed)
+        size *= 2
+    print_table(
+        f"{logins} concurrent logins, bcrypt cost {security.BCRYPT_ROUNDS}, {os.cpu_count()} CPUs",
+        rows
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers))
@@ -0,0 +1,106 @@
+"""
+Latency of authenticated GET handlers on get_async_db (commit after every
+request, the old behaviour) versus get_async_read_db (read-only, never
+commits), and of a write handler, with the pool connections each takes.
+
+    python -m benchmarks.read_session [--requests N] [--concurrency C] [--principal-cache]
+
+Without --principal-cache every request loads its user from the
+database, as on a principal cache miss or with CACHE_BACKEND=none.
+"""
+from benchmarks.common import PoolUsage, Timings, print_table, reset_schema
+from fastapi import Depends, FastAPI
+from jose import jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import argparse
+import asyncio
+import httpx
+import time
+from core import cache
+from core.cache_backends import InMemoryBackend, NullBackend
+from core.database import async_engine, get_async_db, get_async_read_db
+from core.dependencies import RoleChecker
+from core.security import ALGORITHM, SECRET_KEY
+from models.admission import AdmissionCategory, Department
+from models.user import User
+
+staff = RoleChecker(["admin", "nurse", "doctor"])
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/departments")
+    async def list_departments(db: AsyncSession = Depends(get_async_read_db), user: User = Depends(staff)):
+        result = await db.execute(select(Department).order_by(Department.id))
+        return [{"id": department.id, "name": department.name} for department in result.scalars()]
+
+    @app.post("/departments/{department_id}/touch")
+    async def touch_department(department_id: int, db: AsyncSession = Depends(get_async_db), user: User = Depends(staff)):
+        department = await db.get(Department, department_id)
+        department.name = department.name
+        return {"id": department.id}
+
+    return app
+
+async def seed() -> str:
+    await reset_schema()
+    async with async_engine.begin() as conn:
+        user_id = await conn.scalar(User.__table__.insert().values(
+            full_name="Bench Admin", email="admin@example.com", hashed_password="x", role="admin"
+        ).returning(User.id))
+        await conn.execute(Department.__table__.insert(), [
+            {"name": f"Department {i}", "category": AdmissionCategory.OUTPATIENT} for i in range(20)
+        ])
+    return jwt.encode({"sub": str(user_id), "role": "admin"}, SECRET_KEY, algorithm=ALGORITHM)
+
+async def run(client: httpx.AsyncClient, method: str, url: str, requests: int, concurrency: int, pool: PoolUsage) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    timings = Timings()
+
+    async def one():
+        async with slots:
+            start = time.perf_counter()
+            response = await client.request(method, url)
+            response.raise_for_status()
+            timings.add(time.perf_counter() - start)
+
+    # Warm the pool and the statement caches first
+    await asyncio.gather(*(one() for _ in range(concurrency * 2)))
+    timings = Timings()
+    pool.reset()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return {
+        **timings.summary(),
+        "conns_per_req": pool.checkouts / requests,
+        "peak_conns": pool.peak
+    }
+
+async def main(requests: int, concurrency: int, principal_cache: bool):
+    token = await seed()
+    cache._backend = InMemoryBackend() if principal_cache else NullBackend()
+    pool = PoolUsage()
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    rows = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        # Before: every handler (and the auth dependency) on the committing session
+        app.dependency_overrides[get_async_read_db] = get_async_db
+        rows["GET, get_async_db"] = await run(client, "GET", "/departments", requests, concurrency, pool)
+        app.dependency_overrides.clear()
+        rows["GET, get_async_read_db"] = await run(client, "GET", "/departments", requests, concurrency, pool)
+        rows["POST, get_async_db"] = await run(client, "POST", "/departments/1/touch", requests, concurrency, pool)
+    await async_engine.dispose()
+    print_table(
+        f"{requests} requests, concurrency {concurrency}, principal cache {'on' if principal_cache else 'off'}",
+        rows
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--principal-cache", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.principal_cache))
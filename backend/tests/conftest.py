@@ -0,0 +1,99 @@
+"""
+Shared test setup. Unit tests need no services. Tests using the `db`
+fixture need a scratch PostgreSQL database with pg_trgm available, which
+is wiped and migrated at the start of the run:
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/hms_test pytest
+
+Set TEST_REPLICA_DATABASE_URL to a second database as well to run the
+end-to-end replica routing test. Run from the backend directory.
+"""
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import os
+import sys
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# core.database builds its engines from these when first imported
+if TEST_DATABASE_URL:
+    _url = urlparse(TEST_DATABASE_URL)
+    os.environ.update(
+        USER=_url.username or "postgres",
+        PASS=_url.password or "",
+        HOST=_url.hostname or "localhost",
+        PORT=str(_url.port or 5432),
+        DB_NAME=_url.path.lstrip("/")
+    )
+else:
+    os.environ.setdefault("HOST", "localhost")
+    os.environ.setdefault("PORT", "5432")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_HOURS", "1")
+# The cheapest bcrypt cost keeps hashing tests fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["REPLICA_HOSTS"] = ""
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import pytest
+from sqlalchemy import text
+
+import core.migrations  # noqa: E402,F401  (registers every model)
+from core import cache
+from core.cache_backends import InMemoryBackend
+from core.database import Base, async_engine
+from models.patient import Patient
+from models.user import User
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def cache_backend():
+    """A fresh in-memory cache per test, with the in-process state cleared."""
+    backend = InMemoryBackend()
+    previous, cache._backend = cache._backend, backend
+    cache._local.clear()
+    cache._inflight.clear()
+    cache._stats.clear()
+    yield backend
+    cache._backend = previous
+
+@pytest.fixture(scope="session")
+async def schema():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    async with async_engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+    await core.migrations.migrate(async_engine)
+    yield
+    await async_engine.dispose()
+
+@pytest.fixture
+async def db(schema):
+    """The app's engine over a migrated database; tables are emptied afterwards."""
+    yield async_engine
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+@pytest.fixture
+async def doctor_id(db):
+    async with db.begin() as conn:
+        return await conn.scalar(User.__table__.insert().values(
+            full_name="Dr Test", email="doctor@example.com", hashed_password="x", role="doctor"
+        ).returning(User.id))
+
+@pytest.fixture
+async def patient_id(db, doctor_id):
+    async with db.begin() as conn:
+        return await conn.scalar(Patient.__table__.insert().values(
+            full_name="Test Patient", date_of_birth=datetime(1990, 1, 1, tzinfo=timezone.utc),
+            gender="Other", contact_number="555-0100", email="patient@example.com",
+            hashed_password="x", address="1 Test Street", registered_by=doctor_id
+        ).returning(Patient.id))
@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+
+from core.cache import cache as cached
+
+pytestmark = pytest.mark.anyio
+
+async def test_concurrent_misses_share_one_computation_and_its_headers(cache_backend):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/patients")
+    @cached(expire=60)
+    async def list_patients(response: Response):
+        calls.append(1)
+        # Long enough for the second request to find this one in flight
+        await asyncio.sleep(0.1)
+        response.headers["X-Next-Cursor"] = "abc"
+        return [{"id": 1}]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        leader, follower = await asyncio.gather(client.get("/patients"), client.get("/patients"))
+        hit = await client.get("/patients")
+
+    assert len(calls) == 1
+    for response in (leader, follower, hit):
+        assert response.json() == [{"id": 1}]
+        assert response.headers["X-Next-Cursor"] == "abc"
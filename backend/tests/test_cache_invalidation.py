@@ -0,0 +1,70 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import cache
+from core.cache import cache as cached, current_generation, invalidate_tags, set_value
+from core.database import get_async_db, get_async_read_db
+from models.admission import AdmissionCategory, Department
+
+pytestmark = pytest.mark.anyio
+
+async def test_result_computed_across_an_invalidation_is_not_stored(cache_backend):
+    calls = []
+
+    @cached(expire=60, namespace="test.racing", tags=["departments"])
+    async def handler():
+        calls.append(1)
+        if len(calls) == 1:
+            # A write to the table commits while the handler is running
+            await invalidate_tags(["departments"])
+        return {"calls": len(calls)}
+
+    assert await handler() == {"calls": 1}
+    assert await handler() == {"calls": 2}
+    assert await handler() == {"calls": 2}
+    stats = cache.get_cache_stats()["test.racing"]
+    assert stats["superseded"] == 1
+    assert stats["writes"] == 1
+
+async def test_set_value_refuses_values_loaded_before_an_invalidation(cache_backend):
+    generation = await current_generation()
+    await invalidate_tags(["principal:user:1"])
+    assert not await set_value("k", {"role": "admin"}, 60, tags=["principal:user:1"], generation=generation)
+    assert await cache.get_value("k") is None
+
+    generation = await current_generation()
+    assert await set_value("k", {"role": "nurse"}, 60, tags=["principal:user:1"], generation=generation)
+    assert await cache.get_value("k") == {"role": "nurse"}
+
+async def test_write_response_waits_for_invalidation(db, cache_backend):
+    app = FastAPI()
+
+    @app.get("/departments")
+    @cached(expire=3600)
+    async def list_departments(db: AsyncSession = Depends(get_async_read_db)):
+        result = await db.execute(select(Department.name).order_by(Department.name))
+        return list(result.scalars())
+
+    @app.post("/departments")
+    async def create_department(name: str, db: AsyncSession = Depends(get_async_db)):
+        db.add(Department(name=name, category=AdmissionCategory.OUTPATIENT))
+        return {"name": name}
+
+    # A slow backend makes a fire-and-forget invalidation lose the race
+    invalidate = cache_backend.invalidate_tags
+
+    async def slow_invalidate(tags):
+        await asyncio.sleep(0.2)
+        return await invalidate(tags)
+    cache_backend.invalidate_tags = slow_invalidate
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/departments")).json() == []
+        assert (await client.post("/departments", params={"name": "Cardiology"})).status_code == 200
+        assert (await client.get("/departments")).json() == ["Cardiology"]
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+from core.counters import _reconcile_once, counter_name
+from core.database import AsyncSessionLocal
+from models.appointment import Appointment, AppointmentStatus
+from models.dashboard_counter import DashboardCounter
+from models.patient import Patient
+
+pytestmark = pytest.mark.anyio
+
+PENDING = counter_name(Appointment, "status", AppointmentStatus.PENDING)
+COMPLETED = counter_name(Appointment, "status", AppointmentStatus.COMPLETED)
+
+async def _counters(db):
+    async with db.connect() as conn:
+        result = await conn.execute(select(DashboardCounter.name, DashboardCounter.value))
+        return {name: value for name, value in result.all() if value}
+
+def _appointment(doctor_id, patient_id, **values):
+    return {
+        "doctor_id": doctor_id, "patient_id": patient_id, "patient_name": "Test Patient",
+        "datetime": datetime(2024, 3, 1, 9), "reason": "Checkup", **values
+    }
+
+async def test_orm_writes_move_the_counters(db, doctor_id, patient_id):
+    async with AsyncSessionLocal() as session:
+        appointment = Appointment(**_appointment(doctor_id, patient_id))
+        session.add(appointment)
+        await session.commit()
+        appointment_id = appointment.id
+    assert await _counters(db) == {"appointments": 1, PENDING: 1}
+
+    async with AsyncSessionLocal() as session:
+        appointment = await session.get(Appointment, appointment_id)
+        appointment.status = AppointmentStatus.COMPLETED
+        await session.commit()
+    assert await _counters(db) == {"appointments": 1, COMPLETED: 1}
+
+    async with AsyncSessionLocal() as session:
+        await session.delete(await session.get(Appointment, appointment_id))
+        await session.commit()
+    assert await _counters(db) == {}
+
+async def test_boolean_and_defaulted_columns_are_counted(db, doctor_id):
+    async with AsyncSessionLocal() as session:
+        session.add(Patient(
+            full_name="Emergency Patient", date_of_birth=datetime(1990, 1, 1), gender="Other",
+            contact_number="555-0101", email="emergency@example.com", hashed_password="x",
+            address="1 Test Street", emergency=True, registered_by=doctor_id
+        ))
+        await session.commit()
+    assert await _counters(db) == {
+        "patients": 1,
+        counter_name(Patient, "category", "outpatient"): 1,
+        counter_name(Patient, "emergency", True): 1
+    }
+
+async def test_reconcile_replaces_drifted_counters(db, doctor_id, patient_id):
+    async with db.begin() as conn:
+        # Bulk SQL bypasses the ORM hooks, so the counters drift
+        await conn.execute(insert(Appointment), [
+            _appointment(doctor_id, patient_id, status=AppointmentStatus.PENDING),
+            _appointment(doctor_id, patient_id, status=AppointmentStatus.COMPLETED),
+            _appointment(doctor_id, patient_id, status=AppointmentStatus.COMPLETED)
+        ])
+        await conn.execute(insert(DashboardCounter), [
+            {"name": "appointments", "value": 7},
+            {"name": COMPLETED, "value": 1},
+            {"name": counter_name(Appointment, "status", AppointmentStatus.RESCHEDULED), "value": 4}
+        ])
+
+    await _reconcile_once()
+
+    counters = await _counters(db)
+    assert {name: value for name, value in counters.items() if name.startswith("appointments")} == {
+        "appointments": 3, PENDING: 1, COMPLETED: 2
+    }
+    assert counters["patients"] == 1
+    async with db.connect() as conn:
+        stale = await conn.scalar(select(DashboardCounter.name).where(DashboardCounter.name.like("%RESCHEDULED")))
+    assert stale is None
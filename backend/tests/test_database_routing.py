@@ -0,0 +1,142 @@
+from itertools import cycle
+from types import SimpleNamespace
+import os
+
+import pytest
+from sqlalchemy import insert, make_url, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core import database
+from core.database import DatabaseRoutingMiddleware, RoutingSession, replica_reads_enabled
+from models.user import User
+
+# A second database that stands in for a replica in the end-to-end routing test
+TEST_REPLICA_DATABASE_URL = os.getenv("TEST_REPLICA_DATABASE_URL")
+
+def _engine(name):
+    return SimpleNamespace(name=name, sync_engine=f"{name}.sync")
+
+@pytest.fixture
+def engines(monkeypatch):
+    """Two stub replicas behind the routing globals of core.database."""
+    replicas = [_engine("replica0"), _engine("replica1")]
+    monkeypatch.setattr(database, "async_engine", _engine("primary"))
+    monkeypatch.setattr(database, "_read_only_primary", _engine("primary-ro"))
+    monkeypatch.setattr(database, "replica_engines", replicas)
+    monkeypatch.setattr(database, "_read_only_replicas", [_engine("replica0-ro"), _engine("replica1-ro")])
+    monkeypatch.setattr(database, "_replica_cycle", cycle(range(len(replicas))))
+    monkeypatch.setattr(database, "_recent_writers", {})
+
+@pytest.fixture
+def replica_request():
+    token = database._use_replica.set(True)
+    yield
+    database._use_replica.reset(token)
+
+def test_without_replicas_everything_uses_the_primary(monkeypatch):
+    monkeypatch.setattr(database, "async_engine", _engine("primary"))
+    monkeypatch.setattr(database, "_read_only_primary", _engine("primary-ro"))
+    monkeypatch.setattr(database, "_replica_cycle", None)
+    token = database._use_replica.set(True)
+    try:
+        assert RoutingSession().get_bind(clause=select(User)) == "primary.sync"
+        assert RoutingSession(info={"read_only": True}).get_bind(clause=select(User)) == "primary-ro.sync"
+    finally:
+        database._use_replica.reset(token)
+
+def test_reads_outside_replica_requests_use_the_primary(engines):
+    assert RoutingSession().get_bind(clause=select(User)) == "primary.sync"
+    assert RoutingSession(info={"read_only": True}).get_bind(clause=select(User)) == "primary-ro.sync"
+
+def test_each_session_sticks_to_one_replica(engines, replica_request):
+    first, second = RoutingSession(), RoutingSession(info={"read_only": True})
+    assert first.get_bind(clause=select(User)) == "replica0.sync"
+    assert second.get_bind(clause=select(User)) == "replica1-ro.sync"
+    assert first.get_bind(clause=select(User)) == "replica0.sync"
+    assert second.get_bind(clause=select(User)) == "replica1-ro.sync"
+
+def test_writes_pin_the_session_to_the_primary(engines, replica_request):
+    session = RoutingSession()
+    assert session.get_bind(clause=insert(User)) == "primary.sync"
+    # Later reads must see the write
+    assert session.get_bind(clause=select(User)) == "primary.sync"
+
+def test_sessions_opened_on_the_primary_stay_there(engines, replica_request):
+    # How get_current_user loads principals
+    assert RoutingSession(info={"primary": True}).get_bind(clause=select(User)) == "primary.sync"
+
+def test_flushes_go_to_the_primary(engines, replica_request):
+    session = RoutingSession()
+    session._flushing = True
+    assert session.get_bind() == "primary.sync"
+    session._flushing = False
+    assert session.get_bind(clause=select(User)) == "primary.sync"
+
+def test_read_only_sessions_never_pin_to_the_primary(engines, replica_request):
+    session = RoutingSession(info={"read_only": True})
+    assert session.get_bind(clause=insert(User)) == "replica0-ro.sync"
+    assert "primary" not in session.info
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+def _request(method, token):
+    return {
+        "type": "http",
+        "method": method,
+        "headers": [(b"authorization", f"Bearer {token}".encode())]
+    }
+
+@pytest.mark.anyio
+async def test_middleware_keeps_recent_writers_on_the_primary(engines, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(database, "time", clock)
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(replica_reads_enabled())
+
+    middleware = DatabaseRoutingMiddleware(app)
+    await middleware(_request("GET", "alice"), None, None)
+    await middleware(_request("POST", "alice"), None, None)
+    await middleware(_request("GET", "alice"), None, None)
+    await middleware(_request("GET", "bob"), None, None)
+    clock.now += database.READ_YOUR_WRITES_WINDOW + 1
+    await middleware(_request("GET", "alice"), None, None)
+
+    assert seen == [True, False, False, True, True]
+    assert database._recent_writers == {}
+    # The flag never leaks out of the request
+    assert not replica_reads_enabled()
+
+@pytest.mark.anyio
+@pytest.mark.skipif(not TEST_REPLICA_DATABASE_URL, reason="TEST_REPLICA_DATABASE_URL is not set")
+async def test_sessions_read_from_the_replica_and_write_to_the_primary(db, monkeypatch):
+    """Only where each statement lands is checked, so the replica needs no schema or replication."""
+    replica = create_async_engine(make_url(TEST_REPLICA_DATABASE_URL).set(drivername="postgresql+asyncpg"))
+    monkeypatch.setattr(database, "replica_engines", [replica])
+    monkeypatch.setattr(database, "_read_only_replicas", [replica.execution_options(postgresql_readonly=True)])
+    monkeypatch.setattr(database, "_replica_cycle", cycle([0]))
+    current_database = text("SELECT current_database()")
+    token = database._use_replica.set(True)
+    try:
+        async with database.AsyncSessionLocal(info={"read_only": True}) as session:
+            assert await session.scalar(current_database) == replica.url.database
+            assert await session.scalar(text("SHOW transaction_read_only")) == "on"
+
+        async with database.AsyncSessionLocal() as session:
+            assert await session.scalar(current_database) == replica.url.database
+            session.add(User(full_name="Routed", email="routed@example.com", hashed_password="x", role="nurse"))
+            await session.flush()
+            assert await session.scalar(current_database) == db.url.database
+            await session.commit()
+    finally:
+        database._use_replica.reset(token)
+        await replica.dispose()
+
+    async with db.connect() as conn:
+        assert await conn.scalar(select(User.email)) == "routed@example.com"
@@ -0,0 +1,83 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from jose import jwt
+from sqlalchemy import event, update
+
+from core import dependencies
+from core.cache import get_value
+from core.database import async_engine, get_async_db
+from core.dependencies import RoleChecker, get_current_user, invalidate_principal
+from core.security import ALGORITHM, SECRET_KEY
+from models.user import User
+
+pytestmark = pytest.mark.anyio
+
+def _token(user_id, role="doctor"):
+    # As issued by routers.auth: "sub" is a string claim
+    return jwt.encode({"sub": str(user_id), "role": role}, SECRET_KEY, algorithm=ALGORITHM)
+
+def _principal_key(user_id, role="doctor"):
+    return f"{dependencies.CACHE_PREFIX}:principal:user:{user_id}:{role}"
+
+async def test_principal_is_loaded_and_cached(db, doctor_id):
+    user = await get_current_user(_token(doctor_id))
+    assert (user.id, user.role) == (doctor_id, "doctor")
+    assert (await get_value(_principal_key(doctor_id)))["id"] == doctor_id
+
+async def test_write_requests_hold_one_connection_at_a_time(db, doctor_id):
+    app = FastAPI()
+
+    @app.post("/write")
+    async def write(db=Depends(get_async_db), user: User = Depends(RoleChecker(["doctor"]))):
+        await db.execute(update(User).where(User.id == user.id).values(address="Ward 3"))
+        return {"id": user.id}
+
+    checked_out, peak = 0, 0
+
+    def checkout(*args):
+        nonlocal checked_out, peak
+        checked_out += 1
+        peak = max(peak, checked_out)
+
+    def checkin(*args):
+        nonlocal checked_out
+        checked_out -= 1
+
+    event.listen(async_engine.sync_engine, "checkout", checkout)
+    event.listen(async_engine.sync_engine, "checkin", checkin)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/write", headers={"Authorization": f"Bearer {_token(doctor_id)}"})
+    finally:
+        event.remove(async_engine.sync_engine, "checkout", checkout)
+        event.remove(async_engine.sync_engine, "checkin", checkin)
+    assert response.json() == {"id": doctor_id}
+    # The principal's session is closed before the handler's session connects
+    assert peak == 1
+
+async def test_principal_invalidated_while_loading_is_not_cached(db, doctor_id, monkeypatch):
+    session_factory = dependencies.AsyncSessionLocal
+
+    class DeactivatedWhileLoading:
+        """A session during whose lifetime an admin deactivates the user."""
+
+        def __init__(self, **kwargs):
+            self.session = session_factory(**kwargs)
+
+        async def __aenter__(self):
+            return await self.session.__aenter__()
+
+        async def __aexit__(self, *exc):
+            await self.session.__aexit__(*exc)
+            await invalidate_principal(doctor_id)
+
+    monkeypatch.setattr(dependencies, "AsyncSessionLocal", DeactivatedWhileLoading)
+    await get_current_user(_token(doctor_id))
+    assert await get_value(_principal_key(doctor_id)) is None
+
+async def test_malformed_subject_is_rejected():
+    with pytest.raises(Exception) as raised:
+        await get_current_user(_token("not-a-number"))
+    assert raised.value.status_code == 401
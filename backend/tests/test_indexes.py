@@ -0,0 +1,92 @@
+from datetime import date, datetime
+import json
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from core.dashboard_metrics import METRIC_GROUPS, _aggregate
+from models.admission import Bed, PatientAdmission, PatientVitals
+from models.appointment import Appointment, AppointmentStatus
+from models.lab import LabTest
+from models.patient import Patient
+
+pytestmark = pytest.mark.anyio
+
+# Shaped like a busy hospital: many doctors and wards, few pending
+# appointments, few emergencies and one free bed per ward
+SEED = [
+    """INSERT INTO users (full_name, email, hashed_password, role)
+       SELECT 'Doctor ' || i, 'doctor' || i || '@example.com', 'x', 'doctor'
+       FROM generate_series(1, 200) i""",
+    """INSERT INTO patients (full_name, date_of_birth, gender, role, contact_number, email,
+                             hashed_password, address, category, emergency, assigned_doctor_id, registered_by)
+       SELECT 'Patient ' || i, '1990-01-01', 'Other', 'patient', '555-0100', 'patient' || i || '@example.com',
+              'x', 'Ward road', 'outpatient', i % 50 = 0, i % 200 + 1, 1
+       FROM generate_series(1, 20000) i""",
+    """INSERT INTO appointments (doctor_id, patient_id, patient_name, datetime, reason, status)
+       SELECT i % 200 + 1, i % 20000 + 1, 'Patient', timestamp '2024-01-01' + i * interval '10 minutes', 'Checkup',
+              (CASE WHEN i % 20 = 0 THEN 'PENDING' ELSE 'COMPLETED' END)::appointment_status
+       FROM generate_series(1, 50000) i""",
+    "INSERT INTO departments (name, category) VALUES ('General', 'INPATIENT')",
+    "INSERT INTO wards (name, department_id) SELECT 'Ward ' || i, 1 FROM generate_series(1, 500) i",
+    """INSERT INTO beds (bed_number, ward_id, is_occupied)
+       SELECT 'B' || i, i % 500 + 1, i % 40 <> 0 FROM generate_series(1, 20000) i""",
+    """INSERT INTO lab_tests (patient_id, requested_by, test_type, status)
+       SELECT i % 20000 + 1, i % 200 + 1, 'CBC', 'COMPLETED' FROM generate_series(1, 20000) i""",
+    """INSERT INTO patient_vitals (patient_id, heart_rate, recorded_by, recorded_at)
+       SELECT i % 20000 + 1, 70, 1, timestamp '2024-01-01' + i * interval '1 minute'
+       FROM generate_series(1, 50000) i""",
+    """INSERT INTO patient_admissions (patient_id, admitted_by, category, status)
+       SELECT i % 20000 + 1, 1, 'OUTPATIENT', 'DISCHARGED' FROM generate_series(1, 20000) i"""
+]
+
+def _dashboard(group: str, label: str):
+    """The dashboard's live COUNT for one metric, as run when its counter is unavailable."""
+    metrics = [metric for metric in METRIC_GROUPS[group].metrics if metric.label == label]
+    return _aggregate(METRIC_GROUPS[group], metrics, date(2024, 12, 1))
+
+# The router and dashboard queries each index was added for
+HOT_QUERIES = {
+    "doctor appointments": select(Appointment).where(Appointment.doctor_id == 7),
+    "doctor metrics": select(
+        func.count().filter(Appointment.status == AppointmentStatus.PENDING),
+        func.count().filter(Appointment.status == AppointmentStatus.CONFIRMED)
+    ).where(Appointment.doctor_id == 7),
+    "pending appointments today": select(func.count(Appointment.id)).where(
+        Appointment.status == AppointmentStatus.PENDING,
+        Appointment.datetime >= datetime(2024, 3, 1),
+        Appointment.datetime < datetime(2024, 3, 2)
+    ),
+    "patient appointments": select(Appointment).where(Appointment.patient_id == 42),
+    "doctor's patients": select(func.count(Patient.id)).where(Patient.assigned_doctor_id == 7),
+    "emergencies": _dashboard("patients", "emergency"),
+    "appointments completed today": _dashboard("appointments", "completed_today"),
+    "free bed in ward": select(Bed).where(Bed.ward_id == 7, Bed.is_occupied == False).limit(1),  # noqa: E712
+    "requested lab tests": select(LabTest).where(LabTest.requested_by == 7),
+    "patient vitals": select(PatientVitals).where(PatientVitals.patient_id == 42),
+    "patient admissions": select(PatientAdmission).where(PatientAdmission.patient_id == 42)
+}
+
+def _scans(plan: dict):
+    if "Relation Name" in plan:
+        yield plan["Node Type"], plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+async def test_hot_queries_use_indexes(db):
+    async with db.begin() as conn:
+        for statement in SEED:
+            await conn.execute(text(statement))
+    async with db.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+        seq_scans = {}
+        for name, stmt in HOT_QUERIES.items():
+            sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables = [table for node, table in _scans(plan[0]["Plan"]) if node == "Seq Scan"]
+            if tables:
+                seq_scans[name] = tables
+    assert seq_scans == {}
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from core.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trips():
+    created_at = datetime(2024, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+def test_cursor_keeps_naive_timestamps_naive():
+    created_at = datetime(2024, 3, 1, 9, 30)
+    assert decode_cursor(encode_cursor(created_at, 7)) == (created_at, 7)
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bnVsbA", "WyJ4IiwgMV0"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
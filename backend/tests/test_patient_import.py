@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import select
+
+from core import patient_import
+from core.database import AsyncSessionLocal
+from core.patient_import import import_patients
+from models.patient import Patient
+from utils.security import BCRYPT_ROUNDS, verify_and_update_password
+
+pytestmark = pytest.mark.anyio
+
+def _row(n, **overrides):
+    return {
+        "full_name": f"Patient {n}", "date_of_birth": "1990-01-01", "gender": "Female",
+        "contact_number": "+911234567890", "address": "Ward road", "email": f"p{n}@example.com",
+        **overrides
+    }
+
+async def _body(rows):
+    yield "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+async def test_a_rejected_chunk_is_reported_and_the_rest_imported(db, doctor_id, monkeypatch):
+    monkeypatch.setattr(patient_import, "IMPORT_CHUNK_SIZE", 2)
+    rows = [
+        _row(1), _row(2),
+        # PostgreSQL refuses NUL characters in text, failing the second chunk's COPY
+        _row(3, address="Ward\x00road"), _row(4),
+        _row(5)
+    ]
+    async with AsyncSessionLocal() as session:
+        report = await import_patients(session, _body(rows), "ndjson", doctor_id)
+
+    assert (report["total_rows"], report["imported"], report["failed"]) == (5, 3, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    assert all(error["errors"][0].startswith("row: Not imported") for error in report["errors"])
+    assert sorted(patient["row"] for patient in report["patients"]) == [1, 2, 5]
+
+    async with db.connect() as conn:
+        emails = (await conn.scalars(select(Patient.email).order_by(Patient.email))).all()
+    assert emails == ["p1@example.com", "p2@example.com", "p5@example.com"]
+
+async def test_row_errors_survive_a_rejected_chunk(db, doctor_id, monkeypatch):
+    monkeypatch.setattr(patient_import, "IMPORT_CHUNK_SIZE", 3)
+    rows = [_row(1, assigned_doctor_id=doctor_id + 100), _row(2, address="\x00"), _row(3)]
+    async with AsyncSessionLocal() as session:
+        report = await import_patients(session, _body(rows), "ndjson", doctor_id)
+
+    assert report["imported"] == 0
+    assert [error["errors"] for error in report["errors"]][0] == ["assigned_doctor_id: Doctor not found"]
+    assert [error["row"] for error in report["errors"]] == [1, 2, 3]
+
+async def test_weaker_hashes_are_upgraded_at_login():
+    weak = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=BCRYPT_ROUNDS + 1).hash("secret")
+    valid, new_hash = await verify_and_update_password("secret", weak)
+    assert valid
+    assert new_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+    valid, new_hash = await verify_and_update_password("secret", new_hash)
+    assert (valid, new_hash) == (True, None)
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text, update
+
+from core.rollups import ROLLUP_LOOKBACK_HOURS, _rollup_once, refresh_rollups
+from models.appointment import Appointment, AppointmentStatus
+from models.billing import Billing
+from models.metric_rollup import MetricRollupDaily, MetricRollupHourly
+
+pytestmark = pytest.mark.anyio
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+async def _rollups(conn, table, metric):
+    result = await conn.execute(
+        select(table.bucket, table.count, table.total)
+        .where(table.metric == metric)
+        .order_by(table.bucket)
+    )
+    return result.all()
+
+async def test_consecutive_runs_rebuild_the_boundary_hour(db, patient_id):
+    now = datetime.now(timezone.utc)
+    # The hour the lookback window starts in, with rows on both sides of its start
+    boundary = _hour(now - timedelta(hours=ROLLUP_LOOKBACK_HOURS))
+    async with db.begin() as conn:
+        await conn.execute(Billing.__table__.insert(), [
+            {"patient_id": patient_id, "amount": 10.0, "created_at": boundary + timedelta(seconds=30)},
+            {"patient_id": patient_id, "amount": 5.0, "created_at": boundary + timedelta(minutes=59, seconds=30)},
+            {"patient_id": patient_id, "amount": 1.0, "created_at": now},
+        ])
+        # Backfill, as migration 5 does
+        await refresh_rollups(conn)
+
+    for _ in range(2):
+        await _rollup_once()
+
+    async with db.connect() as conn:
+        hourly = await _rollups(conn, MetricRollupHourly, "billing")
+        daily = await _rollups(conn, MetricRollupDaily, "billing")
+    assert hourly == [(boundary, 2, 15.0), (_hour(now), 1, 1.0)]
+    assert sum(count for _, count, _ in daily) == 3
+    assert sum(total for _, _, total in daily) == 16.0
+
+async def test_old_status_change_rebuilds_its_bucket(db, doctor_id, patient_id):
+    now = datetime.now(timezone.utc)
+    # Naive UTC, like appointments.datetime
+    booked = (now - timedelta(hours=ROLLUP_LOOKBACK_HOURS + 24)).replace(tzinfo=None)
+    async with db.begin() as conn:
+        appointment_id = await conn.scalar(Appointment.__table__.insert().values(
+            doctor_id=doctor_id, patient_id=patient_id, patient_name="Test Patient",
+            datetime=booked, reason="Checkup", status=AppointmentStatus.PENDING
+        ).returning(Appointment.id))
+        await refresh_rollups(conn)
+
+    async with db.begin() as conn:
+        await conn.execute(
+            update(Appointment)
+            .where(Appointment.id == appointment_id)
+            .values(status=AppointmentStatus.COMPLETED, updated_at=now)
+        )
+
+    async with db.begin() as conn:
+        # Buckets must not depend on the session time zone, even a half-hour offset
+        await conn.execute(text("SET LOCAL TIME ZONE 'Asia/Kolkata'"))
+        await refresh_rollups(conn, now - timedelta(hours=ROLLUP_LOOKBACK_HOURS))
+
+    bucket = _hour(booked.replace(tzinfo=timezone.utc))
+    async with db.connect() as conn:
+        assert await _rollups(conn, MetricRollupHourly, "appointments:status:PENDING") == []
+        assert await _rollups(conn, MetricRollupHourly, "appointments:status:COMPLETED") == [(bucket, 1, None)]
+        assert await _rollups(conn, MetricRollupDaily, "appointments:status:PENDING") == []
+        completed_daily = await _rollups(conn, MetricRollupDaily, "appointments:status:COMPLETED")
+    assert [count for _, count, _ in completed_daily] == [1]
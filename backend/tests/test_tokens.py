@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select, update
+
+from core.database import AsyncSessionLocal
+from core.tokens import RefreshTokenError, issue_refresh_token, rotate_refresh_token
+from models.refresh_token import RefreshToken
+from routers import auth
+
+pytestmark = pytest.mark.anyio
+
+async def _issue(subject_id):
+    async with AsyncSessionLocal() as session:
+        token, record = await issue_refresh_token(session, subject_id, "user", "doctor")
+        await session.commit()
+        return token, record.family_id
+
+async def _revoked(db, family_id):
+    async with db.connect() as conn:
+        result = await conn.execute(
+            select(RefreshToken.revoked_at.is_not(None))
+            .where(RefreshToken.family_id == family_id)
+            .order_by(RefreshToken.id)
+        )
+        return list(result.scalars())
+
+async def test_rotation_replaces_the_token_within_its_family(db, doctor_id):
+    token, family_id = await _issue(doctor_id)
+    async with AsyncSessionLocal() as session:
+        new_token, record = await rotate_refresh_token(session, token)
+        await session.commit()
+
+    assert new_token != token
+    assert (record.family_id, record.subject_id, record.role) == (family_id, doctor_id, "doctor")
+    assert await _revoked(db, family_id) == [True, False]
+    async with db.connect() as conn:
+        replaced_by = await conn.scalar(
+            select(RefreshToken.replaced_by).where(RefreshToken.family_id == family_id).order_by(RefreshToken.id)
+        )
+    assert replaced_by == record.id
+
+async def test_reusing_a_rotated_token_revokes_the_family(db, doctor_id):
+    token, family_id = await _issue(doctor_id)
+    async with AsyncSessionLocal() as session:
+        new_token, _ = await rotate_refresh_token(session, token)
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        with pytest.raises(RefreshTokenError, match="reuse"):
+            await rotate_refresh_token(session, token)
+        await session.commit()
+    assert await _revoked(db, family_id) == [True, True]
+
+    # The legitimate holder's token is gone too
+    async with AsyncSessionLocal() as session:
+        with pytest.raises(RefreshTokenError, match="reuse"):
+            await rotate_refresh_token(session, new_token)
+
+async def test_unknown_and_expired_tokens_are_rejected(db, doctor_id):
+    token, family_id = await _issue(doctor_id)
+    async with db.begin() as conn:
+        await conn.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id)
+            .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+    async with AsyncSessionLocal() as session:
+        with pytest.raises(RefreshTokenError, match="expired"):
+            await rotate_refresh_token(session, token)
+        with pytest.raises(RefreshTokenError, match="Invalid"):
+            await rotate_refresh_token(session, "not-a-token")
+
+async def test_refresh_route_keeps_the_revocation_of_a_reused_family(db, doctor_id):
+    app = FastAPI()
+    app.include_router(auth.router)
+    token, family_id = await _issue(doctor_id)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        rotated = await client.post("/auth/refresh", json={"refresh_token": token})
+        assert rotated.status_code == 200
+        new_token = rotated.json()["refresh_token"]
+
+        reused = await client.post("/auth/refresh", json={"refresh_token": token})
+        assert reused.status_code == 401
+        assert (await client.post("/auth/refresh", json={"refresh_token": new_token})).status_code == 401
+    assert await _revoked(db, family_id) == [True, True]
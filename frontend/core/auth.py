@@ -1,12 +1,30 @@
 import os
+import threading
 import requests
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Tokens of the current login. Access tokens replaced by a refresh are kept in
+# "superseded" so views still holding an old token get the current one.
+_session = {"access_token": None, "refresh_token": None, "superseded": set()}
+
+# Refresh tokens rotate on use, so only one thread (GUI or dashboard stream) may refresh at a time
+_refresh_lock = threading.Lock()
+
+def current_access_token(token):
+    """Latest access token for `token` if it was refreshed since it was issued."""
+    if token and token in _session["superseded"]:
+        return _session["access_token"]
+    return token
+
+def has_refresh_token():
+    return _session["refresh_token"] is not None
+
 class AuthHandler:
     def __init__(self):
         self.api_url = os.getenv("LOGIN_URL")
+        self.refresh_url = os.getenv("REFRESH_URL") or (self.api_url or "").rsplit("/login", 1)[0] + "/refresh"
 
     def authenticate(self, email, password):
         data = {"email": email, "password": password}
@@ -18,6 +36,9 @@ class AuthHandler:
                 token = result.get("access_token")
                 role = result.get("role")
                 user_id = str(result.get("sub"))
+                _session["access_token"] = token
+                _session["refresh_token"] = result.get("refresh_token")
+                _session["superseded"].clear()
                 
                 return True, "Login successful!", role, user_id, token
             elif response.status_code == 401:
@@ -29,4 +50,31 @@ class AuthHandler:
         except requests.exceptions.RequestException as e:
             return False, f"Unable to connect to the server: {str(e)}", None, None, None
 
-   
+    def refresh(self, rejected_token=None):
+        """
+        Get a new access token with the stored refresh token, without asking
+        for the password again. `rejected_token` is the access token the server
+        just refused; if another thread already replaced it, its successor is
+        returned without refreshing again. Returns the new access token, or
+        None if the user has to log in again.
+        """
+        with _refresh_lock:
+            if rejected_token and rejected_token in _session["superseded"]:
+                return _session["access_token"]
+            if not _session["refresh_token"]:
+                return None
+            try:
+                response = requests.post(self.refresh_url, json={"refresh_token": _session["refresh_token"]})
+            except requests.exceptions.RequestException:
+                return None
+            if response.status_code != 200:
+                # Revoked or expired: the next 401 sends the user back to login
+                _session["refresh_token"] = None
+                return None
+
+            result = response.json()
+            if _session["access_token"]:
+                _session["superseded"].add(_session["access_token"])
+            _session["access_token"] = result.get("access_token")
+            _session["refresh_token"] = result.get("refresh_token")
+            return _session["access_token"]
@@ -1,36 +1,97 @@
 import os
 import requests
+from collections import OrderedDict
 from PySide6.QtWidgets import QMessageBox
+from core.auth import AuthHandler, current_access_token, has_refresh_token
 
-def fetch_data(self, api_url, auth_token=None, params=None):
-    """Generic function to fetch data from an API."""
-    headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
+def _send(method, api_url, auth_token=None, headers=None, **kwargs):
+    """Send a request, silently refreshing an expired access token once."""
+    headers = dict(headers or {})
+    auth_token = current_access_token(auth_token)
+    if auth_token:
+        headers["Authorization"] = f"Bearer {auth_token}"
+    response = requests.request(method, api_url, headers=headers, **kwargs)
+    if response.status_code == 401 and auth_token and has_refresh_token():
+        new_token = AuthHandler().refresh(auth_token)
+        if new_token:
+            headers["Authorization"] = f"Bearer {new_token}"
+            response = requests.request(method, api_url, headers=headers, **kwargs)
+    return response
+
+# Last response per request, revalidated with If-None-Match: {key: (etag, data, headers)}.
+# Least recently used entries are dropped beyond ETAG_CACHE_SIZE. The token is not part
+# of the key: the server's ETag is computed from what the current caller would receive.
+ETAG_CACHE_SIZE = int(os.getenv("ETAG_CACHE_SIZE", 256))
+_etag_cache = OrderedDict()
+
+def _fetch(self, api_url, auth_token=None, params=None):
+    """GET with ETag revalidation; returns (data, response headers)."""
+    headers = {}
+    cache_key = (api_url, tuple(sorted((params or {}).items())))
+    cached = _etag_cache.get(cache_key)
+    if cached:
+        _etag_cache.move_to_end(cache_key)
+        headers["If-None-Match"] = cached[0]
     try:
-        response = requests.get(api_url, headers=headers, params=params)
+        response = _send("GET", api_url, auth_token, headers=headers, params=params)
         print("Backend response:", response.status_code, response.text)  # Debugging line
         
-        if response.status_code == 200:
-            return response.json()
+        if response.status_code == 304 and cached:
+            return cached[1], cached[2]
+        elif response.status_code == 200:
+            data = response.json()
+            etag = response.headers.get("ETag")
+            if etag:
+                _etag_cache[cache_key] = (etag, data, response.headers)
+                _etag_cache.move_to_end(cache_key)
+                while len(_etag_cache) > ETAG_CACHE_SIZE:
+                    _etag_cache.popitem(last=False)
+            return data, response.headers
         elif response.status_code == 403:
                 QMessageBox.critical(self,"Error", f"Access forbidden. You don't have permission. {response.text}")
                 self.close()
-                return
+                return None, {}
         elif response.status_code == 401:
                 QMessageBox.critical(self,"Error", f"Unauthorized. Please log in again.\n {response.text}")
                 self.close()
-                return
+                return None, {}
         else:
                 QMessageBox.critical(self,"Error", f"Failed to fetch data. Error {response.text}")
     except Exception as e:
         QMessageBox.critical(self, "Error", f"An error occurred: {e}")
-        return None
+    return None, {}
+
+def fetch_data(self, api_url, auth_token=None, params=None):
+    """Generic function to fetch data from an API."""
+    return _fetch(self, api_url, auth_token, params)[0]
+
+def fetch_page(self, api_url, auth_token=None, params=None):
+    """Fetch one page of a cursor-paginated list: (items, next_cursor, total_estimate)."""
+    data, headers = _fetch(self, api_url, auth_token, params)
+    total = headers.get("X-Total-Estimate")
+    return data, headers.get("X-Next-Cursor"), int(total) if total else None
+
+# Largest page the backend serves for cursor-paginated lists
+MAX_PAGE_SIZE = 500
+
+def fetch_all_pages(self, api_url, auth_token=None, params=None):
+    """Fetch a whole cursor-paginated list by following X-Next-Cursor; None if a page fails."""
+    params = {**(params or {}), "limit": MAX_PAGE_SIZE}
+    items = []
+    while True:
+        data, cursor, _ = fetch_page(self, api_url, auth_token, params)
+        if data is None:
+            return None
+        items.extend(data)
+        if not cursor:
+            return items
+        params["cursor"] = cursor
 
 def post_data(self, api_url, data, auth_token=None):
     """Generic function to post data to an API."""
     
-    headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
     try:
-        response = requests.post(api_url, json=data, headers=headers)
+        response = _send("POST", api_url, auth_token, json=data)
         print("Backend response:", response.status_code, response.text)  # Debugging line
         
         if response.status_code in [200, 201]:
@@ -51,9 +112,8 @@ def post_data(self, api_url, data, auth_token=None):
         return False
 
 def update_data(self, api_url, data, auth_token=None):
-    headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
     try:
-        response = requests.put(api_url, json=data, headers=headers)
+        response = _send("PUT", api_url, auth_token, json=data)
         print("Backend response:", response.status_code, response.text)  # Debugging line
         
         if response.status_code in [200, 201]:
@@ -76,9 +136,8 @@ def update_data(self, api_url, data, auth_token=None):
 
 def delete_data(self, api_url, auth_token=None, params=None):
     """Generic function to delete data from an API."""
-    headers = {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
     try:
-        response = requests.delete(api_url, headers=headers, params=params)
+        response = _send("DELETE", api_url, auth_token, params=params)
         print("Backend response:", response.status_code, response.text)  # Debugging line
         
         if response.status_code == 204:  
@@ -6,7 +6,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon, QAction, QFont
-from utils.api_utils import fetch_data, post_data, update_data
+from utils.api_utils import fetch_data, fetch_all_pages, post_data, update_data
 from utils.pdf_utils import generate_pdf
 
 
@@ -900,7 +900,7 @@ class AdmissionManagement(QMainWindow):
     def load_patients(self):
         """Fetches and populates the dropdown with patients using threading."""
         try:
-            patients = fetch_data(self, os.getenv("PATIENT_LIST_URL")+ "?emergency=False", self.token)
+            patients = fetch_all_pages(self, os.getenv("PATIENT_LIST_URL"), self.token, {"emergency": False})
             self.populate_patient_dropdowns(patients)
         except Exception as e:
             self.show_error(str(e))
@@ -9,7 +9,7 @@ from PySide6.QtWidgets import (QApplication,
 )
 from PySide6.QtCore import Qt, QSize, QTimer, QThread, QDate
 from fpdf import FPDF
-from utils.api_utils import fetch_data, post_data, update_data, delete_data
+from utils.api_utils import fetch_data, fetch_all_pages, post_data, update_data, delete_data
 
 
 class EmailThread(QThread):
@@ -181,11 +181,10 @@ class ManageAppointments(QWidget):
     def load_patients(self):
         """Load patients into dropdown."""
         if self.user_role == "doctor":
-            api_url = f"{os.getenv('ASSIGNED_PATIENTS_URL')}/{self.doctor_id}/patients"
+            patients = fetch_data(self, f"{os.getenv('ASSIGNED_PATIENTS_URL')}/{self.doctor_id}/patients", self.token)
         else:
-            api_url = os.getenv('PATIENT_LIST_URL')
-
-        patients = fetch_data(self, api_url, self.token)
+            # The patient list is paginated; follow the cursor to fill the dropdown
+            patients = fetch_all_pages(self, os.getenv('PATIENT_LIST_URL'), self.token)
         self.patient_dropdown.clear()
 
         if patients:
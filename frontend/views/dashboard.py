@@ -2,10 +2,11 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QApplication, QSizePolicy
 )
 from PySide6.QtGui import QFont, QPixmap, QPainter, QColor
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtCharts import QChart, QChartView, QPieSeries, QBarSet, QBarSeries, QBarCategoryAxis, QValueAxis
 from components.sidebar import Sidebar
 from utils.api_utils import fetch_data
+from core.auth import AuthHandler, current_access_token, has_refresh_token
 from views.patients import PatientManagement
 from views.doctors import DoctorManagement
 from views.appointments import ManageAppointments
@@ -22,6 +23,84 @@ from views.profile import ProfileWindow
 from views.admission import AdmissionManagement
 import os
 import sys
+import json
+import threading
+import requests
+
+
+class DashboardStream(QThread):
+    """Subscribes to /dashboard/stream and emits each pushed metrics update."""
+    metrics_received = Signal(dict)
+    connected = Signal()
+
+    def __init__(self, auth_token, doctor_id=None):
+        super().__init__()
+        self.auth_token = auth_token
+        self.doctor_id = doctor_id
+        self.response = None
+        self.running = True
+        # Set by stop() to cut the reconnect backoff short
+        self.stopped = threading.Event()
+
+    def run(self):
+        """Keep the stream open, reconnecting with backoff when it drops."""
+        delay = 1
+        while self.running:
+            try:
+                self.listen()
+                delay = 1
+            except Exception as e:
+                print(f"Dashboard stream disconnected: {e}")
+            if self.running:
+                self.stopped.wait(delay)
+                delay = min(delay * 2, 30)
+
+    def listen(self):
+        params = {"doctor_id": self.doctor_id} if self.doctor_id else None
+        for attempt in range(2):
+            token = current_access_token(self.auth_token)
+            self.response = requests.get(
+                f"{os.getenv('API_BASE_URL')}/dashboard/stream",
+                headers={"Authorization": f"Bearer {token}", "Accept": "text/event-stream"},
+                params=params,
+                stream=True,
+                timeout=(10, 60)  # The server sends a keepalive every 15 seconds
+            )
+            if self.response.status_code == 401 and attempt == 0 and has_refresh_token():
+                AuthHandler().refresh(token)
+                continue
+            break
+        if self.response.status_code in (401, 403):
+            # Not allowed to see the dashboard (or logged out): retrying won't help
+            print(f"Dashboard stream refused ({self.response.status_code}), not reconnecting")
+            self.running = False
+            return
+        self.response.raise_for_status()
+        self.connected.emit()
+
+        event, data = None, []
+        for line in self.response.iter_lines(decode_unicode=True):
+            if not self.running:
+                return
+            if line == "":
+                # Blank line ends an event
+                if event == "metrics" and data:
+                    self.metrics_received.emit(json.loads("\n".join(data)))
+                event, data = None, []
+            elif line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+
+    def stop(self):
+        """Stop reconnecting, close the open response and wait for the thread to finish."""
+        self.running = False
+        self.stopped.set()
+        if self.response is not None:
+            self.response.close()
+        self.quit()
+        # Bounded: a connect in progress only notices once it times out
+        self.wait(5000)
 
 
 class Dashboard(QWidget):
@@ -249,22 +328,22 @@ class Dashboard(QWidget):
         return chart_view
 
     def init_data_fetching(self):
-        """Initialize data fetching and periodic updates."""
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_dashboard_data)
-        self.timer.start(5000000)  # Refresh data every 5 seconds
-        self.update_dashboard_data()  # Initial data fetch
-
-    def update_dashboard_data(self):
-        """Fetch and update dashboard data from the backend."""
-        metrics = fetch_data(self, f"{os.getenv('API_BASE_URL')}/dashboard/metrics", self.auth_token)
-        if metrics:
-            self.update_metrics(metrics)
-            self.update_doctor_metrics()
+        """Subscribe to pushed metric updates instead of polling the backend."""
+        doctor_id = self.user_id if self.role == "doctor" else None
+        self.stream = DashboardStream(self.auth_token, doctor_id)
+        self.stream.metrics_received.connect(self.apply_metrics_update)
+        # AI predictions are not pushed; refresh them whenever the stream (re)connects
+        self.stream.connected.connect(self.update_ai_metric)
+        self.stream.start()
+
+    def apply_metrics_update(self, metrics):
+        """Apply a pushed update; after the first full one, only changed keys arrive."""
+        self.update_metrics(metrics)
+        if "patient_distribution" in metrics:
             self.update_pie_chart(metrics["patient_distribution"])
+        if "appointments_data" in metrics:
             self.update_bar_chart(metrics["appointments_data"])
-        self.update_ai_metric()
-            
+
     def update_metrics(self, metrics):
         """Update the dashboard metrics dynamically."""
         for title, value_label in self.metric_labels.items():
@@ -274,16 +353,6 @@ class Dashboard(QWidget):
                 value = metrics[api_key]
                 value_label.setText(str(value))
 
-    def update_doctor_metrics(self):
-        """Fetch and update doctor-specific metrics."""
-        metrics = fetch_data(self, f"{os.getenv('API_BASE_URL')}/dashboard/metrics/doctor/{self.user_id}", self.auth_token)
-        if metrics:
-            for title, value_label in self.metric_labels.items():
-                api_key = self.metric_api_keys.get(title)
-                if api_key and api_key in metrics:
-                    value = metrics[api_key]
-                    value_label.setText(str(value))
-
     def update_ai_metric(self):
         """Fetch and update AI-driven metrics."""
         admission_predictions = fetch_data(self, f"{os.getenv('AI_BASE_URL')}/predict-admissions", self.auth_token)
@@ -331,6 +400,7 @@ class Dashboard(QWidget):
     def logout_user(self):
         """Log out the user and restart the application."""
         print("Logging out user...")
+        self.stream.stop()
         self.auth_token = None
         self.user_id = None
         python = sys.executable
@@ -380,6 +450,11 @@ class Dashboard(QWidget):
             self.current_view = self.views[module]
             self.current_view.show()
 
+    def closeEvent(self, event):
+        """Close the metrics stream with the window."""
+        self.stream.stop()
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         """Handle window resize events."""
         super().resizeEvent(event)
@@ -4,7 +4,7 @@ from PySide6.QtWidgets import (QApplication,
     QMessageBox, QComboBox, QTextEdit
 )
 from PySide6.QtCore import Qt
-from utils.api_utils import fetch_data, post_data
+from utils.api_utils import fetch_data, fetch_all_pages, post_data
 
 class ICUManagement(QWidget):
     def __init__(self, user_role, user_id, auth_token):
@@ -88,7 +88,7 @@ class ICUManagement(QWidget):
 
 
         api_url = os.getenv("PATIENT_LIST_URL")
-        patients = fetch_data(self, api_url, self.token)
+        patients = fetch_all_pages(self, api_url, self.token)
 
         if patients:
             for patient in patients:
@@ -5,13 +5,17 @@ from PySide6.QtWidgets import (QApplication,
     QTableWidgetItem, QMessageBox, QLineEdit, QComboBox, QInputDialog,
     QDateEdit, QCheckBox, QHeaderView
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QIcon
-from utils.api_utils import fetch_data, post_data
+from utils.api_utils import fetch_data, fetch_page, post_data
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Patients fetched per request, and only the columns the table renders
+PATIENT_PAGE_SIZE = 100
+PATIENT_TABLE_FIELDS = "id,full_name,date_of_birth,address,category,emergency,assigned_doctor_id,assigned_doctor_name"
+
 
 class PatientManagement(QWidget):
     def __init__(self, role, user_id, auth_token):
@@ -20,6 +24,7 @@ class PatientManagement(QWidget):
         self.role = role
         self.user_id = user_id
         self.doctor_dict = {}
+        self.next_cursor = None
         self.init_ui()
 
     def init_ui(self):
@@ -106,6 +111,16 @@ class PatientManagement(QWidget):
         self.title_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(self.title_label)
 
+        # Server-side search; waits for a pause in typing before querying
+        self.search_bar = QLineEdit()
+        self.search_bar.setPlaceholderText("Search patients by name, email or contact (min. 3 characters)...")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.search_patients)
+        self.search_bar.textChanged.connect(self.search_timer.start)
+        main_layout.addWidget(self.search_bar)
+
         # Patient Table
         self.patient_table = QTableWidget()
         self.patient_table.setColumnCount(8)
@@ -125,6 +140,11 @@ class PatientManagement(QWidget):
         self.refresh_button.clicked.connect(self.load_patients)
         button_layout.addWidget(self.refresh_button)
 
+        self.load_more_button = QPushButton("Load More")
+        self.load_more_button.setEnabled(False)
+        self.load_more_button.clicked.connect(self.load_more_patients)
+        button_layout.addWidget(self.load_more_button)
+
         self.register_patient_button = QPushButton("Register New Patient")
         self.register_patient_button.setObjectName("registerButton")
         self.register_patient_button.setIcon(QIcon("assets/icons/add.png"))
@@ -139,17 +159,51 @@ class PatientManagement(QWidget):
 
         main_layout.addLayout(centered_button_layout, stretch=0)
 
+        self.page_label = QLabel("")
+        self.page_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.page_label)
+
         self.setLayout(main_layout)
         self.load_doctor_list()
         self.load_patients()
 
     def load_patients(self):
-        """Fetch patient data from API with Authorization"""
-        api_url = os.getenv("PATIENT_LIST_URL")
-        patients = fetch_data(self, api_url, self.token)
-        self.populate_table(patients)
+        """Fetch the first page of patients from API with Authorization"""
+        self.next_cursor = None
+        self.fetch_patient_page(append=False)
         self.load_doctor_list()
 
+    def search_patients(self):
+        """Show the best matches for the search text, or the paged list when it is cleared"""
+        query = self.search_bar.text().strip()
+        if not query:
+            self.load_patients()
+            return
+        if len(query) < 3:
+            return
+        api_url = os.getenv("PATIENT_SEARCH_URL") or os.getenv("PATIENT_LIST_URL").rstrip("/") + "/search"
+        patients = fetch_data(self, api_url, self.token, params={"q": query, "limit": PATIENT_PAGE_SIZE, "fields": PATIENT_TABLE_FIELDS})
+        self.next_cursor = None
+        self.populate_table(patients or [])
+        self.load_more_button.setEnabled(False)
+        self.page_label.setText(f"{len(patients or [])} best matches for \"{query}\"")
+
+    def load_more_patients(self):
+        """Append the next page of patients to the table"""
+        if self.next_cursor:
+            self.fetch_patient_page(append=True)
+
+    def fetch_patient_page(self, append):
+        api_url = os.getenv("PATIENT_LIST_URL")
+        params = {"limit": PATIENT_PAGE_SIZE, "fields": PATIENT_TABLE_FIELDS}
+        if append:
+            params["cursor"] = self.next_cursor
+        patients, self.next_cursor, total = fetch_page(self, api_url, self.token, params=params)
+        self.populate_table(patients or [], append=append)
+        self.load_more_button.setEnabled(bool(self.next_cursor))
+        shown = self.patient_table.rowCount() - 1  # Minus the duplicate header row
+        self.page_label.setText(f"Showing {shown} of ~{max(total or 0, shown)} patients")
+
     def load_doctor_list(self):
         """Fetch all doctors and store them in a dictionary {doctor_id: doctor_name}"""
         api_url = os.getenv("DOCTOR_LIST_URL")
@@ -165,19 +219,20 @@ class PatientManagement(QWidget):
             item.setForeground(Qt.white)
             self.patient_table.setItem(self.patient_table.rowCount() - 1, col, item)
 
-    def populate_table(self, patients):
+    def populate_table(self, patients, append=False):
         """Populate table with patient data, displaying doctor names instead of just IDs"""
-        self.patient_table.setRowCount(0)  # Clear all rows
-        self.patient_table.insertRow(0)  # Insert a new row at the top for the duplicate header
-
-        # Add the duplicate header at row 0
-        for col in range(self.patient_table.columnCount()):
-            item = QTableWidgetItem(self.patient_table.horizontalHeaderItem(col).text())
-            item.setBackground(Qt.gray)
-            item.setForeground(Qt.white)
-            self.patient_table.setItem(0, col, item)
-
-        for row, patient in enumerate(patients, start=1):
+        if not append:
+            self.patient_table.setRowCount(0)  # Clear all rows
+            self.patient_table.insertRow(0)  # Insert a new row at the top for the duplicate header
+
+            # Add the duplicate header at row 0
+            for col in range(self.patient_table.columnCount()):
+                item = QTableWidgetItem(self.patient_table.horizontalHeaderItem(col).text())
+                item.setBackground(Qt.gray)
+                item.setForeground(Qt.white)
+                self.patient_table.setItem(0, col, item)
+
+        for row, patient in enumerate(patients, start=self.patient_table.rowCount()):
             self.patient_table.insertRow(row)
             self.patient_table.setItem(row, 0, QTableWidgetItem(str(patient["id"])))
             self.patient_table.setItem(row, 1, QTableWidgetItem(patient["full_name"]))
@@ -187,8 +242,8 @@ class PatientManagement(QWidget):
             self.patient_table.setItem(row, 5, QTableWidgetItem(str(patient["emergency"])))
 
             doctor_id = patient.get("assigned_doctor_id")
-            if doctor_id and doctor_id in self.doctor_dict:
-                doctor_name = self.doctor_dict[doctor_id]
+            doctor_name = patient.get("assigned_doctor_name") or self.doctor_dict.get(doctor_id)
+            if doctor_id and doctor_name:
                 self.patient_table.setItem(row, 6, QTableWidgetItem(f"{doctor_name} (ID: {doctor_id})"))
             else:
                 self.patient_table.setItem(row, 6, QTableWidgetItem("Not Assigned"))